@@ -0,0 +1,79 @@
+"""Speed benchmark for bulk updates of mutable columns
+
+Changes one nested key of the `MutableType` column of `--rows` rows, once
+through the ORM (loading every model and flushing an `UPDATE` per row) and
+once with `bulk_update`, and reports the time each update takes.
+
+Usage:
+
+```
+python benchmarks/bench_bulk.py --rows 10000
+```
+"""
+
+from sqlalchemy_mutable import MutableModelBase, MutableType, bulk_update
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+import argparse
+import time
+
+Base = declarative_base()
+
+
+class Model(MutableModelBase, Base):
+    __tablename__ = 'model'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType)
+
+
+def make_value(i):
+    return {
+        'status': ['pending', 'running', 'done'][i % 3],
+        'scores': [j * 0.5 for j in range(10)],
+        'settings': {'theme': 'dark', 'page_size': 50},
+        'history': [{'event': 'update', 'count': j} for j in range(5)],
+    }
+
+
+def set_theme(value):
+    value['settings']['theme'] = 'light'
+
+
+def orm_update(session):
+    for model in session.query(Model):
+        set_theme(model.mutable)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.bulk_save_objects(
+        [Model(mutable=make_value(i)) for i in range(args.rows)]
+    )
+    session.commit()
+
+    for name, update in (
+        ('orm', orm_update),
+        ('bulk_update', lambda session: (
+            bulk_update(session, Model.mutable, set_theme), session.commit()
+        )),
+    ):
+        session.expunge_all()
+        start = time.perf_counter()
+        update(session)
+        print('{:>11}: {} rows in {:.3f}s'.format(
+            name, args.rows, time.perf_counter() - start
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Size and speed benchmark for the binary codec against pickle
+
+Encodes and decodes `--rows` mutable trees with pickle (as `MutableType`
+columns do) and with the binary codec (as `MutableCodecType` columns do), and
+reports the total encoded size and the time to encode and decode.
+
+Usage:
+
+```
+python benchmarks/bench_codec.py --rows 5000
+```
+"""
+
+from sqlalchemy_mutable import Mutable
+from sqlalchemy_mutable.codec import decode, encode
+
+import argparse
+import pickle
+import time
+from datetime import datetime
+
+
+def make_tree(i):
+    tree = Mutable()
+    tree.status = 'done' if i % 2 else 'pending'
+    tree.created = datetime(2020, 1, 1, 12, i % 60)
+    tree.scores = [j * 0.5 for j in range(20)]
+    tree.settings = {
+        'theme': 'dark', 'language': 'en', 'page_size': 50,
+        'flags': {'beta': True, 'admin': False}
+    }
+    tree.history = [
+        {'event': 'update', 'count': j, 'tags': ('a', 'b')} for j in range(10)
+    ]
+    return tree
+
+
+def bench(name, dumps, loads, trees):
+    start = time.perf_counter()
+    blobs = [dumps(tree) for tree in trees]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for blob in blobs:
+        loads(blob)
+    decode_time = time.perf_counter() - start
+    print('{:>6}: {:>9} bytes, encode {:.3f}s, decode {:.3f}s'.format(
+        name, sum(len(blob) for blob in blobs), encode_time, decode_time
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    trees = [make_tree(i) for i in range(args.rows)]
+    bench(
+        'pickle',
+        lambda tree: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL),
+        pickle.loads,
+        trees
+    )
+    bench('codec', encode, decode, trees)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Speed benchmark for coercing scalar values
+
+Coerces `--n` values of each coerced scalar type (`int`, `float`, `str`,
+`bool`, `complex`, and `datetime`) with `Mutable.coerce`, and sets them as
+the values of a `MutableType` column. Reports the time each takes, the size
+of each coerced value's pickle, and the time to read model attributes.
+
+Usage:
+
+```
+python benchmarks/bench_coerce.py --n 100000
+```
+"""
+
+from sqlalchemy_mutable import Mutable, MutableModelBase, MutableType
+
+from sqlalchemy import Column, Integer
+from sqlalchemy.ext.declarative import declarative_base
+
+import argparse
+import pickle
+import time
+from datetime import datetime, timedelta, timezone
+
+Base = declarative_base()
+
+
+class Model(MutableModelBase, Base):
+    __tablename__ = 'model'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType)
+
+
+def make_values(n):
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return {
+        'int': list(range(n)),
+        'float': [i * .5 for i in range(n)],
+        'str': [str(i) for i in range(n)],
+        'bool': [i % 2 == 0 for i in range(n)],
+        'complex': [complex(i, 1) for i in range(n)],
+        'datetime': [start + timedelta(seconds=i) for i in range(n)],
+    }
+
+
+def bench(name, func, values):
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    elapsed = time.perf_counter() - start
+    print('{:>10}: {:.3f}s ({:.2f}us per value)'.format(
+        name, elapsed, 1e6 * elapsed / len(values)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--n', type=int, default=100000)
+    args = parser.parse_args()
+
+    model = Model()
+    print('Mutable.coerce:')
+    for name, values in make_values(args.n).items():
+        bench(name, lambda value: Mutable.coerce(None, value), values)
+    print('column assignment:')
+    for name, values in make_values(args.n).items():
+        bench(name, lambda value: setattr(model, 'mutable', value), values)
+    print('pickle size:')
+    for name, values in make_values(1).items():
+        print('{:>10}: {} bytes'.format(
+            name, len(pickle.dumps(Mutable.coerce(None, values[0])))
+        ))
+    print('attribute read:')
+    model.id, model.mutable = 1, True
+    reads = [None] * args.n
+    bench('column', lambda value: model.id, reads)
+    bench('coerced', lambda value: model.mutable, reads)
+
+
+if __name__ == '__main__':
+    main()
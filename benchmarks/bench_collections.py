@@ -0,0 +1,63 @@
+"""Speed benchmark for mutable sets and deques
+
+Compares membership checks on a `MutableSet` with a `MutableList`, and
+popping items from the front of a `MutableDeque` with a `MutableList`, for
+collections of `--n` items.
+
+Usage:
+
+```
+python benchmarks/bench_collections.py --n 20000
+```
+"""
+
+from sqlalchemy_mutable import Mutable
+
+import argparse
+import time
+from collections import deque
+
+
+def bench(name, func, n):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print('{:>10}: {:.3f}s ({:.2f}us per item)'.format(
+        name, elapsed, 1e6 * elapsed / n
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--n', type=int, default=20000)
+    args = parser.parse_args()
+    n = args.n
+
+    print('membership:')
+    for name, source in (('list', list(range(n))), ('set', set(range(n)))):
+        items = Mutable.coerce(None, source)
+
+        def contains():
+            for i in range(n):
+                i in items
+
+        bench(name, contains, n)
+
+    print('pop from front:')
+    items = Mutable.coerce(None, list(range(n)))
+    queue = Mutable.coerce(None, deque(range(n)))
+
+    def pop_list():
+        for i in range(n):
+            items.pop(0)
+
+    def pop_deque():
+        for i in range(n):
+            queue.popleft()
+
+    bench('list', pop_list, n)
+    bench('deque', pop_deque, n)
+
+
+if __name__ == '__main__':
+    main()
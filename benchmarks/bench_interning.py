@@ -0,0 +1,81 @@
+"""Memory benchmark for the interning pickler
+
+Loads `--rows` rows whose `MutableType` column repeats the same keys, short
+strings, and small tuples, with and without `InterningPickler`, and reports
+the memory the loaded rows hold (measured with `tracemalloc`).
+
+Usage:
+
+```
+python benchmarks/bench_interning.py --rows 20000
+```
+"""
+
+from sqlalchemy_mutable import InterningPickler, MutableModelBase, MutableType
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+import argparse
+import gc
+import tracemalloc
+
+Base = declarative_base()
+
+
+class Plain(MutableModelBase, Base):
+    __tablename__ = 'plain'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType)
+
+
+class Interned(MutableModelBase, Base):
+    __tablename__ = 'interned'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType(pickler=InterningPickler()))
+
+
+def make_value(i):
+    return {
+        'status': ['pending', 'running', 'done'][i % 3],
+        'category': 'category{}'.format(i % 10),
+        'tags': [('priority', i % 5), ('owner', 'team{}'.format(i % 4))],
+        'settings': {'theme': 'dark', 'language': 'en', 'notify': True},
+    }
+
+
+def measure(session, model_class):
+    session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    rows = session.query(model_class).all()
+    values = [row.mutable for row in rows]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for model_class in (Plain, Interned):
+        session.bulk_save_objects(
+            [model_class(mutable=make_value(i)) for i in range(args.rows)]
+        )
+    session.commit()
+
+    for model_class in (Plain, Interned):
+        current, n = measure(session, model_class)
+        print('{}: {} rows, {:.1f} MB held'.format(
+            model_class.__name__, n, current / 2**20
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Speed benchmark for decoding mutable columns in worker processes
+
+Selects `--rows` raw values of a `MutableType` column, and reports the time
+to decode them in the calling process (as loading the column does) and with
+`decode_parallel`, which decodes them as plain python objects.
+
+Usage:
+
+```
+python benchmarks/bench_parallel.py --rows 20000 --workers 4
+```
+"""
+
+from sqlalchemy_mutable import (
+    MutableModelBase, MutableType, decode_parallel, raw
+)
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+Base = declarative_base()
+
+
+class Model(MutableModelBase, Base):
+    __tablename__ = 'model'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType)
+
+
+def make_value(i):
+    return {
+        'status': ['pending', 'running', 'done'][i % 3],
+        'scores': [j * 0.5 for j in range(10)],
+        'settings': {'theme': 'dark', 'page_size': 50, 'flags': ('a', 'b')},
+        'history': [{'event': 'update', 'count': j} for j in range(5)],
+    }
+
+
+def bench(name, decode):
+    start = time.perf_counter()
+    objs = decode()
+    print('{:>16}: {} rows in {:.3f}s'.format(
+        name, len(objs), time.perf_counter() - start
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.bulk_save_objects(
+        [Model(mutable=make_value(i)) for i in range(args.rows)]
+    )
+    session.commit()
+    values = [row.mutable for row in session.query(raw(Model.mutable))]
+
+    print('{} workers'.format(args.workers))
+    bench('serial', lambda: [pickle.loads(value) for value in values])
+    with ProcessPoolExecutor(args.workers) as executor:
+        # start the workers before timing
+        decode_parallel(values[:1], Model.mutable, executor=executor)
+        bench('parallel plain', lambda: decode_parallel(
+            values, Model.mutable, executor=executor
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Pickling benchmark for mutable trees
+
+Pickles and unpickles `--rows` mutable trees (as `MutableType` columns do),
+and reports the pickled size, the time to pickle and unpickle, and the memory
+which pickling leaves behind on the pickled trees.
+
+Usage:
+
+```
+python benchmarks/bench_pickle.py --rows 2000
+```
+"""
+
+from sqlalchemy_mutable import Mutable
+
+import argparse
+import pickle
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def make_tree(i, depth):
+    tree = Mutable()
+    tree.status = 'done' if i % 2 else 'pending'
+    tree.created = datetime(2020, 1, 1, 12, i % 60)
+    tree.scores = [j * 0.5 for j in range(20)]
+    tree.settings = {
+        'theme': 'dark', 'language': 'en', 'page_size': 50,
+        'flags': {'beta': True, 'admin': False}
+    }
+    nested = tree.history = []
+    for level in range(depth):
+        nested.append({'event': 'update', 'level': level, 'tags': ('a', 'b')})
+        nested.append([])
+        nested = nested[-1]
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=10)
+    args = parser.parse_args()
+
+    trees = [make_tree(i, args.depth) for i in range(args.rows)]
+    start = time.perf_counter()
+    blobs = [pickle.dumps(tree, pickle.HIGHEST_PROTOCOL) for tree in trees]
+    dump_time = time.perf_counter() - start
+    tracemalloc.start()
+    for tree in trees:
+        pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for blob in blobs:
+        pickle.loads(blob)
+    load_time = time.perf_counter() - start
+    print(
+        '{} bytes, dump {:.3f}s, load {:.3f}s, '
+        '{:.2f} MB retained by pickled trees'.format(
+            sum(len(blob) for blob in blobs), dump_time, load_time,
+            retained / 2**20
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
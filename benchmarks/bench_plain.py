@@ -0,0 +1,77 @@
+"""Speed benchmark for plain loading of mutable columns
+
+Loads `--rows` rows of a `MutableType` column and a `MutableCodecType`
+column from an in-memory SQLite database three ways: as model instances, as
+column values, and with `plain`. Reports the time each load takes.
+
+Usage:
+
+```
+python benchmarks/bench_plain.py --rows 20000
+```
+"""
+
+from sqlalchemy_mutable import (
+    MutableCodecType, MutableModelBase, MutableType, plain
+)
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+import argparse
+import time
+
+Base = declarative_base()
+
+
+class Model(MutableModelBase, Base):
+    __tablename__ = 'model'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType)
+    codec = Column(MutableCodecType)
+
+
+def make_value(i):
+    return {
+        'status': ['pending', 'running', 'done'][i % 3],
+        'scores': [j * 0.5 for j in range(10)],
+        'settings': {'theme': 'dark', 'page_size': 50, 'flags': ('a', 'b')},
+        'history': [{'event': 'update', 'count': j} for j in range(5)],
+    }
+
+
+def bench(name, load):
+    start = time.perf_counter()
+    rows = load()
+    print('{:>8}: {} rows in {:.3f}s'.format(
+        name, len(rows), time.perf_counter() - start
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.bulk_save_objects([
+        Model(mutable=make_value(i), codec=make_value(i))
+        for i in range(args.rows)
+    ])
+    session.commit()
+
+    for column in (Model.mutable, Model.codec):
+        print('{}:'.format(column.key))
+        session.expunge_all()
+        bench('models', lambda: [
+            getattr(model, column.key) for model in session.query(Model)
+        ])
+        bench('columns', lambda: session.query(column).all())
+        bench('plain', lambda: session.query(plain(column)).all())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Speed benchmark for mutable sorted lists and ring buffers
+
+Compares keeping a `MutableList` sorted with `append` and `sort` with
+`MutableSortedList.add`, and keeping the last `--size` items of a
+`MutableList` with `append` and `pop(0)` with `MutableRingBuffer.append`.
+Reports the time per write for `--n` writes.
+
+Usage:
+
+```
+python benchmarks/bench_sorted.py --n 10000 --size 10000
+```
+"""
+
+from sqlalchemy_mutable import Mutable, RingBuffer, SortedList
+
+import argparse
+import random
+import time
+
+
+def bench(name, func, n):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print('{:>12}: {:.3f}s ({:.2f}us per write)'.format(
+        name, elapsed, 1e6 * elapsed / n
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--n', type=int, default=10000)
+    parser.add_argument('--size', type=int, default=10000)
+    args = parser.parse_args()
+    n, size = args.n, args.size
+    scores = [random.random() for i in range(n)]
+
+    print('sorted:')
+    items = Mutable.coerce(None, sorted(random.random() for i in range(size)))
+    sorted_items = Mutable.coerce(None, SortedList(items))
+
+    def append_sort():
+        for score in scores:
+            items.append(score)
+            items.sort()
+
+    def add():
+        for score in scores:
+            sorted_items.add(score)
+
+    bench('list', append_sort, n)
+    bench('sorted list', add, n)
+
+    print('bounded:')
+    items = Mutable.coerce(None, list(range(size)))
+    buffer = Mutable.coerce(None, RingBuffer(range(size), capacity=size))
+
+    def append_pop():
+        for score in scores:
+            items.append(score)
+            items.pop(0)
+
+    def append():
+        for score in scores:
+            buffer.append(score)
+
+    bench('list', append_pop, n)
+    bench('ring buffer', append, n)
+
+
+if __name__ == '__main__':
+    main()
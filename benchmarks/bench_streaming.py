@@ -0,0 +1,77 @@
+"""Memory benchmark for streaming rows with mutable columns
+
+Iterates over `--rows` rows whose `MutableType` column holds a mutable tree,
+once with `query.all()` and once with `iter_mutable`, and reports the peak
+memory each iteration allocates (measured with `tracemalloc`).
+
+Usage:
+
+```
+python benchmarks/bench_streaming.py --rows 10000
+```
+"""
+
+from sqlalchemy_mutable import MutableModelBase, MutableType, iter_mutable
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+import argparse
+import gc
+import tracemalloc
+
+Base = declarative_base()
+
+
+class Model(MutableModelBase, Base):
+    __tablename__ = 'model'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType)
+
+
+def make_value(i):
+    return {
+        'status': ['pending', 'running', 'done'][i % 3],
+        'scores': [j * 0.5 for j in range(10)],
+        'history': [{'event': 'update', 'count': j} for j in range(5)],
+    }
+
+
+def measure(session, rows):
+    session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    n = 0
+    for model in rows(session.query(Model)):
+        n += len(model.mutable['history'])
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.bulk_save_objects(
+        [Model(mutable=make_value(i)) for i in range(args.rows)]
+    )
+    session.commit()
+
+    for name, rows in (
+        ('all', lambda query: query.all()),
+        ('iter_mutable', lambda query: iter_mutable(query, args.chunk_size)),
+    ):
+        print('{:>12}: {:.1f} MB peak'.format(
+            name, measure(session, rows) / 2**20
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Stress benchmark for mutable trees shared between threads
+
+A cached configuration tree is read by a pool of threads while one thread in
+every `--write-every` writes to it. The benchmark runs with and without
+`MutableManager.thread_safe` and reports throughput. With locking enabled, it
+also checks that every node still points to the correct root.
+
+Usage:
+
+```
+python benchmarks/bench_threads.py --threads 8 --ops 20000
+```
+"""
+
+from sqlalchemy_mutable import Mutable, MutableDict, MutableManager
+
+import argparse
+import random
+import threading
+import time
+
+
+def make_tree(n_keys):
+    tree = MutableDict()
+    for i in range(n_keys):
+        tree['section{}'.format(i)] = {
+            'values': list(range(10)), 'settings': {'enabled': True}
+        }
+    return tree
+
+
+def worker(tree, n_keys, n_ops, write_every, seed, errors):
+    rand = random.Random(seed)
+    try:
+        for i in range(n_ops):
+            section = tree['section{}'.format(rand.randrange(n_keys))]
+            if i % write_every == 0:
+                section['values'].append(i)
+                section['settings']['last'] = i
+                section['extra'] = [i]
+            else:
+                section['settings'].get('enabled')
+                section['values'][0]
+    except Exception as error:
+        errors.append(error)
+
+
+def check_roots(tree):
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node.root is not tree:
+            return False
+        stack.extend(
+            child for child in node._tracked_children
+            if isinstance(child, Mutable)
+        )
+    return True
+
+
+def run(n_threads, n_keys, n_ops, write_every):
+    tree = make_tree(n_keys)
+    errors = []
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(tree, n_keys, n_ops, write_every, seed, errors)
+        )
+        for seed in range(n_threads)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return tree, elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--keys', type=int, default=50)
+    parser.add_argument('--ops', type=int, default=20000)
+    parser.add_argument('--write-every', type=int, default=20)
+    args = parser.parse_args()
+
+    total_ops = args.threads * args.ops
+    for thread_safe in (False, True):
+        MutableManager.thread_safe = thread_safe
+        tree, elapsed, errors = run(
+            args.threads, args.keys, args.ops, args.write_every
+        )
+        print(
+            'thread_safe={}: {} threads, {:.0f} ops/s, {} errors{}'.format(
+                thread_safe, args.threads, total_ops / elapsed, len(errors),
+                ', roots consistent: {}'.format(check_roots(tree))
+                if thread_safe else ''
+            )
+        )
+    MutableManager.thread_safe = False
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Speed benchmark for tracked attributes of registered tracked types
+
+Compares a tracked type whose attributes are tracked by the generic
+`Mutable.__setattr__` and `Mutable.__getattribute__` methods with a tracked
+type registered with `attrs`, whose attributes are tracked by descriptors.
+Reports the time to convert `--n` objects, and to read and write their
+attributes.
+
+Usage:
+
+```
+python benchmarks/bench_tracked.py --n 100000
+```
+"""
+
+from sqlalchemy_mutable import Mutable
+
+import argparse
+import time
+
+
+class Point():
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class SlottedPoint(Point):
+    pass
+
+
+@Mutable.register_tracked_type(Point)
+class MutablePoint(Point, Mutable):
+    def __init__(self, source=None, root=None):
+        super().__init__(source.x, source.y)
+
+
+@Mutable.register_tracked_type(SlottedPoint, attrs=['x', 'y'])
+class MutableSlottedPoint(SlottedPoint, Mutable):
+    def __init__(self, source=None, root=None):
+        super().__init__(source.x, source.y)
+
+
+def bench(name, func, n):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print('{:>10}: {:.3f}s ({:.2f}us per object)'.format(
+        name, elapsed, 1e6 * elapsed / n
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--n', type=int, default=100000)
+    args = parser.parse_args()
+
+    for origin_type in (Point, SlottedPoint):
+        print('{}:'.format(origin_type.__name__))
+        root = Mutable()
+        points = [origin_type(i, -i) for i in range(args.n)]
+        converted = []
+
+        def convert():
+            converted[:] = [Mutable._convert(p, root, root) for p in points]
+
+        def read():
+            for point in converted:
+                point.x, point.y
+
+        def write():
+            for i, point in enumerate(converted):
+                point.x = i
+
+        bench('convert', convert, args.n)
+        bench('read', read, args.n)
+        bench('write', write, args.n)
+
+
+if __name__ == '__main__':
+    main()
@@ -53,4 +53,69 @@ compile_md(soup, compiler='sklearn', outfile='docs_md/mutable_tuple.md')
 path = 'sqlalchemy_mutable/mutable_partial.py'
 soup = PySoup(path=path, parser='sklearn', src_href=src_href)
 soup.import_path = 'sqlalchemy_mutable'
-compile_md(soup, compiler='sklearn', outfile='docs_md/mutable_partial.md')
\ No newline at end of file
+compile_md(soup, compiler='sklearn', outfile='docs_md/mutable_partial.md')
+
+path = 'sqlalchemy_mutable/mutable_set.py'
+soup = PySoup(path=path, parser='sklearn', src_href=src_href)
+for obj in soup.objects:
+    if hasattr(obj, 'name'):
+        if obj.name in ('MutableSetType', 'MutableSetJSONType'):
+            obj.methods.clear()
+        if obj.name == 'MutableSet':
+            obj.methods = [m for m in obj.methods if m.name == 'unshell']
+soup.import_path = 'sqlalchemy_mutable'
+compile_md(soup, compiler='sklearn', outfile='docs_md/mutable_set.md')
+
+path = 'sqlalchemy_mutable/mutable_deque.py'
+soup = PySoup(path=path, parser='sklearn', src_href=src_href)
+for obj in soup.objects:
+    if hasattr(obj, 'name') and obj.name == 'MutableDeque':
+        obj.methods = [m for m in obj.methods if m.name == 'unshell']
+soup.import_path = 'sqlalchemy_mutable'
+compile_md(soup, compiler='sklearn', outfile='docs_md/mutable_deque.md')
+
+path = 'sqlalchemy_mutable/mutable_sorted_list.py'
+soup = PySoup(path=path, parser='sklearn', src_href=src_href)
+for obj in soup.objects:
+    if hasattr(obj, 'name') and obj.name == 'MutableSortedList':
+        obj.methods.clear()
+soup.import_path = 'sqlalchemy_mutable'
+compile_md(soup, compiler='sklearn', outfile='docs_md/mutable_sorted_list.md')
+
+path = 'sqlalchemy_mutable/mutable_ring_buffer.py'
+soup = PySoup(path=path, parser='sklearn', src_href=src_href)
+soup.rm_properties()
+for obj in soup.objects:
+    if hasattr(obj, 'name') and obj.name == 'MutableRingBuffer':
+        obj.methods = [m for m in obj.methods if m.name == 'unshell']
+soup.import_path = 'sqlalchemy_mutable'
+compile_md(soup, compiler='sklearn', outfile='docs_md/mutable_ring_buffer.md')
+
+path = 'sqlalchemy_mutable/codec.py'
+soup = PySoup(path=path, parser='sklearn', src_href=src_href)
+for obj in soup.objects:
+    if hasattr(obj, 'name') and obj.name == 'MutableCodecType':
+        obj.methods.clear()
+compile_md(soup, compiler='sklearn', outfile='docs_md/codec.md')
+
+# objects which the package does not export are documented with the import
+# path of their module, which is the default
+for module, exported in (
+    ('interning', True),
+    ('mirror', False),
+    ('json_query', False),
+    ('json_patch', False),
+    ('diff', True),
+    ('loading', True),
+    ('streaming', True),
+    ('parallel', True),
+    ('bulk', True),
+    ('references', True),
+):
+    path = 'sqlalchemy_mutable/{}.py'.format(module)
+    soup = PySoup(path=path, parser='sklearn', src_href=src_href)
+    if exported:
+        soup.import_path = 'sqlalchemy_mutable'
+    compile_md(
+        soup, compiler='sklearn', outfile='docs_md/{}.md'.format(module)
+    )
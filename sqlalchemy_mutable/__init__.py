@@ -6,4 +6,23 @@ from .mutable_dict import MutableDict, MutableDictType, MutableDictJSONType
 from .mutable_list import MutableList, MutableListType, MutableListJSONType
 from .mutable_partial import partial
 from .mutable_tuple import MutableTuple, MutableTupleType, MutableTupleJSONType
-from .coerced_types import *
\ No newline at end of file
+from .mutable_set import MutableSet, MutableSetType, MutableSetJSONType
+from .mutable_deque import MutableDeque, MutableDequeType
+from .mutable_sorted_list import (
+    SortedList, MutableSortedList, MutableSortedListType,
+    MutableSortedListJSONType
+)
+from .mutable_ring_buffer import (
+    RingBuffer, MutableRingBuffer, MutableRingBufferType
+)
+from .coerced_types import *
+from .interning import InterningPickler
+from .codec import MutableCodecType
+from .mirror import mirror_column
+from .json_query import json_index
+from .diff import apply_patch, diff
+from .loading import plain, raw
+from .streaming import iter_mutable
+from .parallel import decode_parallel
+from .bulk import bulk_update
+from .references import ReferenceIndex
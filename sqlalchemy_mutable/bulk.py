@@ -0,0 +1,288 @@
+"""# Bulk updates
+
+Changing a mutable column of many rows through the ORM loads every model,
+tracks every change, and flushes one `UPDATE` per row. `bulk_update`
+changes the column without loading models. It selects the stored values in
+chunks, applies a mutation function to each value, and writes each chunk
+back with a single executemany `UPDATE`. Values are stored in the same
+format as when they are set through the ORM, and mirrored columns (see
+`mirror_column`) and reference indexes (see `ReferenceIndex`) are updated
+with them.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from sqlalchemy_mutable import bulk_update
+
+for i in range(3):
+\    model = MyModel()
+\    model.mutable = {'settings': {'theme': 'dark'}}
+\    session.add(model)
+session.commit()
+
+def set_theme(value):
+\    value['settings']['theme'] = 'light'
+
+bulk_update(session, MyModel.mutable, set_theme)
+session.commit()
+[model.mutable['settings']['theme'] for model in MyModel.query.all()]
+```
+
+Out:
+
+```
+['light', 'light', 'light']
+```
+
+Pass `(primary key, mutation)` pairs (e.g. a dictionary) instead of a
+function to mutate rows individually.
+
+```python
+bulk_update(session, MyModel.mutable, {
+\    1: lambda value: value['settings'].update({'theme': 'blue'}),
+\    2: lambda value: {'settings': {}},
+})
+```
+"""
+
+from .codec import MutableCodecType, decode, encode
+from .loading import raw
+from .mirror import get_path
+from .model_shell import ModelShell
+from .mutable import Mutable
+from .references import _identity_str, _indexes, _refs
+
+from sqlalchemy import and_, bindparam, inspect, select, tuple_
+from sqlalchemy.types import LargeBinary, PickleType
+
+import os
+import pickle
+from collections import deque
+
+
+def bulk_update(
+    session, column, mutate, where=None, chunk_size=1000, executor=None
+):
+    """
+    Update a mutable column of many rows without loading models.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+        Session in whose transaction to update the rows.
+
+    column : sqlalchemy.orm.attributes.InstrumentedAttribute
+        Mutable column attribute of a model class.
+
+    mutate : callable or iterable of (primary key, callable) pairs
+        Function which takes the value of the column. The function may change
+        the value in place and return `None`, or return a new value. Pairs
+        (or a dictionary) map primary keys to the functions for their rows.
+        Primary keys of models with composite primary keys are tuples.
+
+    where : sqlalchemy.sql.ColumnElement or None, default=None
+        Condition which selects the rows to update when `mutate` is a
+        function. If `None`, all rows are updated.
+
+    chunk_size : int, default=1000
+        Number of rows to select and update at a time.
+
+    executor : concurrent.futures.Executor or None, default=None
+        Executor which mutates and serializes the chunks of `MutableType` and
+        `MutableCodecType` columns, e.g. a `ProcessPoolExecutor`. Mutation
+        functions must then be picklable, i.e. defined at module level. Two
+        chunks per worker are selected and submitted ahead of the chunk being
+        written. If `None`, chunks are processed in the calling process.
+
+    Returns
+    -------
+    count : int
+        Number of rows updated.
+
+    Notes
+    -----
+    The session is flushed before the rows are selected, so the update
+    starts from the pending changes of its models. Models loaded in the
+    session have the column and its mirrored columns expired after the
+    update, so they are loaded again on the next access.
+    """
+    session.flush()
+    mapper = inspect(column.class_)
+    table_column = column.property.columns[0]
+    pk_columns = list(mapper.primary_key)
+    type_ = table_column.type
+    binary = isinstance(type_, (MutableCodecType, PickleType))
+    mirror_props = [
+        prop for prop in mapper.column_attrs
+        if prop.columns[0].info.get('mutable_mirror', (None,))[0]
+        == column.key
+    ]
+    mirrors = [
+        (prop.columns[0], prop.columns[0].info['mutable_mirror'][1])
+        for prop in mirror_props
+    ]
+    expired_keys = [column.key] + [prop.key for prop in mirror_props]
+    if callable(mutate):
+        pk_query = select(pk_columns)
+        if where is not None:
+            pk_query = pk_query.where(where)
+        pks = [tuple(row) for row in session.execute(pk_query)]
+        mutations = None
+    else:
+        mutations = {
+            pk if isinstance(pk, tuple) else (pk,): func
+            for pk, func in dict(mutate).items()
+        }
+        pks = list(mutations)
+    chunks = [pks[i:i+chunk_size] for i in range(0, len(pks), chunk_size)]
+
+    pk_params = ['_pk{}'.format(i) for i in range(len(pk_columns))]
+    update = table_column.table.update().where(and_(*[
+        pk_column == bindparam(param)
+        for pk_column, param in zip(pk_columns, pk_params)
+    ])).values({
+        table_column: bindparam(
+            '_value', type_=LargeBinary if binary else type_
+        ),
+        **{
+            mirror: bindparam('_mirror{}'.format(i), type_=mirror.type)
+            for i, (mirror, path) in enumerate(mirrors)
+        }
+    })
+    value_column = raw(table_column) if binary else table_column
+    coder = _coder(type_)
+    mutable_class = Mutable._associated_class(type_)
+    paths = [path for mirror, path in mirrors]
+    indexes = [
+        index for index in _indexes if column.key in index._keys(mapper)
+    ]
+    referrer_key = ModelShell._get_model_key(mapper.class_)
+
+    def select_chunk(chunk):
+        if len(pk_columns) == 1:
+            condition = pk_columns[0].in_([pk[0] for pk in chunk])
+        else:
+            condition = tuple_(*pk_columns).in_(chunk)
+        rows = session.execute(
+            select(pk_columns + [value_column]).where(condition)
+        )
+        return [
+            (
+                tuple(row[:-1]), row[-1],
+                mutate if mutations is None else mutations[tuple(row[:-1])]
+            )
+            for row in rows
+        ]
+
+    chunk_args = (coder, mutable_class, paths, bool(indexes))
+    if executor is None or not binary:
+        results = (
+            _mutate_chunk(*chunk_args, select_chunk(chunk))
+            for chunk in chunks
+        )
+    else:
+        results = _map_ahead(executor, _mutate_chunk, (
+            chunk_args + (select_chunk(chunk),) for chunk in chunks
+        ))
+    count = 0
+    for result in results:
+        if not result:
+            continue
+        session.execute(update, [
+            {
+                **dict(zip(pk_params, pk)), '_value': value,
+                **{
+                    '_mirror{}'.format(i): mirror_value
+                    for i, mirror_value in enumerate(mirror_values)
+                }
+            }
+            for pk, value, mirror_values, refs in result
+        ])
+        count += len(result)
+        for index in indexes:
+            index._replace(session, referrer_key, column.key, [
+                (_identity_str(pk), refs)
+                for pk, value, mirror_values, refs in result
+            ])
+        for pk, value, mirror_values, refs in result:
+            model = session.identity_map.get(
+                mapper.identity_key_from_primary_key(list(pk))
+            )
+            if model is not None:
+                session.expire(model, expired_keys)
+    return count
+
+
+def _map_ahead(executor, func, arg_tuples):
+    """
+    Like `executor.map`, but submits at most two calls per worker ahead of
+    the result being consumed. `arg_tuples` is only iterated as calls are
+    submitted, so the arguments of later calls are not created in advance.
+    """
+    # thread and process pool executors store their number of workers in
+    # `_max_workers`
+    window = 2 * (getattr(executor, '_max_workers', None) or os.cpu_count())
+    pending = deque()
+    for args in arg_tuples:
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _coder(type_):
+    """
+    Picklable description of how to load and dump the values of a column
+    type, or `None` if the values are loaded and dumped by the column type.
+    """
+    if isinstance(type_, MutableCodecType):
+        return 'codec', None, None
+    if isinstance(type_, PickleType):
+        # the pickle module itself cannot be sent to worker processes
+        pickler = None if type_.pickler is pickle else type_.pickler
+        return 'pickle', pickler, type_.protocol
+
+
+def _load(coder, data):
+    kind, pickler, protocol = coder
+    if kind == 'codec':
+        return decode(data)
+    return (pickle if pickler is None else pickler).loads(data)
+
+
+def _dump(coder, value):
+    kind, pickler, protocol = coder
+    if kind == 'codec':
+        return encode(value)
+    return (pickle if pickler is None else pickler).dumps(value, protocol)
+
+
+def _mutate_chunk(coder, mutable_class, paths, indexed, rows):
+    """
+    Mutate the values of a chunk of rows. New values are coerced by the
+    mutable class associated with the column type.
+
+    Returns
+    -------
+    results : list of (primary key, value, mirrored values, references)
+        New values, serialized if `coder` is not `None`. References (see
+        `ReferenceIndex`) are `None` if `indexed` is `False`.
+    """
+    results = []
+    for pk, value, mutate in rows:
+        if coder is not None and value is not None:
+            value = _load(coder, value)
+        new_value = mutate(value)
+        if new_value is not None:
+            value = new_value
+            if coder is not None:
+                value = mutable_class.coerce(None, value)
+        mirror_values = tuple(get_path(value, path) for path in paths)
+        refs = _refs(value) if indexed else None
+        if coder is not None and value is not None:
+            value = _dump(coder, value)
+        results.append((pk, value, mirror_values, refs))
+    return results
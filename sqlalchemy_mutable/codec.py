@@ -0,0 +1,545 @@
+"""# Binary codec
+
+`MutableCodecType` columns serialize mutable objects with a compact binary
+codec instead of pickle. The codec knows the tracked types (`MutableList`,
+`MutableDict`, `MutableTuple`, `MutableSet`, `MutableDeque`, and `Mutable`
+objects), the coerced types, and stored models, and writes them as one-byte
+type tags followed by their contents. Stored models are written as their
+table name and primary key. Other objects are pickled.
+
+On loading, the codec rebuilds a mutable object in a single pass. Roots are
+set as objects are created, so there is no recursive root assignment after
+loading.
+
+Notes
+-----
+1. The codec writes a shared object once for each reference to it, and does
+not support reference cycles.
+2. Subclasses of tracked and coerced types (e.g. `HTMLAttrs`) are pickled, so
+they keep their class.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md), but initialize the
+`mutable` column with `MutableCodecType`.
+
+```python
+from sqlalchemy_mutable.codec import MutableCodecType
+
+class MyModel(MutableModelBase, Base):
+\    __tablename__ = 'mymodel'
+\    id = Column(Integer, primary_key=True)
+\    mutable = Column(MutableCodecType)
+
+model = MyModel()
+model.mutable = {'hello': ['world']}
+session.add(model)
+session.commit()
+model.mutable['hello'].append('moon')
+session.commit()
+model.mutable
+```
+
+Out:
+
+```
+{'hello': ['world', 'moon']}
+```
+"""
+
+from .coerced_types import (
+    CoercedBool, CoercedComplex, CoercedDatetime, CoercedFloat, CoercedInt,
+    CoercedModelShell, CoercedStr
+)
+from .model_shell import ModelShell
+from .mutable import Mutable
+from .mutable_deque import MutableDeque
+from .mutable_dict import MutableDict
+from .mutable_list import MutableList
+from .mutable_set import MutableSet
+from .mutable_tuple import MutableTuple
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+import pickle
+from collections import deque
+from datetime import datetime
+from struct import Struct
+
+FORMAT_VERSION = 1
+
+# type tags
+NONE, TRUE, FALSE = 0x00, 0x01, 0x02
+INT8, INT32, INT64, BIGINT = 0x03, 0x04, 0x05, 0x06
+FLOAT, COMPLEX, DATETIME = 0x07, 0x08, 0x09
+STR8, STR32, BYTES = 0x0a, 0x0b, 0x0c
+LIST8, LIST32, DICT8, DICT32, TUPLE8, TUPLE32 = range(0x0d, 0x13)
+MUTABLE, SHELL, PICKLE = 0x13, 0x14, 0x15
+SET8, SET32, DEQUE8, DEQUE32 = range(0x16, 0x1a)
+
+_int8, _int32, _int64 = Struct('<b'), Struct('<i'), Struct('<q')
+_uint8, _uint32 = Struct('<B'), Struct('<I')
+_float, _complex = Struct('<d'), Struct('<dd')
+
+
+def encode(obj):
+    """
+    Encode an object.
+
+    Parameters
+    ----------
+    obj :
+        Object to encode.
+
+    Returns
+    -------
+    data : bytes
+        Encoded object.
+    """
+    buf = bytearray((FORMAT_VERSION,))
+    _encode(obj, buf)
+    return bytes(buf)
+
+
+def decode(data):
+    """
+    Decode an object.
+
+    Parameters
+    ----------
+    data : bytes
+        Encoded object.
+
+    Returns
+    -------
+    obj :
+        Decoded object. Lists, dictionaries, and tuples are decoded as
+        mutable objects with their roots set.
+    """
+    if data[0] != FORMAT_VERSION:
+        raise ValueError(
+            'Unsupported codec format version {}'.format(data[0])
+        )
+    return _Decoder(data).decode(None)
+
+
+# Encoding
+def _encode(obj, buf):
+    _encoders.get(type(obj), _encode_pickle)(obj, buf)
+
+
+def _encode_size(n, buf, small_tag, large_tag):
+    if n < 256:
+        buf.append(small_tag)
+        buf.append(n)
+    else:
+        buf.append(large_tag)
+        buf += _uint32.pack(n)
+
+
+def _encode_none(obj, buf):
+    buf.append(NONE)
+
+
+def _encode_bool(obj, buf):
+    buf.append(TRUE if obj else FALSE)
+
+
+def _encode_coerced_bool(obj, buf):
+    _encode_bool(obj.value, buf)
+
+
+def _encode_int(obj, buf):
+    if -0x80 <= obj < 0x80:
+        buf.append(INT8)
+        buf += _int8.pack(obj)
+    elif -0x80000000 <= obj < 0x80000000:
+        buf.append(INT32)
+        buf += _int32.pack(obj)
+    elif -0x8000000000000000 <= obj < 0x8000000000000000:
+        buf.append(INT64)
+        buf += _int64.pack(obj)
+    else:
+        data = int(obj).to_bytes(
+            obj.bit_length() // 8 + 1, 'little', signed=True
+        )
+        buf.append(BIGINT)
+        buf += _uint32.pack(len(data))
+        buf += data
+
+
+def _encode_float(obj, buf):
+    buf.append(FLOAT)
+    buf += _float.pack(obj)
+
+
+def _encode_complex(obj, buf):
+    buf.append(COMPLEX)
+    buf += _complex.pack(obj.real, obj.imag)
+
+
+def _encode_datetime(obj, buf):
+    # the pickle state of a datetime is 10 bytes, followed by its tzinfo
+    state = datetime.__reduce_ex__(obj, 4)[1]
+    buf.append(DATETIME)
+    buf += state[0]
+    _encode(state[1] if len(state) > 1 else None, buf)
+
+
+def _encode_str(obj, buf):
+    data = obj.encode('utf-8')
+    _encode_size(len(data), buf, STR8, STR32)
+    buf += data
+
+
+def _encode_bytes(obj, buf):
+    buf.append(BYTES)
+    buf += _uint32.pack(len(obj))
+    buf += obj
+
+
+def _encode_list(obj, buf):
+    _encode_size(len(obj), buf, LIST8, LIST32)
+    for item in list.__iter__(obj):
+        _encode(item, buf)
+
+
+def _encode_dict(obj, buf):
+    _encode_size(len(obj), buf, DICT8, DICT32)
+    for key, val in dict.items(obj):
+        _encode(key, buf)
+        _encode(val, buf)
+
+
+def _encode_tuple(obj, buf):
+    _encode_size(len(obj), buf, TUPLE8, TUPLE32)
+    for item in obj:
+        _encode(item, buf)
+
+
+def _encode_set(obj, buf):
+    _encode_size(len(obj), buf, SET8, SET32)
+    for item in set.__iter__(obj):
+        _encode(item, buf)
+
+
+def _encode_deque(obj, buf):
+    _encode_size(len(obj), buf, DEQUE8, DEQUE32)
+    _encode(obj.maxlen, buf)
+    for item in deque.__iter__(obj):
+        _encode(item, buf)
+
+
+def _encode_mutable(obj, buf):
+    state = obj.__dict__
+    names = state['_tracked_attr_names']
+    buf.append(MUTABLE)
+    buf += _uint32.pack(len(names))
+    for name in names:
+        _encode_str(name, buf)
+        _encode(state[name], buf)
+
+
+def _encode_shell(obj, buf):
+    # the id is a tuple only for composite primary keys
+    buf.append(SHELL)
+    _encode_str(obj.model_key, buf)
+    _encode(obj.id, buf)
+
+
+def _encode_pickle(obj, buf):
+    data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    buf.append(PICKLE)
+    buf += _uint32.pack(len(data))
+    buf += data
+
+
+_encoders = {
+    type(None): _encode_none,
+    bool: _encode_bool,
+    CoercedBool: _encode_coerced_bool,
+    int: _encode_int,
+    CoercedInt: _encode_int,
+    float: _encode_float,
+    CoercedFloat: _encode_float,
+    complex: _encode_complex,
+    CoercedComplex: _encode_complex,
+    datetime: _encode_datetime,
+    CoercedDatetime: _encode_datetime,
+    str: _encode_str,
+    CoercedStr: _encode_str,
+    bytes: _encode_bytes,
+    list: _encode_list,
+    MutableList: _encode_list,
+    dict: _encode_dict,
+    MutableDict: _encode_dict,
+    tuple: _encode_tuple,
+    MutableTuple: _encode_tuple,
+    set: _encode_set,
+    MutableSet: _encode_set,
+    deque: _encode_deque,
+    MutableDeque: _encode_deque,
+    Mutable: _encode_mutable,
+    ModelShell: _encode_shell,
+    CoercedModelShell: _encode_shell,
+}
+
+
+# Decoding
+class _Decoder():
+    """
+    Decodes objects from `data`, starting after the format version byte.
+
+    Each `decode_<type>` method takes the root of the object being decoded.
+    A `root` of `None` indicates that the object is the root. `parent` is the 
+    mutable object whose children are being decoded.
+    """
+    def __init__(self, data):
+        self.data = data
+        self.pos = 1
+        self.parent = None
+
+    def decode(self, root):
+        tag = self.data[self.pos]
+        self.pos += 1
+        return self._decoders[tag](self, root)
+
+    def _unpack(self, struct):
+        value = struct.unpack_from(self.data, self.pos)
+        self.pos += struct.size
+        return value
+
+    def _read(self, n):
+        value = self.data[self.pos:self.pos+n]
+        self.pos += n
+        return value
+
+    def decode_none(self, root):
+        return None
+
+    def decode_true(self, root):
+        return True
+
+    def decode_false(self, root):
+        return False
+
+    def decode_int8(self, root):
+        return self._unpack(_int8)[0]
+
+    def decode_int32(self, root):
+        return self._unpack(_int32)[0]
+
+    def decode_int64(self, root):
+        return self._unpack(_int64)[0]
+
+    def decode_bigint(self, root):
+        n = self._unpack(_uint32)[0]
+        return int.from_bytes(self._read(n), 'little', signed=True)
+
+    def decode_float(self, root):
+        return self._unpack(_float)[0]
+
+    def decode_complex(self, root):
+        return complex(*self._unpack(_complex))
+
+    def decode_datetime(self, root):
+        state = bytes(self._read(10))
+        tzinfo = self.decode(None)
+        if tzinfo is None:
+            return datetime(state)
+        return datetime(state, tzinfo)
+
+    def decode_str8(self, root):
+        n = self._unpack(_uint8)[0]
+        return str(self._read(n), 'utf-8')
+
+    def decode_str32(self, root):
+        n = self._unpack(_uint32)[0]
+        return str(self._read(n), 'utf-8')
+
+    def decode_bytes(self, root):
+        n = self._unpack(_uint32)[0]
+        return bytes(self._read(n))
+
+    def _new_mutable(self, cls, python_type, root):
+        new = super(Mutable, cls).__new__(cls)
+        new.__dict__.update(
+            _python_type=python_type, _tracked_attr_names=set(), _root=root, 
+            _parent=self.parent
+        )
+        return new
+
+    def _decode_list(self, n, root):
+        new = self._new_mutable(MutableList, list, root)
+        child_root = new if root is None else root
+        parent, self.parent = self.parent, new
+        list.extend(new, [self.decode(child_root) for i in range(n)])
+        self.parent = parent
+        return new
+
+    def decode_list8(self, root):
+        return self._decode_list(self._unpack(_uint8)[0], root)
+
+    def decode_list32(self, root):
+        return self._decode_list(self._unpack(_uint32)[0], root)
+
+    def _decode_dict(self, n, root):
+        new = self._new_mutable(MutableDict, dict, root)
+        child_root = new if root is None else root
+        parent, self.parent = self.parent, new
+        decode = self.decode
+        for i in range(n):
+            key = decode(child_root)
+            dict.__setitem__(new, key, decode(child_root))
+        self.parent = parent
+        return new
+
+    def decode_dict8(self, root):
+        return self._decode_dict(self._unpack(_uint8)[0], root)
+
+    def decode_dict32(self, root):
+        return self._decode_dict(self._unpack(_uint32)[0], root)
+
+    def _decode_tuple(self, n, root):
+        # the items of a tuple are decoded before the tuple exists, so the
+        # root of a root tuple's items is set after the tuple is created
+        new = tuple.__new__(
+            MutableTuple, [self.decode(root) for i in range(n)]
+        )
+        new.__dict__.update(
+            _python_type=tuple, _tracked_attr_names=set(), _root=root, 
+            _parent=self.parent
+        )
+        if root is None:
+            new.root = None
+        else:
+            for item in tuple.__iter__(new):
+                if isinstance(item, Mutable):
+                    item.__dict__['_parent'] = new
+        return new
+
+    def decode_tuple8(self, root):
+        return self._decode_tuple(self._unpack(_uint8)[0], root)
+
+    def decode_tuple32(self, root):
+        return self._decode_tuple(self._unpack(_uint32)[0], root)
+
+    def _decode_set(self, n, root):
+        # set items are stored as they are, so they are decoded as roots
+        new = self._new_mutable(MutableSet, set, root)
+        set.update(new, [_frozen(self.decode(None)) for i in range(n)])
+        return new
+
+    def decode_set8(self, root):
+        return self._decode_set(self._unpack(_uint8)[0], root)
+
+    def decode_set32(self, root):
+        return self._decode_set(self._unpack(_uint32)[0], root)
+
+    def _decode_deque(self, n, root):
+        new = self._new_mutable(MutableDeque, deque, root)
+        deque.__init__(new, (), self.decode(None))
+        child_root = new if root is None else root
+        parent, self.parent = self.parent, new
+        deque.extend(new, [self.decode(child_root) for i in range(n)])
+        self.parent = parent
+        return new
+
+    def decode_deque8(self, root):
+        return self._decode_deque(self._unpack(_uint8)[0], root)
+
+    def decode_deque32(self, root):
+        return self._decode_deque(self._unpack(_uint32)[0], root)
+
+    def decode_mutable(self, root):
+        new = self._new_mutable(Mutable, None, root)
+        child_root = new if root is None else root
+        parent, self.parent = self.parent, new
+        state = new.__dict__
+        for i in range(self._unpack(_uint32)[0]):
+            name = self.decode(None)
+            state[name] = self.decode(child_root)
+            state['_tracked_attr_names'].add(name)
+        self.parent = parent
+        return new
+
+    def decode_shell(self, root):
+        shell = ModelShell.__new__(ModelShell)
+        shell.model_key = self.decode(None)
+        id = self.decode(None)
+        shell.identity = tuple(id) if isinstance(id, tuple) else (id,)
+        return shell
+
+    def decode_pickle(self, root):
+        n = self._unpack(_uint32)[0]
+        obj = pickle.loads(self._read(n))
+        if root is not None and isinstance(obj, Mutable):
+            obj.root = root
+            obj.__dict__['_parent'] = self.parent
+        return obj
+
+
+_decoder_names = [
+    (NONE, 'decode_none'),
+    (TRUE, 'decode_true'),
+    (FALSE, 'decode_false'),
+    (INT8, 'decode_int8'),
+    (INT32, 'decode_int32'),
+    (INT64, 'decode_int64'),
+    (BIGINT, 'decode_bigint'),
+    (FLOAT, 'decode_float'),
+    (COMPLEX, 'decode_complex'),
+    (DATETIME, 'decode_datetime'),
+    (STR8, 'decode_str8'),
+    (STR32, 'decode_str32'),
+    (BYTES, 'decode_bytes'),
+    (LIST8, 'decode_list8'),
+    (LIST32, 'decode_list32'),
+    (DICT8, 'decode_dict8'),
+    (DICT32, 'decode_dict32'),
+    (TUPLE8, 'decode_tuple8'),
+    (TUPLE32, 'decode_tuple32'),
+    (MUTABLE, 'decode_mutable'),
+    (SHELL, 'decode_shell'),
+    (PICKLE, 'decode_pickle'),
+    (SET8, 'decode_set8'),
+    (SET32, 'decode_set32'),
+    (DEQUE8, 'decode_deque8'),
+    (DEQUE32, 'decode_deque32'),
+]
+
+
+def _frozen(obj):
+    """Convert the mutable tuples in a decoded set item to tuples"""
+    if isinstance(obj, MutableTuple):
+        return tuple(_frozen(item) for item in tuple.__iter__(obj))
+    return obj
+
+
+def _decoder_table(decoder_class):
+    """Map type tags to the decoding methods of `decoder_class`"""
+    table = [None] * (max(tag for tag, name in _decoder_names) + 1)
+    for tag, name in _decoder_names:
+        table[tag] = getattr(decoder_class, name)
+    return table
+
+
+_Decoder._decoders = _decoder_table(_Decoder)
+
+
+class MutableCodecType(TypeDecorator):
+    """
+    Mutable column type with binary codec serialization. `MutableCodecType`
+    columns accept the same objects as `MutableType` columns.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else encode(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decode(value)
+
+
+Mutable.associate_with(MutableCodecType)
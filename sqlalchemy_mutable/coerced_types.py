@@ -69,64 +69,140 @@ Out:
 """
 
 from .model_shell import ModelShell
-from .mutable import Mutable
+from .mutable import Mutable, _reconstruct, _unwrappers
 
 import types
 from datetime import datetime
 
+
+class _CoercedValue():
+    """
+    Mixin for coerced types whose values are immutable. Copy-on-write clones 
+    of immutable values are ordinary copies.
+
+    Coerced values are roots without tracked attributes, so their bookkeeping 
+    attributes are class defaults. New objects skip the root setting of 
+    `Mutable.__new__`, and have no state to pickle.
+    """
+    _tracked_attr_names = frozenset()
+    _root = None
+    _parent = None
+
+    def __new__(cls, source, root=None):
+        new = super(Mutable, cls).__new__(cls, source)
+        if root is not None:
+            new.__dict__['_root'] = root
+        return new
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        # values pickled by earlier versions store bookkeeping attributes, 
+        # which the class defaults replace
+        pass
+
+    def _cow_copy(self, root):
+        return self.__class__(self)
+
+
+class _CoercedBox():
+    """
+    Mixin for coerced types which hold their value in the attribute 
+    `_value_name`. Like `_CoercedValue`, the bookkeeping attributes are class 
+    defaults, and the value is the only state. Setting any other tracked 
+    attribute, or deleting the value, raises an `AttributeError`.
+    """
+    _python_type = None
+    _root = None
+    _parent = None
+
+    def __new__(cls, source=None):
+        new = _reconstruct(cls)
+        new.__dict__[cls._value_name] = source
+        return new
+
+    def __setattr__(self, name, obj):
+        if name != self._value_name and name not in self._untracked_attr_names:
+            raise AttributeError(
+                "'{}' object can only set attribute '{}', not '{}'".format(
+                    type(self).__name__, self._value_name, name
+                )
+            )
+        super().__setattr__(name, obj)
+
+    def __delattr__(self, name):
+        if name in self._untracked_attr_names:
+            return super().__delattr__(name)
+        raise AttributeError(
+            "'{}' object attribute '{}' cannot be deleted".format(
+                type(self).__name__, name
+            )
+        )
+
+    def __setstate__(self, state):
+        name = self._value_name
+        self.__dict__[name] = state[name]
+
+    def _cow_copy(self, root):
+        return self.__class__(self.__dict__[self._value_name])
+
+
 @Mutable.register_coerced_type(ModelShell)
 class CoercedModelShell(Mutable, ModelShell):
     def __init__(self, source):
-        self.id = source.id
-        self.model_class = source.model_class
+        self.model_key = source.model_key
+        self.identity = source.identity
+
+    def __setstate__(self, state):
+        super().__setstate__(self._convert_state(state))
 
 @Mutable.register_coerced_type(bool)
-class CoercedBool(Mutable):
-    def __new__(cls, source=None):
-        new = super().__new__(cls)
-        new.value = source
-        return new
+class CoercedBool(_CoercedBox, Mutable):
+    _value_name = 'value'
+    _tracked_attr_names = frozenset([_value_name])
 
 @Mutable.register_coerced_type(complex)
-class CoercedComplex(Mutable, complex):
-    pass
+class CoercedComplex(_CoercedValue, Mutable, complex):
+    _python_type = complex
+
+    def __getnewargs__(self):
+        # `complex.__getnewargs__` returns the real and imaginary parts, the 
+        # second of which `__new__` would take as the root
+        return (complex(self),)
 
 @Mutable.register_coerced_type(float)
-class CoercedFloat(Mutable, float):
-    pass
+class CoercedFloat(_CoercedValue, Mutable, float):
+    _python_type = float
     
 @Mutable.register_coerced_type(int)
-class CoercedInt(Mutable, int):
-    pass
+class CoercedInt(_CoercedValue, Mutable, int):
+    _python_type = int
 
 @Mutable.register_coerced_type(str)
-class CoercedStr(Mutable, str):
-    pass
+class CoercedStr(_CoercedValue, Mutable, str):
+    _python_type = str
 
 @Mutable.register_coerced_type(types.FunctionType)
-class CoercedFunc(Mutable):
-    def __new__(cls, source=None):
-        new = super().__new__(cls)
-        new.func = source
-        return new
-    
+class CoercedFunc(_CoercedBox, Mutable):
+    _value_name = 'func'
+    _tracked_attr_names = frozenset([_value_name])
+
     def __call__(self, *args, **kwargs):
         return self.func(*args, **kwargs)
 
+_unwrappers[CoercedBool] = lambda obj: obj.__dict__['value']
+_unwrappers[CoercedModelShell] = ModelShell.unshell
+
 @Mutable.register_coerced_type(datetime)
-class CoercedDatetime(Mutable, datetime):
-    def __new__(cls, source):
+class CoercedDatetime(_CoercedValue, Mutable, datetime):
+    _python_type = datetime
+
+    def __new__(cls, source, *args):
         if isinstance(source, datetime):
-            return datetime.__new__(
-                cls,
-                source.year,
-                source.month,
-                source.day,
-                source.hour,
-                source.minute,
-                source.second,
-                source.microsecond,
-                source.tzinfo,
-                fold=source.fold
-            )
-        return super().__new__(cls, source)
\ No newline at end of file
+            # copying the pickle state is faster than copying field by field
+            args = source.__reduce_ex__(4)[1]
+        else:
+            # unpickling, where the arguments are the pickle state
+            args = (source,) + args
+        return datetime.__new__(cls, *args)
@@ -0,0 +1,254 @@
+"""# Diffs
+
+`diff` compares two mutable objects and returns a patch, a list of the
+operations which turn the first into the second. `apply_patch` applies a
+patch to a mutable object.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from sqlalchemy_mutable import apply_patch, diff
+
+model = MyModel()
+model.mutable = {'settings': {'theme': 'dark'}, 'history': ['created']}
+old = model.mutable
+# the clone shares its unchanged children with `old`
+model.mutable = old.clone()
+model.mutable['settings']['theme'] = 'light'
+model.mutable['history'].append('theme')
+patch = diff(old, model.mutable)
+print(patch)
+apply_patch(old, patch)
+```
+
+Out:
+
+```
+[('set', ('settings', 'theme'), 'light'), ('extend', ('history',), ['theme'])]
+{'settings': {'theme': 'light'}, 'history': ['created', 'theme']}
+```
+
+Patches are lists of tuples:
+
+1. `('set', path, value)` sets the item or attribute at `path` to `value`.
+2. `('remove', path)` deletes the item or attribute at `path`.
+3. `('extend', path, items)` appends `items` to the list at `path`.
+4. `('update', path, items)` adds `items` to the sorted list at `path`.
+5. `('truncate', path, length)` removes the items of the list at `path` from
+index `length` on.
+
+Sets and deques which differ are set as a whole, and so are sorted lists,
+unless items were only added to or removed from their end.
+"""
+
+from .coerced_types import _CoercedValue
+from .mutable import Mutable
+from .mutable_deque import MutableDeque
+from .mutable_dict import MutableDict
+from .mutable_list import MutableList
+from .mutable_ring_buffer import MutableRingBuffer, RingBuffer
+from .mutable_set import MutableSet
+from .mutable_sorted_list import MutableSortedList, SortedList
+from .mutable_tuple import MutableTuple
+
+import copy
+from collections import deque
+from operator import is_
+
+
+def diff(a, b):
+    """
+    Compare two mutable objects.
+
+    Subtrees are skipped without comparing their contents when `a` and `b`
+    share them (e.g. the children of a clone which the clone has not
+    copied), or when one is a copy-on-write copy of the other and neither
+    changed since the copy was made (see `Mutable.clone`). The comparison
+    therefore only visits the changed parts of a clone and their parents.
+
+    When the shared part of two lists holds identical objects (e.g. items
+    were appended to or removed from the end of a list), it is checked by
+    identity in one pass, and its items are not diffed one by one.
+
+    Parameters
+    ----------
+    a :
+        Original object.
+
+    b :
+        Changed object.
+
+    Returns
+    -------
+    patch : list of tuple
+        Operations which turn `a` into `b`.
+    """
+    patch = []
+    _diff(a, b, (), patch)
+    return patch
+
+
+def _unchanged(a, b):
+    """
+    Indicates that one of `a` and `b` is a copy-on-write copy of the other,
+    and that neither changed since the copy was made. Copies hold a weak
+    reference to their source, which is dead once the source is collected.
+    """
+    for source, copy in ((a, b), (b, a)):
+        origin = copy.__dict__.get('_cow_source')
+        if origin is not None and origin[0]() is source:
+            return (
+                source.__dict__.get('_version', 0) == origin[1]
+                == copy.__dict__.get('_version', 0)
+            )
+    return False
+
+
+def _diff(a, b, path, patch):
+    if a is b:
+        return
+    if isinstance(a, Mutable) and isinstance(b, Mutable) and _unchanged(a, b):
+        return
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in dict.keys(a):
+            if not dict.__contains__(b, key):
+                patch.append(('remove', path + (key,)))
+        for key, b_item in dict.items(b):
+            if dict.__contains__(a, key):
+                _diff(dict.__getitem__(a, key), b_item, path + (key,), patch)
+            else:
+                patch.append(('set', path + (key,), b_item))
+    elif isinstance(a, list) and isinstance(b, list):
+        n = min(len(a), len(b))
+        shared = all(map(is_, list.__iter__(a), list.__iter__(b)))
+        is_sorted = isinstance(a, SortedList) or isinstance(b, SortedList)
+        if is_sorted and (type(a) is not type(b) or not shared):
+            # items of sorted lists cannot be set by their index
+            if type(a) is not type(b) or a != b:
+                patch.append(('set', path, b))
+            return
+        if not shared:
+            for i, (a_item, b_item) in enumerate(zip(
+                list.__iter__(a), list.__iter__(b)
+            )):
+                _diff(a_item, b_item, path + (i,), patch)
+        if len(b) > n:
+            items = list.__getitem__(b, slice(n, None))
+            patch.append(('update' if is_sorted else 'extend', path, items))
+        elif len(a) > n:
+            patch.append(('truncate', path, n))
+    elif isinstance(a, (set, deque)) and type(a) is type(b):
+        # set items have no keys, and extending a deque with a maximum
+        # length discards items, so changed sets and deques are replaced
+        if a != b or getattr(a, 'maxlen', None) != getattr(b, 'maxlen', None):
+            patch.append(('set', path, b))
+    elif (
+        type(a) is type(b) and isinstance(a, Mutable)
+        and not isinstance(a, tuple) and hasattr(a, '_tracked_attr_names')
+    ):
+        a_state, b_state = a.__dict__, b.__dict__
+        a_names, b_names = a._tracked_attr_names, b._tracked_attr_names
+        for name in a_names - b_names:
+            patch.append(('remove', path + (name,)))
+        for name in b_names:
+            if name in a_names:
+                _diff(a_state[name], b_state[name], path + (name,), patch)
+            else:
+                patch.append(('set', path + (name,), b_state[name]))
+    elif type(a) is not type(b) or a != b:
+        patch.append(('set', path, b))
+
+
+def apply_patch(obj, patch):
+    """
+    Apply a patch to a mutable object in place.
+
+    Parameters
+    ----------
+    obj :
+        Object to patch.
+
+    patch : list of tuple
+        Patch returned by `diff`.
+
+    Returns
+    -------
+    obj :
+        Patched object. This is `obj` unless the patch replaces `obj` as a
+        whole.
+
+    Notes
+    -----
+    Values in the patch are copied, so they are not shared between the
+    patched object and the object the patch came from.
+    """
+    for op, path, *args in patch:
+        if op == 'set' and not path:
+            obj = _detach(args[0])
+            continue
+        if op in ('set', 'remove'):
+            parent, key = _get(obj, path[:-1]), path[-1]
+        else:
+            parent = _get(obj, path)
+        if op == 'set':
+            if isinstance(parent, (dict, list)):
+                parent[key] = _detach(args[0])
+            else:
+                setattr(parent, key, _detach(args[0]))
+        elif op == 'remove':
+            if isinstance(parent, (dict, list)):
+                del parent[key]
+            else:
+                delattr(parent, key)
+        elif op == 'extend':
+            parent.extend(_detach(args[0]))
+        elif op == 'update':
+            parent.update(_detach(args[0]))
+        elif op == 'truncate':
+            del parent[args[0]:]
+        else:
+            raise ValueError('Unknown patch operation {}'.format(op))
+    return obj
+
+
+def _get(obj, path):
+    """Get the object at `path`"""
+    for key in path:
+        obj = obj[key] if isinstance(obj, (dict, list, tuple)) else getattr(
+            obj, key
+        )
+    return obj
+
+
+def _detach(value):
+    """Copy `value` so that it does not belong to another mutable tree
+    
+    Mutable dictionaries, lists, tuples, sets, and deques are copied to their 
+    python types, which are converted back when they are set.
+    """
+    value_type = type(value)
+    if value_type in (SortedList, MutableSortedList):
+        return SortedList(_detach(item) for item in list.__iter__(value))
+    if value_type in (dict, MutableDict):
+        return {key: _detach(item) for key, item in dict.items(value)}
+    if value_type in (list, MutableList):
+        return [_detach(item) for item in list.__iter__(value)]
+    if value_type in (tuple, MutableTuple):
+        return tuple(_detach(item) for item in tuple.__iter__(value))
+    if value_type in (set, MutableSet):
+        return {_detach(item) for item in set.__iter__(value)}
+    if value_type in (deque, MutableDeque):
+        return deque(
+            (_detach(item) for item in deque.__iter__(value)), value.maxlen
+        )
+    if value_type in (RingBuffer, MutableRingBuffer):
+        return RingBuffer(
+            (_detach(item) for item in deque.__iter__(value)), value.maxlen
+        )
+    if isinstance(value, _CoercedValue):
+        return value_type(value)
+    if isinstance(value, Mutable):
+        return copy.deepcopy(value)
+    return value
@@ -26,14 +26,23 @@ class HTMLAttrs(MutableDict):
     2. The `style` attribute can be stored as a dict mapping style keys to 
     values.
     """
+    # the rendered attributes are cached with the version they were rendered 
+    # from
+    _transient_attr_names = MutableDict._transient_attr_names | {'_html'}
+
     def to_html(self):
         """
-        Renders the dictionary as a string of HTML attributes.
+        Renders the dictionary as a string of HTML attributes. The string is 
+        cached until the dictionary changes.
 
         Returns
         -------
         html attributes : str
         """
+        cached = self.__dict__.get('_html')
+        if cached is not None and cached[0] == self.get_version():
+            return cached[1]
+
         def format_item(key, val):
             if val is None or val is False or val == '':
                 return ''
@@ -46,7 +55,9 @@ class HTMLAttrs(MutableDict):
             attrs['style'] = ' '.join(
                 ['{}:{};'.format(*item) for item in attrs['style'].items()
             ])
-        return ' '.join(format_item(*item) for item in attrs.items())
+        html = ' '.join(format_item(*item) for item in attrs.items())
+        self.__dict__['_html'] = (self.get_version(), html)
+        return html
 
 
 HTMLAttrs.associate_with(HTMLAttrsType)
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""# Interning
+
+Rows of a `MutableType` column often repeat the same dictionary keys, short
+strings, and small tuples. By default, every unpickled row holds its own
+copies of these objects. The `InterningPickler` shares them between rows.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md), but initialize the
+`mutable` column with an interning pickler.
+
+```python
+from sqlalchemy_mutable.interning import InterningPickler
+
+pickler = InterningPickler()
+
+class MyModel(MutableModelBase, Base):
+\    __tablename__ = 'mymodel'
+\    id = Column(Integer, primary_key=True)
+\    mutable = Column(MutableType(pickler=pickler))
+
+model0, model1 = MyModel(), MyModel()
+model0.mutable = {'status': 'done'}
+model1.mutable = {'status': 'done'}
+session.add_all([model0, model1])
+session.commit()
+model0.mutable['status'] is model1.mutable['status']
+```
+
+Out:
+
+```
+True
+```
+
+Call `pickler.clear()` after loading a result set to release the shared
+objects which no row uses any more.
+"""
+
+from .coerced_types import CoercedDatetime, _CoercedValue
+from .mutable import Mutable
+from .mutable_tuple import MutableTuple
+
+import pickle
+import sys
+
+_PRIMITIVE_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+class InterningPickler():
+    """
+    Pickler for `MutableType` columns which interns and deduplicates
+    immutable leaves on unpickling.
+
+    1. Dictionary keys which are strings are interned.
+    2. Strings no longer than `max_str_len` are interned.
+    3. Coerced types with immutable values (e.g. `CoercedStr`, `CoercedInt`)
+    and mutable tuples of primitives are deduplicated. Identical leaves of
+    the same type are replaced by the first such leaf the pickler loaded.
+    Floats which differ only in the sign of zero are not identical, and
+    datetimes are not deduplicated, because equal datetimes may have
+    different time zones.
+
+    Root objects (the values of the column) are not deduplicated, so each
+    row holds its own root.
+
+    Pickling is unchanged, so this pickler reads and writes the same column
+    format as the default pickler.
+
+    Parameters
+    ----------
+    max_str_len : int, default=64
+        Maximum length of interned string values.
+
+    max_leaves : int, default=100000
+        Maximum number of deduplicated leaves to remember. The pickler forgets
+        all leaves when it reaches this number.
+
+    Attributes
+    ----------
+    max_str_len : int
+        Set from the `max_str_len` parameter.
+
+    max_leaves : int
+        Set from the `max_leaves` parameter.
+    """
+    def __init__(self, max_str_len=64, max_leaves=100000):
+        self.max_str_len = max_str_len
+        self.max_leaves = max_leaves
+        self._leaves = {}
+
+    def dumps(self, obj, protocol=pickle.HIGHEST_PROTOCOL):
+        return pickle.dumps(obj, protocol)
+
+    def loads(self, data):
+        return self.intern(pickle.loads(data))
+
+    def clear(self):
+        """Forget all deduplicated leaves"""
+        self._leaves.clear()
+
+    def intern(self, obj):
+        """
+        Intern and deduplicate the leaves of a mutable object in place.
+
+        Parameters
+        ----------
+        obj :
+            Object to intern.
+
+        Returns
+        -------
+        obj :
+            `obj`. Its leaves are interned, but `obj` itself is not, so it is
+            never shared with another row.
+        """
+        stack, visited = [obj], set()
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            if isinstance(node, dict):
+                items = [
+                    (self._key(key), self._leaf(val))
+                    for key, val in dict.items(node)
+                ]
+                dict.clear(node)
+                dict.update(node, items)
+                stack.extend(val for key, val in items)
+            elif isinstance(node, list):
+                for i, item in enumerate(list.__iter__(node)):
+                    leaf = self._leaf(item)
+                    if leaf is not item:
+                        list.__setitem__(node, i, leaf)
+                    stack.append(leaf)
+            elif isinstance(node, tuple):
+                stack.extend(node)
+            if isinstance(node, Mutable):
+                state = node.__dict__
+                for name in state.get('_tracked_attr_names', ()):
+                    state[name] = self._leaf(state[name])
+                    stack.append(state[name])
+        return obj
+
+    def _key(self, key):
+        """Intern a dictionary key"""
+        return sys.intern(key) if type(key) is str else key
+
+    def _leaf(self, obj):
+        """Return the interned or deduplicated version of `obj`"""
+        if type(obj) is str:
+            return sys.intern(obj) if len(obj) <= self.max_str_len else obj
+        if isinstance(obj, CoercedDatetime):
+            return obj
+        if isinstance(obj, _CoercedValue):
+            key = _exact_key(obj)
+        elif isinstance(obj, MutableTuple) and all(
+            type(item) in _PRIMITIVE_TYPES for item in obj
+        ):
+            key = (type(obj), tuple(_exact_key(item) for item in obj))
+        else:
+            return obj
+        leaf = self._leaves.get(key)
+        if leaf is None:
+            if len(self._leaves) >= self.max_leaves:
+                self._leaves.clear()
+            leaf = self._leaves[key] = obj
+        return leaf
+
+
+def _exact_key(value):
+    """
+    Key which is equal only for identical values of the same type. Equal
+    floats and complex numbers may differ in the sign of zero, which their
+    representation keeps.
+    """
+    if isinstance(value, float):
+        return type(value), float.__repr__(value)
+    if isinstance(value, complex):
+        return type(value), complex.__repr__(value)
+    return type(value), value
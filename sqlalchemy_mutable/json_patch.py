@@ -0,0 +1,209 @@
+"""# Partial updates
+
+By default, changing a single key of a mutable JSON column rewrites the whole
+document at the next flush. Columns created with `partial_updates=True`
+update only the paths which changed, using the database's JSON functions
+(`json_set` and `json_remove` on SQLite and MySQL, `jsonb_set` and `#-` on
+Postgres). The whole document is rewritten when too many paths changed,
+when the column was set to a new value, and on other databases.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md), but add a JSON column
+with partial updates.
+
+```python
+from sqlalchemy_mutable import MutableDictJSONType
+
+class MyModel(MutableModelBase, Base):
+\    __tablename__ = 'mymodel'
+\    id = Column(Integer, primary_key=True)
+\    document = Column(MutableDictJSONType(partial_updates=True))
+
+model = MyModel()
+model.document = {'settings': {'theme': 'dark'}, 'history': []}
+session.add(model)
+session.commit()
+model.document['settings']['theme'] = 'light'
+model.document['history'].append('theme')
+# on SQLite, this emits
+# UPDATE mymodel SET document=json_set(json_set(document, ?, json(?)), ?,
+# json(?)) WHERE mymodel.id = ?
+session.commit()
+model.document
+```
+
+Out:
+
+```
+{'settings': {'theme': 'light'}, 'history': ['theme']}
+```
+"""
+
+from .json_query import JSONComparator, _json_path
+
+from sqlalchemy import Text, and_, cast, event, func, inspect, literal
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import mapper
+from sqlalchemy.types import JSON
+
+# key of the `InstanceState.info` entry which holds the names of partially
+# updated attributes which were set to new values since the last flush
+_REPLACED = 'sqlalchemy_mutable.replaced'
+
+
+class PatchableJSON(JSON):
+    """
+    Base class for mutable JSON column types.
+
+    Parameters
+    ----------
+    partial_updates : bool, default=False
+        Update the paths which changed instead of rewriting the whole
+        document. Partial updates are supported on SQLite, MySQL, and
+        Postgres.
+
+    max_edits : int, default=16
+        Maximum number of changed paths to update in place. If more paths
+        changed, the whole document is rewritten.
+
+    none_as_null : bool, default=False
+        See `sqlalchemy.types.JSON`.
+
+    Attributes
+    ----------
+    partial_updates : bool
+        Set from the `partial_updates` parameter.
+
+    max_edits : int
+        Set from the `max_edits` parameter.
+    """
+    comparator_factory = JSONComparator
+
+    def __init__(
+        self, partial_updates=False, max_edits=16, none_as_null=False
+    ):
+        super().__init__(none_as_null=none_as_null)
+        self.partial_updates = partial_updates
+        self.max_edits = max_edits
+
+
+def _edits(root, max_edits):
+    """
+    Removals and sets which apply the recorded changes of `root` to its
+    stored document, or `None` if the document must be rewritten.
+    """
+    paths = root.dirty_paths()
+    if not paths or len(paths) > max_edits or () in paths:
+        return None
+    removals, sets = [], []
+    for path in paths:
+        parent = root
+        for key in path[:-1]:
+            if isinstance(parent, dict) and type(key) is not str:
+                return None
+            parent = parent[key]
+        key = path[-1]
+        if isinstance(parent, dict) and type(key) is str:
+            present = dict.__contains__(parent, key)
+        elif isinstance(parent, list) and type(key) is int:
+            present = key < len(parent)
+        else:
+            return None
+        if present:
+            sets.append((path, parent[key]))
+        else:
+            removals.append(path)
+    # remove list items from the end, and append them from the start
+    index = lambda path: path[-1] if type(path[-1]) is int else 0
+    removals.sort(key=index, reverse=True)
+    sets.sort(key=lambda edit: index(edit[0]))
+    return removals, sets
+
+
+def _patch_expression(dialect_name, column, removals, sets):
+    """
+    Expression which applies removals and sets to a JSON column, or `None`
+    if the dialect does not support partial updates.
+    """
+    if dialect_name in ('sqlite', 'mysql'):
+        expr = column
+        for path in removals:
+            expr = func.json_remove(expr, _json_path(path))
+        for path, value in sets:
+            value = literal(value, JSON())
+            value = func.json(value) if dialect_name == 'sqlite' else cast(
+                value, JSON
+            )
+            expr = func.json_set(expr, _json_path(path), value)
+        return expr
+    if dialect_name == 'postgresql':
+        expr = cast(column, JSONB)
+        for path in removals:
+            expr = expr.op('#-')(_pg_path(path))
+        for path, value in sets:
+            expr = func.jsonb_set(
+                expr, _pg_path(path), cast(literal(value, JSON()), JSONB), True
+            )
+        return cast(expr, column.type)
+
+
+def _pg_path(path):
+    return literal([str(key) for key in path], ARRAY(Text))
+
+
+def _partial_update(mapper_, connection, target, prop):
+    """
+    Update the changed paths of a JSON column, and remove the column from
+    the attributes which the flush writes.
+    """
+    state = inspect(target)
+    key, column = prop.key, prop.columns[0]
+    if (
+        key not in state.committed_state
+        or key in state.info.get(_REPLACED, ())
+    ):
+        return
+    value = state.dict.get(key)
+    if not hasattr(value, 'dirty_paths'):
+        return
+    edits = _edits(value, column.type.max_edits)
+    if edits is None:
+        return
+    expr = _patch_expression(connection.dialect.name, column, *edits)
+    if expr is None:
+        return
+    table = column.table
+    where = and_(*[
+        pk_column == state.dict[mapper_.get_property_by_column(pk_column).key]
+        for pk_column in table.primary_key
+    ])
+    connection.execute(table.update().where(where).values({column: expr}))
+    del state.committed_state[key]
+    value.reset_dirty_paths()
+
+
+@event.listens_for(mapper, 'mapper_configured')
+def _listen_for_partial_updates(mapper_, class_):
+    props = [
+        prop for prop in mapper_.column_attrs
+        if getattr(prop.columns[0].type, 'partial_updates', False)
+    ]
+    if not props or mapper_.non_primary:
+        return
+
+    def set_(state, value, oldvalue, initiator):
+        state.info.setdefault(_REPLACED, set()).add(initiator.key)
+
+    for prop in props:
+        event.listen(getattr(class_, prop.key), 'set', set_, raw=True)
+
+    @event.listens_for(class_, 'before_update')
+    def before_update(mapper_, connection, target):
+        for prop in props:
+            _partial_update(mapper_, connection, target, prop)
+
+    @event.listens_for(class_, 'after_insert')
+    @event.listens_for(class_, 'after_update')
+    def after_flush(mapper_, connection, target):
+        inspect(target).info.pop(_REPLACED, None)
@@ -0,0 +1,263 @@
+"""# JSON queries
+
+`MutableJSONType` and `MutableDictJSONType` columns compile path lookups and
+containment checks to the database's native JSON operators, so rows can be
+filtered without loading whole documents.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md), but add a JSON column
+with an expression index on one of its paths.
+
+```python
+from sqlalchemy_mutable import MutableDictJSONType, json_index
+
+class MyModel(MutableModelBase, Base):
+\    __tablename__ = 'mymodel'
+\    id = Column(Integer, primary_key=True)
+\    document = Column(MutableDictJSONType)
+\    __table_args__ = (json_index('ix_status', document, 'status'),)
+
+model = MyModel()
+model.document = {'status': 'done', 'settings': {'theme': 'dark'}}
+session.add(model)
+session.commit()
+query = session.query(MyModel)
+print(query.filter(MyModel.document.path('status') == 'done').count())
+contains = MyModel.document.contains({'settings': {'theme': 'dark'}})
+print(query.filter(contains).count())
+```
+
+Out:
+
+```
+1
+1
+```
+"""
+
+from sqlalchemy import (
+    Boolean, Float, Index, Integer, String, and_, cast, literal,
+    literal_column
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import JSON
+
+import json
+
+
+class JSONComparator(JSON.Comparator):
+    """
+    Comparator for mutable JSON column types.
+    """
+    def path(self, *keys, type_=None):
+        """
+        Value at a path in the JSON document.
+
+        Parameters
+        ----------
+        \*keys : str or int
+            Keys and indices leading to the value.
+
+        type_ : sqlalchemy.types.TypeEngine or None, default=None
+            If given, the value is cast to this type. Otherwise, the value is
+            text on Postgres and MySQL. SQLite's `JSON_EXTRACT` returns
+            numbers as numbers, and `true` and `false` as 1 and 0, so pass
+            `type_` to compare values other than strings on every database.
+
+        Returns
+        -------
+        expression : sqlalchemy.sql.ColumnElement
+            Rendered as `JSON_EXTRACT` on SQLite and MySQL and `#>>` on
+            Postgres. The path is rendered literally so that queries can use
+            expression indexes created by `json_index`.
+        """
+        expr = json_path_text(self.expr, keys)
+        return expr if type_ is None else cast(expr, type_)
+
+    def contains(self, other, **kwargs):
+        """
+        Check that the JSON document contains a dictionary.
+
+        Parameters
+        ----------
+        other : dict
+            Nested dictionary of keys and values which the document must
+            contain.
+
+        Returns
+        -------
+        expression : sqlalchemy.sql.ColumnElement
+            Rendered as `@>` on Postgres. On other databases, rendered as a
+            conjunction of path comparisons, where lists must have the same
+            length as in `other`, and their items are compared in order.
+        """
+        if not isinstance(other, dict):
+            return super().contains(other, **kwargs)
+        return json_contains(self.expr, other)
+
+
+def json_index(name, column, *keys, type_=None, **kwargs):
+    """
+    Create an expression index on a path in a JSON column.
+
+    Parameters
+    ----------
+    name : str
+        Index name.
+
+    column : sqlalchemy.Column
+        `MutableJSONType` or `MutableDictJSONType` column.
+
+    \*keys : str or int
+        Keys and indices leading to the indexed value.
+
+    type_ : sqlalchemy.types.TypeEngine or None, default=None
+        Type of the indexed value. Queries use the index when they compare
+        `column.path(*keys, type_=type_)`.
+
+    \*\*kwargs :
+        Keyword arguments for `sqlalchemy.Index`.
+
+    Returns
+    -------
+    index : sqlalchemy.Index
+    """
+    return Index(name, column.comparator.path(*keys, type_=type_), **kwargs)
+
+
+class json_path_text(FunctionElement):
+    """Text at a path in a JSON document, with the path rendered literally"""
+    type = String()
+    name = 'json_path_text'
+    inherit_cache = True
+
+    def __init__(self, expr, keys):
+        self.keys = tuple(keys)
+        # the unrendered path argument puts the path in the cache key
+        super().__init__(expr, literal_column(_quote(json.dumps(self.keys))))
+
+
+class json_array_length(FunctionElement):
+    """Length of the array at a path in a JSON document"""
+    type = Integer()
+    name = 'json_array_length'
+    inherit_cache = True
+
+    def __init__(self, expr, keys):
+        self.keys = tuple(keys)
+        super().__init__(expr, literal_column(_quote(json.dumps(self.keys))))
+
+
+class json_contains(FunctionElement):
+    """Check that a JSON document contains a dictionary"""
+    type = Boolean()
+    name = 'json_contains'
+    inherit_cache = True
+
+    def __init__(self, expr, other):
+        super().__init__(
+            expr, literal(other, JSON()), and_(*_leaf_clauses(expr, other))
+        )
+
+
+def _leaf_clauses(expr, obj, keys=()):
+    """Comparisons of the leaves of a nested dictionary"""
+    for key, value in obj.items():
+        path = keys + (key,)
+        if isinstance(value, dict) and value:
+            yield from _leaf_clauses(expr, value, path)
+        elif value is None:
+            yield json_path_text(expr, path).is_(None)
+        elif isinstance(value, bool):
+            yield cast(json_path_text(expr, path), Boolean) == value
+        elif isinstance(value, int):
+            yield cast(json_path_text(expr, path), Integer) == value
+        elif isinstance(value, float):
+            yield cast(json_path_text(expr, path), Float) == value
+        elif isinstance(value, str):
+            yield json_path_text(expr, path) == value
+        elif isinstance(value, (list, tuple)) and value:
+            # items are compared as leaves, because databases render nested
+            # values with different spacing, key order, and escaping of
+            # non-ASCII text
+            yield json_array_length(expr, path) == len(value)
+            yield from _leaf_clauses(expr, dict(enumerate(value)), path)
+        else:
+            yield json_path_text(expr, path) == json.dumps(
+                value, separators=(',', ':'), ensure_ascii=False
+            )
+
+
+def _quote(text):
+    """Quote a SQL string literal"""
+    return "'{}'".format(text.replace("'", "''"))
+
+
+def _json_path(keys):
+    """SQLite and MySQL JSON path, e.g. `$."key"[0]`"""
+    return '$' + ''.join(
+        '[{}]'.format(key) if isinstance(key, int) else '.' + json.dumps(key)
+        for key in keys
+    )
+
+
+@compiles(json_path_text)
+def _compile_path_text(element, compiler, **kw):
+    expr = element.clauses.clauses[0]
+    return compiler.process(expr[element.keys].as_string(), **kw)
+
+
+@compiles(json_path_text, 'sqlite')
+def _compile_path_text_sqlite(element, compiler, **kw):
+    return 'JSON_EXTRACT({}, {})'.format(
+        compiler.process(element.clauses.clauses[0], **kw),
+        _quote(_json_path(element.keys))
+    )
+
+
+@compiles(json_path_text, 'mysql')
+def _compile_path_text_mysql(element, compiler, **kw):
+    return 'JSON_UNQUOTE({})'.format(_compile_path_text_sqlite(
+        element, compiler, **kw
+    ))
+
+
+@compiles(json_path_text, 'postgresql')
+def _compile_path_text_postgresql(element, compiler, **kw):
+    path = ','.join(json.dumps(str(key)) for key in element.keys)
+    return '({} #>> {})'.format(
+        compiler.process(element.clauses.clauses[0], **kw),
+        _quote('{' + path + '}')
+    )
+
+
+@compiles(json_array_length)
+def _compile_array_length(element, compiler, **kw):
+    return 'JSON_ARRAY_LENGTH({}, {})'.format(
+        compiler.process(element.clauses.clauses[0], **kw),
+        _quote(_json_path(element.keys))
+    )
+
+
+@compiles(json_array_length, 'mysql')
+def _compile_array_length_mysql(element, compiler, **kw):
+    return 'JSON_LENGTH({}, {})'.format(
+        compiler.process(element.clauses.clauses[0], **kw),
+        _quote(_json_path(element.keys))
+    )
+
+
+@compiles(json_contains)
+def _compile_contains(element, compiler, **kw):
+    return compiler.process(element.clauses.clauses[2], **kw)
+
+
+@compiles(json_contains, 'postgresql')
+def _compile_contains_postgresql(element, compiler, **kw):
+    expr, other = element.clauses.clauses[:2]
+    return compiler.process(
+        cast(expr, JSONB).contains(cast(other, JSONB)), **kw
+    )
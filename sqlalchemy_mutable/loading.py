@@ -0,0 +1,334 @@
+"""# Plain loading
+
+Loading a mutable column sets the root of every mutable object in it and
+registers the column's value with SQLAlchemy. Queries which only read the
+values (e.g. reports and exports) can skip this work by selecting
+`plain(column)`, which loads the value as plain python objects:
+
+1. Mutable lists, dictionaries, tuples, sets, and deques are loaded as
+subclasses of `list`, `dict`, `tuple`, `set`, and `deque` without change
+tracking.
+2. Other mutable objects are loaded as `types.SimpleNamespace` objects with
+their attributes.
+3. Coerced values are loaded as their original types (e.g. `int`, `bool`).
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from sqlalchemy_mutable import plain
+
+model = MyModel()
+model.mutable = {'greeting': ['hello', 'world']}
+session.add(model)
+session.commit()
+value = session.query(plain(MyModel.mutable)).scalar()
+value, isinstance(value, Mutable)
+```
+
+Out:
+
+```
+({'greeting': ['hello', 'world']}, False)
+```
+"""
+
+from .codec import (
+    FORMAT_VERSION, MutableCodecType, _Decoder, _decoder_table, _uint32
+)
+from .coerced_types import (
+    CoercedBool, CoercedComplex, CoercedDatetime, CoercedFloat, CoercedFunc,
+    CoercedInt, CoercedModelShell, CoercedStr
+)
+from .interning import InterningPickler
+from .model_shell import ModelShell
+from .mutable import Mutable, _reconstruct
+from .mutable_deque import MutableDeque, _reconstruct_deque
+from .mutable_dict import MutableDict
+from .mutable_list import MutableList
+from .mutable_ring_buffer import MutableRingBuffer
+from .mutable_set import MutableSet
+from .mutable_sorted_list import MutableSortedList
+from .mutable_tuple import MutableTuple
+
+from sqlalchemy import type_coerce
+from sqlalchemy.types import JSON, LargeBinary, PickleType, TypeDecorator
+
+import io
+import pickle
+from collections import deque
+from datetime import datetime
+from types import SimpleNamespace
+
+
+def plain(column):
+    """
+    Select a mutable column as plain python objects.
+
+    Parameters
+    ----------
+    column : sqlalchemy.orm.attributes.InstrumentedAttribute or sqlalchemy.Column
+        Mutable column.
+
+    Returns
+    -------
+    expression : sqlalchemy.sql.ColumnElement
+        Column expression labeled with the column's key.
+
+    Notes
+    -----
+    Pickled columns whose pickler is not `pickle` or an `InterningPickler`
+    are loaded with their pickler, and keep their mutable objects. Subclasses
+    of mutable types which SQLAlchemy-Mutable does not define (e.g. your own
+    tracked types) keep their classes, without change tracking.
+    """
+    type_ = column.type
+    if isinstance(type_, JSON):
+        plain_type = JSON(none_as_null=type_.none_as_null)
+    elif isinstance(type_, MutableCodecType):
+        plain_type = _PlainCodecType()
+    elif isinstance(type_, PickleType):
+        plain_type = PickleType(
+            protocol=type_.protocol, pickler=_plain_pickler_for(type_.pickler)
+        )
+    else:
+        plain_type = type_
+    return type_coerce(column, plain_type).label(column.key)
+
+
+def raw(column):
+    """
+    Select a `MutableType` or `MutableCodecType` column as the bytes stored
+    in the database, without deserializing them. See `decode_parallel`.
+
+    Parameters
+    ----------
+    column : sqlalchemy.orm.attributes.InstrumentedAttribute or sqlalchemy.Column
+        Mutable column.
+
+    Returns
+    -------
+    expression : sqlalchemy.sql.ColumnElement
+        Column expression labeled with the column's key.
+    """
+    return type_coerce(column, LargeBinary).label(column.key)
+
+
+# plain classes which stand in for mutable classes while unpickling
+class _PlainObject(SimpleNamespace):
+    def __setstate__(self, state):
+        self.__dict__.update(
+            (name, state[name])
+            for name in state.get('_tracked_attr_names', ())
+        )
+
+
+class _PlainList(list):
+    __slots__ = ()
+
+    def __setstate__(self, state):
+        pass
+
+
+class _PlainDict(dict):
+    __slots__ = ()
+
+    def __setstate__(self, state):
+        # dictionaries pickled by earlier versions store their items in a
+        # `_mapping` copy
+        mapping = state.get('_mapping')
+        if mapping is not None:
+            self.update(mapping)
+
+
+class _PlainTuple(tuple):
+    __slots__ = ()
+
+    def __setstate__(self, state):
+        pass
+
+
+class _PlainSet(set):
+    __slots__ = ()
+
+    def __setstate__(self, state):
+        pass
+
+
+class _PlainDeque(deque):
+    __slots__ = ()
+
+    def __setstate__(self, state):
+        pass
+
+
+class _PlainValue():
+    """Stands in for coerced types whose values are immutable"""
+    __slots__ = ()
+
+    def __setstate__(self, state):
+        pass
+
+
+class _PlainComplex(_PlainValue, complex):
+    __slots__ = ()
+
+
+class _PlainFloat(_PlainValue, float):
+    __slots__ = ()
+
+
+class _PlainInt(_PlainValue, int):
+    __slots__ = ()
+
+
+class _PlainStr(_PlainValue, str):
+    __slots__ = ()
+
+
+class _PlainBox(SimpleNamespace):
+    """Stands in for coerced types which hold their value in an attribute"""
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class _PlainBool(_PlainBox):
+    pass
+
+
+class _PlainFunc(_PlainBox):
+    pass
+
+
+def _new(cls):
+    return cls.__new__(cls)
+
+
+def _new_deque(cls, maxlen):
+    return cls((), maxlen)
+
+
+_plain_classes = {
+    _reconstruct: _new,
+    _reconstruct_deque: _new_deque,
+    Mutable: _PlainObject,
+    MutableList: _PlainList,
+    MutableDict: _PlainDict,
+    MutableTuple: _PlainTuple,
+    MutableSet: _PlainSet,
+    MutableDeque: _PlainDeque,
+    MutableSortedList: _PlainList,
+    MutableRingBuffer: _PlainDeque,
+    CoercedComplex: _PlainComplex,
+    CoercedFloat: _PlainFloat,
+    CoercedInt: _PlainInt,
+    CoercedStr: _PlainStr,
+    CoercedDatetime: datetime,
+    CoercedBool: _PlainBool,
+    CoercedFunc: _PlainFunc,
+    CoercedModelShell: ModelShell,
+}
+_plain_globals = {
+    (obj.__module__, obj.__qualname__): plain_obj
+    for obj, plain_obj in _plain_classes.items()
+}
+
+# coerced types are only used for root objects, which are converted to their
+# original types after unpickling
+_unwrap = {
+    _PlainComplex: complex,
+    _PlainFloat: float,
+    _PlainInt: int,
+    _PlainStr: str,
+    _PlainBool: lambda box: box.value,
+    _PlainFunc: lambda box: box.func,
+}
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        plain_obj = _plain_globals.get((module, name))
+        if plain_obj is not None:
+            return plain_obj
+        return super().find_class(module, name)
+
+
+class _PlainPickler():
+    """Pickler which unpickles mutable objects as plain python objects"""
+    def dumps(self, obj, protocol=pickle.HIGHEST_PROTOCOL):
+        return pickle.dumps(obj, protocol)
+
+    def loads(self, data):
+        obj = _PlainUnpickler(io.BytesIO(data)).load()
+        unwrap = _unwrap.get(type(obj))
+        return obj if unwrap is None else unwrap(obj)
+
+
+_plain_pickler = _PlainPickler()
+
+
+def _plain_pickler_for(pickler):
+    """
+    Pickler which loads the pickles of `pickler` as plain python objects.
+    Custom picklers are returned as they are.
+    """
+    if pickler is pickle or isinstance(pickler, InterningPickler):
+        return _plain_pickler
+    return pickler
+
+
+class _PlainDecoder(_Decoder):
+    """Decodes mutable objects as plain python objects"""
+    def _decode_list(self, n, root):
+        return [self.decode(None) for i in range(n)]
+
+    def _decode_dict(self, n, root):
+        new, decode = {}, self.decode
+        for i in range(n):
+            key = decode(None)
+            new[key] = decode(None)
+        return new
+
+    def _decode_tuple(self, n, root):
+        return tuple([self.decode(None) for i in range(n)])
+
+    def _decode_set(self, n, root):
+        return set([self.decode(None) for i in range(n)])
+
+    def _decode_deque(self, n, root):
+        maxlen = self.decode(None)
+        return deque([self.decode(None) for i in range(n)], maxlen)
+
+    def decode_mutable(self, root):
+        new = SimpleNamespace()
+        state = new.__dict__
+        for i in range(self._unpack(_uint32)[0]):
+            name = self.decode(None)
+            state[name] = self.decode(None)
+        return new
+
+    def decode_pickle(self, root):
+        n = self._unpack(_uint32)[0]
+        return _plain_pickler.loads(self._read(n))
+
+
+_PlainDecoder._decoders = _decoder_table(_PlainDecoder)
+
+
+class _PlainCodecType(TypeDecorator):
+    """Loads `MutableCodecType` columns as plain python objects"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else _decode_plain(value)
+
+
+def _decode_plain(data):
+    """Decode an object encoded by the codec as plain python objects"""
+    if data[0] != FORMAT_VERSION:
+        raise ValueError(
+            'Unsupported codec format version {}'.format(data[0])
+        )
+    return _PlainDecoder(data).decode(None)
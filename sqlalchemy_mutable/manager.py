@@ -31,8 +31,21 @@ class MutableManager():
     model1 = MyModel()
     model0.mutable = model1
     ```
+
+    The manager also holds the opt-in `thread_safe` setting. When 
+    `thread_safe` is `True`, every root mutable object gets its own lock, 
+    and writes to a mutable object (setting and deleting attributes and 
+    items, and calling mutating list and dictionary methods) hold the lock 
+    of their root. Reads do not acquire the lock, so a cached tree which is 
+    read from many threads does not suffer from contention.
+
+    ```python
+    MutableManager.thread_safe = True
+    ```
     """
     # Flask-SQLAlchemy database
     db = None
     # SQLAlchemy session
-    session = None
\ No newline at end of file
+    session = None
+    # hold a per-root lock while writing to mutable objects
+    thread_safe = False
\ No newline at end of file
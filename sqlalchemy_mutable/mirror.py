@@ -0,0 +1,125 @@
+"""# Mirrored columns
+
+Mutable columns are opaque to the database. To filter rows by a value stored
+in a mutable column, mirror the value into an ordinary indexed column with
+`mirror_column`. Mirrored columns are updated at flush time whenever their
+mutable column changes.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md), but add a mirrored
+column to the model.
+
+```python
+from sqlalchemy_mutable import mirror_column
+
+class MyModel(MutableModelBase, Base):
+\    __tablename__ = 'mymodel'
+\    id = Column(Integer, primary_key=True)
+\    mutable = Column(MutableType)
+\    status = mirror_column('mutable', 'status', type_=String)
+
+model = MyModel()
+model.mutable = {'status': 'pending'}
+session.add(model)
+session.commit()
+model.mutable['status'] = 'done'
+session.commit()
+session.query(MyModel).filter_by(status='done').count()
+```
+
+Out:
+
+```
+1
+```
+"""
+
+from sqlalchemy import Column, event, inspect
+from sqlalchemy.orm import mapper
+
+
+def mirror_column(source, *path, type_, **kwargs):
+    """
+    Create a column which mirrors the value at a path in a mutable column.
+
+    Parameters
+    ----------
+    source : str
+        Name of the mutable column attribute.
+
+    \*path : str or int
+        Keys, indices, and attribute names leading from the mutable column
+        to the mirrored value.
+
+    type_ : sqlalchemy.types.TypeEngine
+        Column type of the mirrored value.
+
+    \*\*kwargs :
+        Keyword arguments for `sqlalchemy.Column`. The column is indexed
+        unless `index=False`.
+
+    Returns
+    -------
+    column : sqlalchemy.Column
+        Mirrored column. The mirrored value is `None` if the path does not
+        exist.
+    """
+    kwargs.setdefault('index', True)
+    kwargs.setdefault('info', {})['mutable_mirror'] = (source, path)
+    return Column(type_, **kwargs)
+
+
+def get_path(obj, path):
+    """
+    Get the value at a path in a mutable object.
+
+    Parameters
+    ----------
+    obj :
+        Mutable object.
+
+    path : iterable
+        Keys, indices, and attribute names leading from `obj` to the value.
+
+    Returns
+    -------
+    value :
+        Value at the path, or `None` if the path does not exist.
+    """
+    for key in path:
+        try:
+            if isinstance(obj, (dict, list, tuple)):
+                obj = obj[key]
+            else:
+                obj = getattr(obj, key)
+        except (AttributeError, IndexError, KeyError, TypeError):
+            return None
+    return obj
+
+
+def _update_mirrors(mirrors, target, insert):
+    """Set the mirrored columns of `target` whose mutable column changed"""
+    attrs = inspect(target).attrs
+    for key, (source, path) in mirrors:
+        if insert or attrs[source].history.has_changes():
+            setattr(target, key, get_path(getattr(target, source), path))
+
+
+@event.listens_for(mapper, 'mapper_configured')
+def _listen_for_mirrors(mapper_, class_):
+    mirrors = [
+        (prop.key, prop.columns[0].info['mutable_mirror'])
+        for prop in mapper_.column_attrs
+        if 'mutable_mirror' in prop.columns[0].info
+    ]
+    if not mirrors or mapper_.non_primary:
+        return
+
+    @event.listens_for(class_, 'before_insert')
+    def before_insert(mapper_, connection, target):
+        _update_mirrors(mirrors, target, True)
+
+    @event.listens_for(class_, 'before_update')
+    def before_update(mapper_, connection, target):
+        _update_mirrors(mirrors, target, False)
@@ -4,6 +4,22 @@ from .manager import MutableManager
 
 from sqlalchemy import orm
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import mapperlib
+
+from weakref import WeakValueDictionary
+
+# key of the `Session.info` entry which caches unshelled models
+_UNSHELLED = 'sqlalchemy_mutable.unshelled'
+
+
+def _mappers():
+    """Iterate over all mappers"""
+    if hasattr(mapperlib, '_all_registries'):
+        # SQLAlchemy 1.4+
+        for registry in mapperlib._all_registries():
+            yield from registry.mappers
+    else:
+        yield from list(mapperlib._mapper_registry)
 
 
 class Query():
@@ -42,17 +58,31 @@ class ModelShell():
 
     Attributes
     ----------
-    id : usually int or str
-        Identity of the model.
+    model_key : str
+        Key of the model's class in the model class registry (the name of 
+        the class's table). Subclasses which share their parent's table 
+        (single table inheritance) have their parent's key, and are 
+        recovered by querying the parent class.
+
+    identity : tuple
+        Identity (primary key) of the model.
+
+    id : usually int or str, or tuple
+        Identity of the model. Identities of models with composite primary 
+        keys are tuples.
 
     model_class : class
-        Class of the stored model.
+        Class of the stored model, looked up in the registry.
 
     Notes
     -----
     1. The model must have an identity before it is shelled. i.e you must add 
     it to the session and commit or flush it.
-    2. Models are unshelled to make comparisons the `__eq__` comparison.
+    2. Shells compare equal to shells and models with the same model class 
+    and identity, without unshelling.
+    3. Unshelled models are cached in a `weakref.WeakValueDictionary` in the 
+    session's `info`, which all shells share. The cache holds a model for as 
+    long as something else references it.
 
     Examples
     --------
@@ -74,13 +104,14 @@ class ModelShell():
     <__main__.MyModel at 0x7f6bd9936c50>
     ```
     """
+    # maps registry keys (table names) to model classes
     table_class_mapping = {}
 
     def __init__(self, model):
-        """Store model primary key and class"""
-        def get_id():
-            id = inspect(model).identity
-            if id is None:
+        """Store model registry key and identity"""
+        def get_identity():
+            identity = inspect(model).identity
+            if identity is None:
                 # add and flush if the model does not have an identity
                 session = None
                 if MutableManager.session is not None:
@@ -92,15 +123,20 @@ class ModelShell():
                 assert session is not None
                 session.add(model)
                 session.flush([model])
-                id = inspect(model).identity
-            return id[0]
-
-        self.id = get_id()
-        self.model_class = model.__class__
-        # self.tablename = model.__tablename__
-        # if self.tablename not in self.table_class_mapping:
-        #     print('tablename not in mapping')
-        #     self.table_class_mapping[self.tablename] = model.__class__
+                identity = inspect(model).identity
+            return tuple(identity)
+
+        self.identity = get_identity()
+        self.model_key = self._get_model_key(model.__class__)
+
+    @property
+    def id(self):
+        identity = self.identity
+        return identity[0] if len(identity) == 1 else identity
+
+    @property
+    def model_class(self):
+        return self._get_model_class(self.model_key)
         
     def unshell(self):
         """
@@ -113,14 +149,103 @@ class ModelShell():
             is returned. Otherwise, a `(model_class, id)` tuple is returned 
             which you can use to query the database to recover the model.
         """
-        # print('unshelling', self.model_class, self.id)
-        if hasattr(self.model_class, 'query'):
-            return self.model_class.query.get(self.id)
-        return (self.model_class, self.id)
-        # model_class = self.table_class_mapping[self.tablename]
-        # if hasattr(model_class, 'query'):
-        #     return model_class.query.get(self.id)
-        # return (model_class, self.id)
+        model_class = self.model_class
+        session = _get_session(model_class)
+        if session is None:
+            return (model_class, self.id)
+        cache = session.info.get(_UNSHELLED)
+        if cache is None:
+            cache = session.info[_UNSHELLED] = WeakValueDictionary()
+        key = self.model_key, self.identity
+        model = cache.get(key)
+        if model is not None:
+            state = inspect(model)
+            if state.persistent and state.session is session:
+                return model
+        model = session.query(model_class).get(self.id)
+        if model is not None:
+            cache[key] = model
+        return model
+
+    @staticmethod
+    def _get_model_key(model_class):
+        """Get the registry key of a model class"""
+        # table names are `quoted_name` objects, which pickle with their class
+        return str(inspect(model_class).local_table.fullname)
     
+    @classmethod
+    def _get_model_class(cls, tablename):
+        """
+        Get the model class mapped to a table.
+
+        The table to class mapping is refreshed from the mappers when a table 
+        is not yet in the mapping. Subclasses with single table inheritance 
+        share their parent's table, and are not mapped.
+        """
+        model_class = cls.table_class_mapping.get(tablename)
+        if model_class is None:
+            for mapper in _mappers():
+                table = mapper.local_table
+                if mapper.inherits is None or (
+                    table is not mapper.inherits.local_table
+                ):
+                    cls.table_class_mapping[str(table.fullname)] = (
+                        mapper.class_
+                    )
+            model_class = cls.table_class_mapping[tablename]
+        return model_class
+
+    # Pickling
+    def __getstate__(self):
+        """State is the registry key and identity"""
+        return self.model_key, self.identity
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            self.model_key, self.identity = state
+        else:
+            self.__dict__.update(self._convert_state(state))
+
+    @classmethod
+    def _convert_state(cls, state):
+        """
+        Convert the state of a shell pickled by earlier versions, which store 
+        the model class and the first column of the identity.
+        """
+        if 'model_class' in state:
+            state = dict(state)
+            state['model_key'] = cls._get_model_key(state.pop('model_class'))
+            state['identity'] = (state.pop('id'),)
+        return state
+
     def __eq__(self, obj):
-        return self.unshell() == obj
\ No newline at end of file
+        if isinstance(obj, ModelShell):
+            return (
+                self.model_key == obj.model_key 
+                and self.identity == obj.identity
+            )
+        if hasattr(obj, '__table__'):
+            identity = inspect(obj).identity
+            return (
+                identity is not None and self.identity == tuple(identity)
+                and self.model_key == self._get_model_key(type(obj))
+            )
+        return self.unshell() == obj
+
+    def __hash__(self):
+        return hash((self.model_key, self.identity))
+
+
+def _get_session(model_class):
+    """
+    Get the session which a model class queries through its `query` 
+    attribute, or `None` if the class does not have a `query` attribute.
+    """
+    for cls in model_class.__mro__:
+        query = cls.__dict__.get('query')
+        if isinstance(query, Query):
+            # avoid creating a query
+            return query.scoped_session()
+    if hasattr(model_class, 'query'):
+        # e.g. Flask-SQLAlchemy's query property
+        return model_class.query.session
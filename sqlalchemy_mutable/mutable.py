@@ -9,17 +9,125 @@ columns.
 attributes and items.
 """
 
+from .json_patch import PatchableJSON
+from .manager import MutableManager
 from .model_shell import ModelShell
 
-from sqlalchemy.types import JSON, PickleType
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.types import PickleType
 from sqlalchemy.ext.mutable import Mutable as MutableBase
 
+import weakref
+from functools import wraps
+from threading import RLock
+
+
+def synchronized(method):
+    """
+    Decorator for methods which write to a mutable object.
+
+    If `MutableManager.thread_safe` is `True`, the decorated method holds the 
+    lock of the object's root while it runs. Otherwise, the method runs 
+    unchanged.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not MutableManager.thread_safe:
+            return method(self, *args, **kwargs)
+        with self._get_lock():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _reconstruct(cls):
+    """
+    Create an empty mutable object of type `cls` for unpickling.
+
+    Unlike `Mutable.__new__`, this does not set a root, which indicates that 
+    the object is being unpickled. Items are added without conversion, and 
+    roots are set once the root Mutable object's state is set.
+    """
+    return super(Mutable, cls).__new__(cls)
+
+
+class _NoLock():
+    """Stands in for a lock while a mutable object has no root"""
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_no_lock = _NoLock()
+
+
+class _DirtyRegistry(dict):
+    """
+    Changes recorded by a root mutable object (see `Mutable._changed`). Maps 
+    `id(obj)` to `(obj, keys)`, where `keys` is `None` if `obj` changed as a 
+    whole.
+
+    Roots which are never flushed (e.g. standalone or detached values) keep 
+    recording changes. Once more than `max_size` keys are recorded, the 
+    registry collapses to a single entry for the whole root, so its size is 
+    bounded.
+    """
+    __slots__ = ('size',)
+    max_size = 1000
+
+    def __init__(self):
+        self.size = 0
+
+    def record(self, obj, keys, root):
+        """Record that the children `keys` of `obj` changed"""
+        if self.get(id(root), (None, ()))[1] is None:
+            # the root changed as a whole, which includes every change
+            return
+        entry = self.get(id(obj))
+        if not keys:
+            self[id(obj)] = (obj, None)
+            self.size += 1
+        elif entry is None:
+            keys = set(keys)
+            self[id(obj)] = (obj, keys)
+            self.size += len(keys)
+        elif entry[1] is not None:
+            n_keys = len(entry[1])
+            entry[1].update(keys)
+            self.size += len(entry[1]) - n_keys
+        if self.size > self.max_size:
+            self.clear()
+            self[id(root)] = (root, None)
+            self.size = 1
+
+
+def _item_keys(key):
+    """
+    Keys to record when the item at `key` changes. Slices change the object 
+    as a whole, which is recorded without keys.
+    """
+    return () if isinstance(key, slice) else (key,)
+
+
+# maps the types of model attributes which `MutableModelBase` returns unwrapped
+# to their unwrapping functions. Coerced types are added by `coerced_types`
+_unwrappers = {ModelShell: ModelShell.unshell}
+
 
 class MutableModelBase():
     """
     Base class for database models with `MutableType` columns. This allows you
     to store and retrieve database models in `MutableType` columns.
 
+    Sometimes programmers will set a Mutable attribute to a database model. 
+    When this occurs, `Mutable` coerces the model into a `ModelShell`. When 
+    the mappers are configured, the attributes of mutable columns of 
+    `MutableModelBase` subclasses are replaced by `_UnwrappingAttribute` 
+    descriptors, which return the original model instead of the shell. Other 
+    attributes are read at native speed.
+
     Examples
     --------
     Make sure you have run the [setup code](setup.md).
@@ -41,23 +149,126 @@ class MutableModelBase():
     <__main__.MyModel at 0x7f6bd9936668>
     ```
     """
-    def __getattribute__(self, name):
+    pass
+
+
+class _UnwrappingAttribute(InstrumentedAttribute):
+    """
+    Attribute of a mutable column of a `MutableModelBase` subclass. Model 
+    shells are returned as models, and coerced booleans as `bool` (see 
+    `_unwrappers`).
+    """
+    __slots__ = ()
+
+    def __get__(self, instance, owner):
+        obj = super().__get__(instance, owner)
+        if instance is None:
+            return obj
+        unwrap = _unwrappers.get(type(obj))
+        return obj if unwrap is None else unwrap(obj)
+
+
+# maps python types to whether their instances accept any attribute which is 
+# not a data descriptor (see `_check_settable`)
+_open_types = {}
+
+
+def _check_settable(python_type, name, obj):
+    """
+    Raise an error if an instance of `python_type` cannot set attribute 
+    `name` to `obj`.
+
+    Types whose instances have a `__dict__` and the default `__setattr__` 
+    accept any attribute which is not a data descriptor, which is checked 
+    without creating an instance. Other types are checked by setting the 
+    attribute of an empty instance.
+    """
+    is_open = _open_types.get(python_type)
+    if is_open is None:
+        is_open = _open_types[python_type] = (
+            python_type.__dictoffset__ != 0
+            and python_type.__setattr__ is object.__setattr__
+        )
+    if is_open and not hasattr(getattr(python_type, name, None), '__set__'):
+        return
+    empty = python_type.__new__(python_type)
+    empty.__setattr__(name, obj)
+
+
+_missing = object()
+
+
+class _TrackedAttribute():
+    """
+    Descriptor for a tracked attribute of a tracked type registered with 
+    `attrs` (see `Mutable.register_tracked_type`). The value is stored in the 
+    object's `__dict__`, like the attributes tracked by `Mutable.__setattr__`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the attribute.
+
+    default : 
+        Class attribute which the descriptor replaces, returned when the 
+        attribute is not set.
+    """
+    def __init__(self, name, default=_missing):
+        self.name = name
+        self.default = default
+
+    @classmethod
+    def install(cls, tracked_type, attrs):
         """
-        Sometimes programmers will set a Mutable attribute to a database 
-        model. When this occurs, `Mutable` coerces the model into a 
-        `ModelShell`. To retrieve the model, this method checks if a requested 
-        attribute is a `ModelShell`, and if so returns the original model.
-        
-        Note that this is identical to the `Mutable.__getattribute__`.
+        Install descriptors for the attributes of a tracked type. The tracked 
+        type's attributes are then set and read without the generic methods 
+        of `Mutable`.
         """
-        from .coerced_types import CoercedBool
-        
-        obj = super().__getattribute__(name)
-        if isinstance(obj, ModelShell):
-            return obj.unshell()
-        if isinstance(obj, CoercedBool):
-            return obj.value
-        return obj
+        for name in attrs:
+            default = getattr(tracked_type, name, _missing)
+            setattr(tracked_type, name, cls(name, default))
+        tracked_type.__getattribute__ = object.__getattribute__
+        tracked_type.__setattr__ = object.__setattr__
+        tracked_type.__delattr__ = object.__delattr__
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        state = obj.__dict__
+        try:
+            value = state[self.name]
+        except KeyError:
+            if self.default is _missing:
+                raise AttributeError(self.name) from None
+            return self.default
+        if isinstance(value, ModelShell):
+            return value.unshell()
+        if state.get('_cow') and isinstance(value, Mutable):
+            obj._own_children()
+            return state[self.name]
+        return value
+
+    def __set__(self, obj, value):
+        name = self.name
+        with _lock_of(obj):
+            obj._changed(name)
+            if name not in obj._tracked_attr_names:
+                obj._tracked_attr_names.add(name)
+            obj.__dict__[name] = obj._convert(value, obj.root, obj)
+
+    def __delete__(self, obj):
+        name = self.name
+        with _lock_of(obj):
+            if name not in obj.__dict__:
+                raise AttributeError(name)
+            obj._changed(name)
+            obj._tracked_attr_names.discard(name)
+            del obj.__dict__[name]
+
+
+def _lock_of(obj):
+    """Lock which writes to `obj` hold (see `synchronized`)"""
+    return obj._get_lock() if MutableManager.thread_safe else _no_lock
 
 
 class MutableType(PickleType):
@@ -71,10 +282,12 @@ class MutableType(PickleType):
     `dict` to mutable objects.
     3. Database models.
     """
-    pass
+    # the pickler and protocol make up the type's cache key, so statements 
+    # with mutable columns are cached like statements with pickle columns
+    cache_ok = True
 
 
-class MutableJSONType(JSON):
+class MutableJSONType(PatchableJSON):
     """
     Mutable column type with JSON serialization. `MutableJSONType` columns may
     be set to lists, dictionaries, and common literals which are JSON 
@@ -125,11 +338,31 @@ class Mutable(MutableBase):
     # 1. Register, coerce, and convert types  
     _coerced_type_mapping = {}
     _tracked_type_mapping = {}
-    _untracked_attr_names = [
+    # maps column types to the mutable classes associated with them
+    _associated_type_mapping = {}
+    _untracked_attr_names = frozenset((
         'root', '_root', '__dict__', '_python_type', 
         '_coerced_type_mapping', '_tracked_type_mapping',
-        '_tracked_attr_names', '_tracked_item_keys'
-    ]
+        '_associated_type_mapping',
+        '_tracked_attr_names', '_tracked_item_keys', '_lock', '_cow', 
+        '_cow_source', '_dirty', '_parent', '_version'
+    ))
+    # indicates that objects of the class are `ModelShell` objects, whose 
+    # attributes are not tracked
+    _is_model_shell = False
+    # indicates that `self` is a copy-on-write clone whose children may still 
+    # be shared with its source (see `clone`)
+    _cow = False
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Precompute the tracking metadata of a subclass, so `__setattr__` 
+        looks it up in constant time. Untracked attribute names which a 
+        subclass declares as a list or set are converted to a frozenset.
+        """
+        super().__init_subclass__(**kwargs)
+        cls._untracked_attr_names = frozenset(cls._untracked_attr_names)
+        cls._is_model_shell = issubclass(cls, ModelShell)
     
     @classmethod
     def register_coerced_type(cls, origin_type):
@@ -187,7 +420,7 @@ class Mutable(MutableBase):
         return register
     
     @classmethod
-    def register_tracked_type(cls, origin_type):
+    def register_tracked_type(cls, origin_type, attrs=None):
         """
         Decorator for tracked type registration.
         
@@ -196,11 +429,22 @@ class Mutable(MutableBase):
         invoked. Conversion occurs automatically on coersion and when setting 
         attributes and items.
 
+        By default, attributes of tracked types are tracked by the generic 
+        `__setattr__` and `__getattribute__` methods, which check every 
+        attribute name. If `attrs` is given, the tracked type instead tracks 
+        exactly these attributes with descriptors (see `_TrackedAttribute`). 
+        Reading them is a dictionary lookup, and writing them records a 
+        single change. Other attributes are set and read as normal, without 
+        change tracking.
+
         Parameters
         ----------
         origin_type : class
             The origin class.
 
+        attrs : iterable of str or None, default=None
+            Names of the attributes to track with descriptors.
+
         Returns
         -------
         register : callable
@@ -251,11 +495,38 @@ class Mutable(MutableBase):
         ```
         'hello, moon!'
         ```
+
+        To track the `name` attribute with a descriptor, register the 
+        tracked type with `@Mutable.register_tracked_type(MyClass, 
+        attrs=['name'])`.
         """
         def register(tracked_type):
+            if attrs is not None:
+                _TrackedAttribute.install(tracked_type, attrs)
             cls._tracked_type_mapping[origin_type] = tracked_type
             return tracked_type
         return register
+
+    @classmethod
+    def associate_with(cls, sqltype):
+        """
+        Associate the class with all columns of type `sqltype`, and record 
+        the association (see `sqlalchemy.ext.mutable.Mutable.associate_with`).
+        """
+        cls._associated_type_mapping[sqltype] = cls
+        super().associate_with(sqltype)
+
+    @classmethod
+    def _associated_class(cls, type_):
+        """
+        Mutable class associated with the column type instance `type_`, which
+        coerces the values set on its columns.
+        """
+        for base in type(type_).__mro__:
+            associated = cls._associated_type_mapping.get(base)
+            if associated is not None:
+                return associated
+        return Mutable
     
     @classmethod
     def coerce(cls, key, obj):
@@ -277,6 +548,14 @@ class Mutable(MutableBase):
         converted_obj : 
             Coerced or converted object.
         """
+        coerced_type = cls._coerced_type_mapping.get(type(obj))
+        if (
+            coerced_type is not None
+            and type(obj) not in cls._tracked_type_mapping
+        ):
+            # fast path for objects of coerced types (e.g. scalars), which
+            # are neither models nor tracked
+            return coerced_type(obj)
         converted_obj = cls._convert(obj)
         if isinstance(converted_obj, cls):
             return converted_obj
@@ -286,7 +565,7 @@ class Mutable(MutableBase):
         return super().coerce(cls, obj)
     
     @classmethod
-    def _convert(cls, obj, root=None):
+    def _convert(cls, obj, root=None, parent=None):
         """
         Convert object to tracked type or ModelShell.
         
@@ -305,6 +584,10 @@ class Mutable(MutableBase):
             Root mutable object. Mutable objects have a 'pointer' to the root 
             mutable object through which changes are registered.
 
+        parent : Mutable or None, default=None
+            Mutable object which will hold the converted object. Changes to 
+            the converted object bump the versions of its parents.
+
         Returns
         -------
         converted_obj :
@@ -314,9 +597,12 @@ class Mutable(MutableBase):
             return ModelShell(obj)
         tracked_type = cls._tracked_type_mapping.get(type(obj))
         if tracked_type is not None:
-            return tracked_type(obj, root)
-        if isinstance(obj, Mutable):
+            obj = tracked_type(obj, root)
+        elif isinstance(obj, Mutable):
             obj.root = root
+        else:
+            return obj
+        obj.__dict__['_parent'] = parent
         return obj
     
     @classmethod
@@ -330,8 +616,14 @@ class Mutable(MutableBase):
         return hasattr(obj, '__table__')
     
     def _convert_item(self, item):
-        """Convert a single item to Mutable object"""
-        return self._convert(item, self.root)
+        """Convert a single item to Mutable object
+        
+        Items added while `self` is being unpickled (i.e. `self.root` is 
+        None) are already converted. Their roots are set when the root 
+        Mutable object's state is set.
+        """
+        root = self.root
+        return item if root is None else self._convert(item, root, self)
     
     def _convert_iterable(self, iterable):
         """Convert items in iterable to Mutable objects"""
@@ -348,9 +640,10 @@ class Mutable(MutableBase):
         """Create new Mutable object
         
         Begin by creating a new object of type cls using super().__new__. If 
-        super().__new__ takes arguments, I assume the first argument is a 
-        source object (the new methods of many literals work this way). 
-        Otherwise, begin by creating an empty new object.
+        super().__new__ takes arguments (i.e. it is not `object.__new__`), I 
+        assume the first argument is a source object (the new methods of many 
+        literals work this way). Otherwise, begin by creating an empty new 
+        object.
         
         Then set the root, python type, and empty tracked attribute names 
         registry. The root is used to register changes with the root Mutable 
@@ -358,10 +651,11 @@ class Mutable(MutableBase):
         (see __setattr__). The tracked attribute registry is used for 
         assigning new root mutable objects.
         """
-        try:
-            new = super().__new__(cls, source)
-        except:
-            new = super().__new__(cls)
+        base_new = super().__new__
+        if source is None or base_new is object.__new__:
+            new = base_new(cls)
+        else:
+            new = base_new(cls, source)
         new._python_type = None if source is None else type(source)
         new._tracked_attr_names = set()
         new.root = root
@@ -375,42 +669,266 @@ class Mutable(MutableBase):
         process of being unpickled. This is indicated by returning None.
         
         If _root is None, self is the root Mutable object.
+
+        `_root` is read with `object.__getattribute__`, which skips the 
+        unshelling and copy-on-write checks of `__getattribute__`. These do 
+        not apply to untracked attributes.
         """
-        if not hasattr(self, '_root'):
+        try:
+            root = object.__getattribute__(self, '_root')
+        except AttributeError:
             return
-        return self if self._root is None else self._root
+        return self if root is None else root
     
     @root.setter
+    @synchronized
     def root(self, root):
         """Set root Mutable object
         
         Recursively set the root Mutable object for all tracked children.
         """
-        self._root = root
+        self._set_root(root)
+
+    def _set_root(self, root):
+        """Set root Mutable object for self and all tracked children
+        
+        `_root` is written to `self.__dict__` directly, and children are set 
+        by calling `_set_root`, so the recursion does not go through 
+        `__setattr__`.
+
+        Children which a copy-on-write clone still shares with its source 
+        belong to the source's root, and keep it (see `clone`). Other 
+        children's parent is set to `self`.
+        """
+        state = self.__dict__
+        cow = state.get('_cow', False)
+        if cow:
+            old_root = self.root
+        state['_root'] = root
+        if root is None:
+            state['_parent'] = None
+            root = self
         for child in self._tracked_children:
             if isinstance(child, Mutable):
-                child.root = self.root
+                if not cow or child.root is old_root:
+                    child._set_root(root)
+                    child.__dict__['_parent'] = self
         
     @property
     def _tracked_children(self):
         """Return a list of all tracked children (attributes and items)"""
-        tracked_children = [
-            self.__getattribute__(name) for name in self._tracked_attr_names
-        ]
+        state = self.__dict__
+        tracked_children = [state[name] for name in self._tracked_attr_names]
         if hasattr(self, '_tracked_items'):
             tracked_children += list(self._tracked_items)
         return tracked_children
     
-    def _changed(self):
+    def _get_lock(self):
+        """Get the lock of the root Mutable object
+        
+        The lock is created the first time it is requested. 
+        `dict.setdefault` is atomic, so two threads which request the lock at 
+        the same time receive the same lock.
+
+        Objects without a root (i.e. objects which are being unpickled or 
+        constructed) are not shared between threads, and do not need a lock.
+        """
+        root = self.root
+        if root is None:
+            return _no_lock
+        lock = root.__dict__.get('_lock')
+        if lock is None:
+            lock = root.__dict__.setdefault('_lock', RLock())
+        return lock
+
+    def _changed(self, *keys):
         """Mark the root Mutable object as changed
         
         `self.root` will be None during unpickling. In this case, no change is 
         necessary (or possible).
+
+        `keys` are the attribute names or item keys of the children of `self` 
+        which changed. If no keys are given, `self` changed as a whole (e.g. a 
+        list was sorted). Changes are recorded in the root's `_dirty` 
+        registry (see `_DirtyRegistry`).
+
+        The versions of `self` and its parents are bumped.
+        """
+        root = self.root
+        if root is None:
+            return
+        obj = self
+        while obj is not None:
+            state = obj.__dict__
+            state['_version'] = state.get('_version', 0) + 1
+            obj = state.get('_parent')
+        dirty = root.__dict__.get('_dirty')
+        if dirty is None:
+            dirty = root.__dict__['_dirty'] = _DirtyRegistry()
+        dirty.record(self, keys, root)
+        Mutable.changed(root)
+
+    def get_version(self):
+        """
+        Number of changes to `self` and its children.
+
+        The version of a mutable object increases whenever it or one of its 
+        children (at any depth) changes, so caches of values computed from a 
+        mutable object can check in O(1) that the object has not changed.
+
+        Returns
+        -------
+        version : int
+
+        Examples
+        --------
+        Make sure you have run the [setup code](setup.md).
+
+        ```python
+        model = MyModel()
+        model.mutable = {'settings': {'theme': 'dark'}, 'items': []}
+        version = model.mutable.get_version()
+        items_version = model.mutable['items'].get_version()
+        model.mutable['settings']['theme'] = 'light'
+        (
+        \    model.mutable.get_version() > version, 
+        \    model.mutable['items'].get_version() > items_version
+        )
+        ```
+
+        Out:
+
+        ```
+        (True, False)
+        ```
         """
-        if self.root is not None:
-            Mutable.changed(self.root)
+        return self.__dict__.get('_version', 0)
+
+    def _keyed_children(self):
+        """Return a list of (attribute name or item key, child) pairs"""
+        state = self.__dict__
+        return [
+            (name, state[name]) 
+            for name in state.get('_tracked_attr_names', ())
+        ] + self._keyed_items()
+
+    def _keyed_items(self):
+        """Return a list of (key, item) pairs"""
+        return []
+
+    def _shells(self):
+        """Yield the `ModelShell` objects among self's descendants"""
+        for key, child in self._keyed_children():
+            if isinstance(child, ModelShell):
+                yield child
+            elif isinstance(child, Mutable):
+                yield from child._shells()
+
+    def dirty_paths(self):
+        """
+        Paths from `self` to the children which changed since the root 
+        mutable object was last flushed.
+
+        A path is a tuple of attribute names and item keys. If an object 
+        changed as a whole (e.g. a list was sorted), its path ends at the 
+        object itself. Children of changed paths are not listed.
+
+        Returns
+        -------
+        paths : set of tuple
+            Changed paths.
+
+        Notes
+        -----
+        Changes are recorded by the root mutable object, and forgotten when 
+        its column is flushed or when `reset_dirty_paths` is called. Objects 
+        which were detached from the tree after they changed are not listed. 
+        Once more than 1000 changed keys are recorded, the root is recorded 
+        as changed as a whole, and its only path is `()`.
+
+        Examples
+        --------
+        Make sure you have run the [setup code](setup.md).
+
+        ```python
+        model = MyModel()
+        model.mutable = {'settings': {'theme': 'dark'}, 'items': [0, 1]}
+        session.add(model)
+        session.commit()
+        model.mutable['settings']['theme'] = 'light'
+        model.mutable['items'].append(2)
+        model.mutable.dirty_paths()
+        ```
+
+        Out:
+
+        ```
+        {('settings', 'theme'), ('items', 2)}
+        ```
+        """
+        root = self.root
+        dirty = None if root is None else root.__dict__.get('_dirty')
+        if not dirty:
+            return set()
+        if dirty.get(id(root), (None, ()))[1] is None:
+            return {()}
+        # stop once every changed object is found, and do not descend into 
+        # changed children
+        paths, stack, remaining = set(), [((), self)], len(dirty)
+        while stack and remaining:
+            path, obj = stack.pop()
+            entry = dirty.get(id(obj))
+            keys = ()
+            if entry is not None:
+                remaining -= 1
+                keys = entry[1]
+                if keys is None:
+                    paths.add(path)
+                    continue
+                paths.update(path + (key,) for key in keys)
+            stack.extend(
+                (path + (key,), child) 
+                for key, child in obj._keyed_children()
+                if isinstance(child, Mutable) and key not in keys
+            )
+        return paths
+
+    def reset_dirty_paths(self):
+        """
+        Forget the changes recorded by the root mutable object.
+        """
+        root = self.root
+        if root is not None:
+            root.__dict__.pop('_dirty', None)
+
+    @classmethod
+    def _listen_on_attribute(cls, attribute, coerce, parent_cls):
+        """
+        Establish this type as a mutation listener for the given mapped 
+        descriptor, and forget recorded changes when the column is flushed. 
+        Attributes of `MutableModelBase` subclasses unwrap their values (see 
+        `MutableModelBase`).
+        """
+        super()._listen_on_attribute(attribute, coerce, parent_cls)
+        if parent_cls is not attribute.class_:
+            return
+        if (
+            issubclass(parent_cls, MutableModelBase)
+            and type(attribute) is InstrumentedAttribute
+        ):
+            attribute.__class__ = _UnwrappingAttribute
+        key = attribute.key
+
+        def flushed(mapper, connection, target):
+            value = target.__dict__.get(key)
+            if isinstance(value, Mutable):
+                value.reset_dirty_paths()
+
+        event.listen(parent_cls, 'after_insert', flushed, propagate=True)
+        event.listen(parent_cls, 'after_update', flushed, propagate=True)
     
     # 3. Attribute and item management
+    @synchronized
     def __setattr__(self, name, obj):
         """Set attribute
         
@@ -427,48 +945,83 @@ class Mutable(MutableBase):
         If so, indicate that `self` has changed, add the attribute name to the
         tracked attribute registry, and set the attribute.
         """
-        if name in self._untracked_attr_names or isinstance(self, ModelShell):
+        cls = type(self)
+        if cls._is_model_shell or name in cls._untracked_attr_names:
             return super().__setattr__(name, obj)
-        if self._python_type is not None:
-            empty = self._python_type.__new__(self._python_type)
-            empty.__setattr__(name, obj)
-        self._changed()
-        self._tracked_attr_names.add(name)
-        super().__setattr__(name, self._convert(obj, self.root)) 
+        python_type = self._python_type
+        if python_type is not None:
+            _check_settable(python_type, name, obj)
+        # methods are looked up on the class, which skips `__getattribute__`
+        cls._changed(self, name)
+        # coerced boxes track their value attribute with a class-level 
+        # frozenset, to which the name need not be added (and which rejects 
+        # other attributes)
+        if name not in self._tracked_attr_names:
+            self._tracked_attr_names.add(name)
+        super().__setattr__(name, cls._convert(obj, self.root, self))
 
     def __getattribute__(self, name):
         obj = super().__getattribute__(name)
-        return obj.unshell() if isinstance(obj, ModelShell) else obj
+        if isinstance(obj, ModelShell):
+            return obj.unshell()
+        if (
+            isinstance(obj, Mutable) and super().__getattribute__('_cow')
+            and name in super().__getattribute__('_tracked_attr_names')
+        ):
+            self._own_children()
+            return super().__getattribute__(name)
+        return obj
     
+    @synchronized
     def __delattr__(self, name):
         if name in self._tracked_attr_names:
-            self._changed()
+            self._changed(name)
             self._tracked_attr_names.remove(name)
         super().__delattr__(name)
     
+    @synchronized
     def __setitem__(self, key, obj):
-        self._changed()
-        super().__setitem__(key, self._convert(obj, self.root))
+        self._changed(*_item_keys(key))
+        super().__setitem__(key, self._convert_item(obj))
     
     def __getitem__(self, key):
+        if self._cow:
+            self._own_children()
         obj = super().__getitem__(key)
         return obj.unshell() if isinstance(obj, ModelShell) else obj
     
+    @synchronized
     def __delitem__(self, key):
-        self._changed()
+        self._changed(*_item_keys(key))
         super().__delitem__(key)
     
     # 4. State management (for pickling and unpickling)
+
+    # attributes which describe the object's place in the current process 
+    # (its root and parent, SQLAlchemy parents, lock, clone status and 
+    # source, unflushed changes, and version), and which are not pickled
+    _transient_attr_names = frozenset((
+        '_root', '_parent', '_parents', '_lock', '_cow', '_cow_source', 
+        '_dirty', '_version'
+    ))
+
     def __getstate__(self):
         """Get state for pickling
         
-        State is self.__dict__ but with `_root` replaced by an `isroot`
-        indicator.
+        State is self.__dict__ without transient attributes, and with an 
+        `isroot` indicator if self is the root. An empty tracked attribute 
+        registry is omitted.
         """
-        state = self.__dict__.copy()
-        state.pop('_parents', None)
-        state.pop('_root', None)
-        state['isroot'] = self == self.root
+        transient = self._transient_attr_names
+        attrs = self.__dict__
+        state = {
+            name: value for name, value in attrs.items() 
+            if name not in transient
+        }
+        if not state.get('_tracked_attr_names', True):
+            del state['_tracked_attr_names']
+        if '_root' in attrs and attrs['_root'] is None:
+            state['isroot'] = True
         return state
     
     def __setstate__(self, state):
@@ -476,12 +1029,134 @@ class Mutable(MutableBase):
         
         If self is the root Mutable object, set the root for self 
         (and all Mutable children).
+
+        Objects pickled by earlier versions are created with a root, and add 
+        their items through the tracked methods, which records changes and 
+        bumps versions. These are forgotten, because the items were loaded, 
+        not changed.
         """
         isroot = state.pop('isroot', None)
-        self.__dict__ = state
+        attrs = self.__dict__
+        attrs.pop('_dirty', None)
+        attrs.pop('_version', None)
+        attrs.update(state)
+        if '_tracked_attr_names' not in state:
+            self._tracked_attr_names = set()
         if isroot:
             self.root = None
 
+    # 5. Copy-on-write cloning
+    def clone(self):
+        """
+        Create a copy-on-write clone of `self`.
+
+        The clone is a new root mutable object which initially shares all of 
+        its mutable children with `self`. A shared child is copied the first 
+        time the clone exposes it (e.g. through `__getitem__`, attribute 
+        access, or iteration). The copy belongs to the clone's root, and its 
+        own children are shared and copied in the same way. Subtrees which 
+        are never touched are never copied.
+
+        Returns
+        -------
+        clone : sqlalchemy_mutable.Mutable
+            Clone of `self`.
+
+        Notes
+        -----
+        The clone reads children of `self` which it has not yet copied. Treat 
+        `self` as a read-only template after cloning it.
+
+        Examples
+        --------
+        Make sure you have run the [setup code](setup.md).
+
+        ```python
+        template = MutableDict({'settings': {'theme': 'dark'}})
+        model0, model1 = MyModel(), MyModel()
+        model0.mutable = template.clone()
+        model1.mutable = template.clone()
+        model0.mutable['settings']['theme'] = 'light'
+        model0.mutable, model1.mutable
+        ```
+
+        Out:
+
+        ```
+        ({'settings': {'theme': 'light'}}, {'settings': {'theme': 'dark'}})
+        ```
+        """
+        return self._cow_copy(None)
+
+    def _cow_copy(self, root):
+        """Shallow copy of `self` whose root is `root`
+        
+        The copy shares the mutable children of `self` until it exposes them. 
+        Container types copy their items in `_cow_copy_items`.
+
+        The copy records a weak reference to `self` and the version of `self` 
+        as `_cow_source`, so `diff` can skip copies which did not change. The 
+        reference is weak, so chains of clones do not keep their sources 
+        alive.
+        """
+        cls = self.__class__
+        new = super(Mutable, cls).__new__(cls)
+        state = new.__dict__
+        state.update(self.__dict__)
+        state.pop('_parents', None)
+        state.pop('_lock', None)
+        state.pop('_dirty', None)
+        state['_parent'] = None
+        state['_tracked_attr_names'] = set(
+            self.__dict__.get('_tracked_attr_names', ())
+        )
+        state['_root'] = root
+        state['_cow'] = True
+        state['_cow_source'] = (
+            weakref.ref(self), self.__dict__.get('_version', 0)
+        )
+        self._cow_copy_items(new)
+        return new
+
+    def _cow_copy_items(self, new):
+        """Copy the items of `self` to a new copy-on-write clone"""
+        pass
+
+    def _own_children(self):
+        """Replace children shared with the source of a clone by copies
+        
+        This runs once, the first time a copy-on-write clone exposes one of 
+        its children. Children whose root is not the clone's root are shared, 
+        and are replaced by copies which belong to the clone's root.
+
+        Reads expose children, so this holds the root's lock like writes do 
+        (see `synchronized`). Otherwise two readers could each copy the same 
+        child, and writes to the copy which is replaced would be lost. `_cow` 
+        is cleared once every child is owned, so readers which check it 
+        without the lock do not read children which are still shared.
+        """
+        with _lock_of(self):
+            state = self.__dict__
+            if not state.get('_cow'):
+                return
+            root = self.root
+            for name in self._tracked_attr_names:
+                child = state[name]
+                if isinstance(child, Mutable) and child.root is not root:
+                    state[name] = self._cow_child(child, root)
+            self._own_items(root)
+            state['_cow'] = False
+
+    def _cow_child(self, child, root):
+        """Copy of a shared child which belongs to `root` and to `self`"""
+        copy = child._cow_copy(root)
+        copy.__dict__['_parent'] = self
+        return copy
+
+    def _own_items(self, root):
+        """Replace items shared with the source of a clone by copies"""
+        pass
+
     
 Mutable.associate_with(MutableType)
 Mutable.associate_with(MutableJSONType)
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""# Mutable deque
+
+Mutable deques are double-ended queues which track changes like mutable
+lists. Items are appended and popped from either end in constant time, and
+deques with a `maxlen` discard items from the opposite end when they are
+full.
+
+Notes
+-----
+In the setup code, we use a `MutableType` database column, which handles
+deques as well as other objects. To force the column to be a deque,
+substitute `MutableDequeType` for `MutableType`.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from collections import deque
+
+model = MyModel()
+model.mutable = deque(['first', 'second'])
+session.add(model)
+session.commit()
+# without a mutable deque,
+# this change will not survive a commit
+model.mutable.popleft()
+model.mutable.append('third')
+session.commit()
+model.mutable
+```
+
+Out:
+
+```
+MutableDeque(['second', 'third'])
+```
+"""
+
+from .mutable import Mutable, _reconstruct, synchronized
+from .model_shell import ModelShell
+
+from sqlalchemy.types import PickleType
+
+from collections import deque
+
+
+class MutableDequeType(PickleType):
+    """
+    Mutable deque database type with pickle serialization.
+    """
+    cache_ok = True
+
+
+def _reconstruct_deque(cls, maxlen):
+    """
+    Create an empty mutable deque of type `cls` for unpickling (see
+    `_reconstruct`).
+    """
+    new = _reconstruct(cls)
+    deque.__init__(new, (), maxlen)
+    return new
+
+
+@Mutable.register_tracked_type(deque)
+class MutableDeque(Mutable, deque):
+    """Subclasses `collections.deque`, and implements all `deque` methods.
+
+    Parameters
+    ----------
+    source : iterable, default=()
+        Source objects which will be converted into a mutable deque.
+
+    root : sqlalchemy.Mutable or None, default=None
+        Root mutable object. If `None`, `self` is assumed to be the root.
+
+    maxlen : int or None, default=None
+        Maximum length of the deque. If `None`, the maximum length of
+        `source` is used if `source` is a deque.
+    """
+    @classmethod
+    def coerce(cls, key, obj):
+        """Object must be an iterable of items or None"""
+        if isinstance(obj, cls):
+            return obj
+        if isinstance(obj, (deque, list, tuple)):
+            return cls(obj)
+        if not obj:
+            return cls()
+        return cls([obj])
+
+    def __init__(self, source=(), root=None, maxlen=None):
+        if maxlen is None and isinstance(source, deque):
+            maxlen = source.maxlen
+        super().__init__(
+            [self._convert_item(item) for item in source], maxlen
+        )
+
+    @property
+    def _tracked_items(self):
+        return list(deque.__iter__(self))
+
+    def _keyed_items(self):
+        return list(enumerate(deque.__iter__(self)))
+
+    def __reduce_ex__(self, protocol):
+        """Items are pickled directly from the deque, without copying it"""
+        return (
+            _reconstruct_deque, (self.__class__, self.maxlen),
+            self.__getstate__(), deque.__iter__(self), None
+        )
+
+    def __iter__(self):
+        if self._cow:
+            self._own_children()
+        return super().__iter__()
+
+    def _cow_copy_items(self, new):
+        deque.__init__(new, deque.__iter__(self), self.maxlen)
+
+    def _own_items(self, root):
+        for i, item in enumerate(deque.__iter__(self)):
+            if isinstance(item, Mutable) and item.root is not root:
+                deque.__setitem__(self, i, self._cow_child(item, root))
+
+    # `deque` copies by calling the class with the maximum length as the
+    # second argument, which is the root of a mutable deque
+    def copy(self):
+        """Shallow copy of `self` as a `deque`"""
+        return deque(deque.__iter__(self), self.maxlen)
+
+    __copy__ = copy
+
+    def __add__(self, other):
+        new = self.copy()
+        new.extend(other)
+        return new
+
+    def __mul__(self, n):
+        new = self.copy()
+        new *= n
+        return new
+
+    __rmul__ = __mul__
+
+    @synchronized
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    @synchronized
+    def __imul__(self, n):
+        self._changed()
+        return super().__imul__(n)
+
+    @synchronized
+    def __setitem__(self, key, item):
+        self._changed(self._index(key))
+        return deque.__setitem__(self, key, self._convert_item(item))
+
+    @synchronized
+    def __delitem__(self, key):
+        self._changed_removal(key)
+        return super().__delitem__(key)
+
+    @synchronized
+    def append(self, item):
+        if self._full(1):
+            self._changed()
+        else:
+            self._changed(len(self))
+        return super().append(self._convert_item(item))
+
+    @synchronized
+    def appendleft(self, item):
+        self._changed()
+        return super().appendleft(self._convert_item(item))
+
+    @synchronized
+    def clear(self):
+        self._changed()
+        return super().clear()
+
+    @synchronized
+    def extend(self, iterable):
+        items = [self._convert_item(item) for item in iterable]
+        if self._full(len(items)):
+            self._changed()
+        elif items:
+            self._changed(*range(len(self), len(self) + len(items)))
+        return super().extend(items)
+
+    @synchronized
+    def extendleft(self, iterable):
+        self._changed()
+        return super().extendleft(
+            [self._convert_item(item) for item in iterable]
+        )
+
+    @synchronized
+    def insert(self, index, item):
+        self._changed()
+        return super().insert(index, self._convert_item(item))
+
+    @synchronized
+    def pop(self):
+        if not self:
+            raise IndexError('pop from an empty deque')
+        if self._cow:
+            self._own_children()
+        self._changed_removal(-1)
+        return super().pop()
+
+    @synchronized
+    def popleft(self):
+        if not self:
+            raise IndexError('pop from an empty deque')
+        if self._cow:
+            self._own_children()
+        self._changed()
+        return super().popleft()
+
+    @synchronized
+    def remove(self, obj):
+        if not deque.__contains__(self, obj):
+            raise ValueError('{!r} is not in deque'.format(obj))
+        self._changed()
+        return super().remove(obj)
+
+    @synchronized
+    def reverse(self):
+        self._changed()
+        return super().reverse()
+
+    @synchronized
+    def rotate(self, n=1):
+        self._changed()
+        return super().rotate(n)
+
+    def _full(self, n):
+        """Indicates that adding `n` items discards items from the left"""
+        return self.maxlen is not None and len(self) + n > self.maxlen
+
+    def _index(self, key):
+        """Non-negative index of the item at `key`"""
+        return key + len(self) if key < 0 else key
+
+    def _changed_removal(self, key):
+        """Record that the item at `key` will be removed
+
+        Removing any item but the last shifts the items after it, which
+        changes the deque as a whole.
+        """
+        if self._index(key) == len(self) - 1:
+            self._changed(len(self) - 1)
+        else:
+            self._changed()
+
+    def unshell(self):
+        """
+        Unshell the models in the deque.
+
+        Returns
+        -------
+        copy : deque
+            Shallow copy of `self` where all `ModelShell` items are unshelled.
+        """
+        return deque(
+            (
+                i.unshell() if isinstance(i, ModelShell) else i
+                for i in deque.__iter__(self)
+            ),
+            self.maxlen
+        )
+
+
+MutableDeque.associate_with(MutableDequeType)
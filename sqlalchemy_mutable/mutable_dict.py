@@ -30,20 +30,21 @@ Out:
 ```
 """
 
-from .mutable import Mutable
+from .json_patch import PatchableJSON
+from .mutable import Mutable, _reconstruct, synchronized
 from .model_shell import ModelShell
 
-from sqlalchemy.types import JSON, PickleType
+from sqlalchemy.types import PickleType
 
 
 class MutableDictType(PickleType):
     """
     Mutable dictionary database type with pickle serialization.
     """
-    pass
+    cache_ok = True
 
 
-class MutableDictJSONType(JSON):
+class MutableDictJSONType(PatchableJSON):
     """
     Mutable dictionary database type with JSON serialization.
     """
@@ -84,38 +85,66 @@ class MutableDict(Mutable, dict):
     @property
     def _tracked_items(self):
         return super().values()
+
+    def _keyed_items(self):
+        return list(dict.items(self))
+
+    def _cow_copy_items(self, new):
+        dict.update(new, self)
+
+    def _own_items(self, root):
+        for key, val in dict.items(self):
+            if isinstance(val, Mutable) and val.root is not root:
+                dict.__setitem__(self, key, self._cow_child(val, root))
     
     # 1. Pickling
-    
-    # Note: _mapping is the key: value mapping of the dictionary. It is used 
-    # only when pickling, and is therefore not a tracked attribute.
-    _untracked_attr_names = Mutable._untracked_attr_names + ['_mapping']
-    
-    def __getstate__(self):
-        self._mapping = dict(self)
-        return super().__getstate__()
+    def __reduce_ex__(self, protocol):
+        """
+        Items are pickled directly from the dictionary, without unshelling 
+        models or copying the dictionary.
+        """
+        return (
+            _reconstruct, (self.__class__,), self.__getstate__(), 
+            None, iter(dict.items(self))
+        )
     
     def __setstate__(self, state):
-        self.update(state.pop('_mapping'))
+        # dictionaries pickled by earlier versions store their items in a 
+        # `_mapping` copy
+        mapping = state.pop('_mapping', None)
+        if mapping is not None:
+            dict.update(self, mapping)
         super().__setstate__(state)
     
    # 2. Register changes for dict methods
+    @synchronized
     def clear(self):
         self._changed()
         super().clear()
 
-    def pop(self, *key_and_default):
-        self._changed()
-        return super().pop(*key_and_default)
+    @synchronized
+    def pop(self, key, *default):
+        if self._cow:
+            self._own_children()
+        self._changed(key)
+        return super().pop(key, *default)
 
+    @synchronized
     def popitem(self):
-        self._changed()
-        return super().popitem()
+        if self._cow:
+            self._own_children()
+        key, val = super().popitem()
+        self._changed(key)
+        return key, val
 
+    @synchronized
     def update(self, source={}):
-        self._changed()
-        super().update(self._convert_mapping(source))
+        mapping = self._convert_mapping(source)
+        if mapping:
+            self._changed(*mapping)
+        super().update(mapping)
 
+    @synchronized
     def setdefault(self, key, default=None):
         if key in self:
             return self[key]
@@ -127,6 +156,9 @@ class MutableDict(Mutable, dict):
         return self[key]
     
     # 3. Unshell models when returning values and items iterators
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
     def values(self):
         return self.unshell().values()
     
@@ -142,6 +174,8 @@ class MutableDict(Mutable, dict):
         copy : dict
             Shallow copy of `self` where all `ModelShell` values are unshelled.
         """
+        if self._cow:
+            self._own_children()
         return {
             key: val.unshell() if hasattr(val, 'unshell') else val
             for key, val in super().items()
@@ -29,20 +29,21 @@ Out:
 ```
 """
 
-from .mutable import Mutable
+from .json_patch import PatchableJSON
+from .mutable import Mutable, _reconstruct, synchronized
 from .model_shell import ModelShell
 
-from sqlalchemy.types import JSON, PickleType
+from sqlalchemy.types import PickleType
 
 
 class MutableListType(PickleType):
     """
     Mutable list database type with pickle serialization.
     """
-    pass
+    cache_ok = True
 
 
-class MutableListJSONType(JSON):
+class MutableListJSONType(PatchableJSON):
     """
     Mutable list database type with JSON serialization.
     """
@@ -82,12 +83,38 @@ class MutableList(Mutable, list):
     
     @property
     def _tracked_items(self):
-        return list(self)
+        return list.copy(self)
+
+    def _keyed_items(self):
+        return list(enumerate(list.__iter__(self)))
+
+    def __reduce_ex__(self, protocol):
+        """Items are pickled directly from the list, without copying it"""
+        return (
+            _reconstruct, (self.__class__,), self.__getstate__(), 
+            list.__iter__(self), None
+        )
+
+    def __iter__(self):
+        if self._cow:
+            self._own_children()
+        return super().__iter__()
+
+    def _cow_copy_items(self, new):
+        list.extend(new, list.__iter__(self))
+
+    def _own_items(self, root):
+        for i, item in enumerate(list.__iter__(self)):
+            if isinstance(item, Mutable) and item.root is not root:
+                list.__setitem__(self, i, self._cow_child(item, root))
     
+    @synchronized
     def __iadd__(self, items):
-        self._changed()
-        return super().__iadd__(self._convert_iterable(items))
+        items = [self._convert_item(item) for item in items]
+        self._changed_tail(len(items))
+        return super().__iadd__(items)
 
+    @synchronized
     def __imul__(self, val):
         self._changed()
         return super().__imul__(val)
@@ -97,42 +124,85 @@ class MutableList(Mutable, list):
             return self.__class__(super().__getitem__(key))
         return super().__getitem__(key)
 
+    @synchronized
     def __setitem__(self, key, items):
-        self._changed()
         if isinstance(key, slice):
+            self._changed()
             items = self._convert_iterable(items)
         else:
+            self._changed(self._index(key))
             items = self._convert_item(items)
         return super().__setitem__(key, items)
 
+    @synchronized
+    def __delitem__(self, key):
+        self._changed_removal(key)
+        return super().__delitem__(key)
+
+    @synchronized
     def append(self, item):
-        self._changed()
+        self._changed(len(self))
         return super().append(self._convert_item(item))
 
+    @synchronized
     def clear(self):
         self._changed()
         return super().clear()
 
+    @synchronized
     def extend(self, iterable):
+        items = [self._convert_item(item) for item in iterable]
+        self._changed_tail(len(items))
+        return super().extend(items)
+
+    @synchronized
+    def insert(self, index, item):
         self._changed()
-        return super().extend(self._convert_iterable(iterable))
+        return super().insert(index, self._convert_item(item))
 
+    @synchronized
     def remove(self, obj):
         self._changed()
         return super().remove(obj)
 
+    @synchronized
     def reverse(self):
         self._changed()
         return super().reverse()
 
-    def pop(self, index):
-        self._changed()
+    @synchronized
+    def pop(self, index=-1):
+        if self._cow:
+            self._own_children()
+        self._changed_removal(index)
         return super().pop(index)
 
+    @synchronized
     def sort(self, key=None, reverse=False):
         self._changed()
         return super().sort(key=key, reverse=reverse)
     
+    def _index(self, key):
+        """Non-negative index of the item at `key`"""
+        return key + len(self) if isinstance(key, int) and key < 0 else key
+
+    def _changed_tail(self, n):
+        """Record that `n` items will be appended"""
+        if n:
+            self._changed(*range(len(self), len(self) + n))
+
+    def _changed_removal(self, key):
+        """Record that the item at `key` will be removed
+        
+        Removing any item but the last shifts the items after it, which 
+        changes the list as a whole.
+        """
+        index = self._index(key)
+        if isinstance(index, int) and index == len(self) - 1:
+            self._changed(index)
+        else:
+            self._changed()
+
     def unshell(self):
         """
         Call to force values to unshell. Normally this occurs automatically.
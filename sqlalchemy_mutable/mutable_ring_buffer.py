@@ -0,0 +1,119 @@
+"""# Mutable ring buffer
+
+Ring buffers are deques with a fixed capacity. When a ring buffer is full,
+appending an item discards the item at the opposite end in constant time,
+which keeps e.g. the last N events of a model without trimming the list on
+each write.
+
+Notes
+-----
+To force a column to be a ring buffer, use `MutableRingBufferType`. Values
+set on the column must be ring buffers or deques with a `maxlen`.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from sqlalchemy_mutable import RingBuffer
+
+model = MyModel()
+model.mutable = RingBuffer(capacity=2)
+session.add(model)
+session.commit()
+for event in ('login', 'view', 'logout'):
+\    model.mutable.append(event)
+session.commit()
+list(model.mutable)
+```
+
+Out:
+
+```
+['view', 'logout']
+```
+"""
+
+from .mutable import Mutable
+from .mutable_deque import MutableDeque
+
+from sqlalchemy.types import PickleType
+
+from collections import deque
+
+
+class MutableRingBufferType(PickleType):
+    """
+    Mutable ring buffer database type with pickle serialization.
+    """
+    cache_ok = True
+
+
+class RingBuffer(deque):
+    """Deque with a fixed capacity.
+
+    Parameters
+    ----------
+    iterable : iterable, default=()
+        Items of the ring buffer. If there are more items than the capacity,
+        only the last items are kept.
+
+    capacity : int
+        Maximum number of items.
+    """
+    def __init__(self, iterable=(), capacity=None):
+        if capacity is None:
+            raise TypeError('Ring buffers require a capacity')
+        super().__init__(iterable, capacity)
+
+    @property
+    def capacity(self):
+        """Maximum number of items"""
+        return self.maxlen
+
+
+@Mutable.register_tracked_type(RingBuffer)
+class MutableRingBuffer(MutableDeque, RingBuffer):
+    """Subclasses `RingBuffer`, and tracks changes like `MutableDeque`.
+
+    Parameters
+    ----------
+    source : iterable, default=()
+        Source objects which will be converted into a mutable ring buffer.
+
+    root : sqlalchemy.Mutable or None, default=None
+        Root mutable object. If `None`, `self` is assumed to be the root.
+
+    capacity : int or None, default=None
+        Maximum number of items. If `None`, the maximum length of `source` is
+        used. `source` must then be a deque with a maximum length.
+    """
+    @classmethod
+    def coerce(cls, key, obj):
+        """Object must be a deque with a maximum length"""
+        if isinstance(obj, cls):
+            return obj
+        return cls(obj)
+
+    def __init__(self, source=(), root=None, capacity=None):
+        super().__init__(source, root, capacity)
+
+    def copy(self):
+        """Shallow copy of `self` as a `RingBuffer`"""
+        return RingBuffer(deque.__iter__(self), self.maxlen)
+
+    __copy__ = copy
+
+    def unshell(self):
+        """
+        Unshell the models in the ring buffer.
+
+        Returns
+        -------
+        copy : RingBuffer
+            Shallow copy of `self` where all `ModelShell` items are unshelled.
+        """
+        return RingBuffer(super().unshell(), self.maxlen)
+
+
+MutableRingBuffer.associate_with(MutableRingBufferType)
@@ -0,0 +1,260 @@
+"""# Mutable set
+
+Notes
+-----
+In the setup code, we use a `MutableType` database column, which handles
+sets as well as other objects. To force the column to be a set, substitute
+`MutableSetType` or `MutableSetJSONType` for `MutableType`.
+
+`MutableSetJSONType` columns store sets as sorted JSON lists, so equal sets
+are always stored as the same document. Tuples are stored as lists, and
+loaded as tuples.
+
+Set items are hashable, and are stored as they are, except database models,
+which are stored as `ModelShell` objects. Checking whether a model is in a
+set does not load the set's models, and models without an identity (which
+have not been flushed) are never in a set.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+model = MyModel()
+model.mutable = {'red'}
+session.add(model)
+session.commit()
+# without a mutable set,
+# this change will not survive a commit
+model.mutable.add('blue')
+session.commit()
+sorted(model.mutable)
+```
+
+Out:
+
+```
+['blue', 'red']
+```
+"""
+
+from .mutable import Mutable, _missing, synchronized
+from .model_shell import ModelShell
+
+from sqlalchemy import inspect
+from sqlalchemy.types import JSON, PickleType, TypeDecorator
+
+import json
+
+
+class MutableSetType(PickleType):
+    """
+    Mutable set database type with pickle serialization.
+    """
+    cache_ok = True
+
+
+class MutableSetJSONType(TypeDecorator):
+    """
+    Mutable set database type with JSON serialization. Sets are stored as
+    sorted lists.
+    """
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return _canonical_list(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return set(_hashable(item) for item in value)
+
+
+def _canonical_list(items):
+    """
+    Sorted list of a set's items. Items which cannot be compared with each
+    other (e.g. strings and numbers) are sorted by their JSON encoding.
+    """
+    items = [
+        list(item) if isinstance(item, tuple) else item for item in items
+    ]
+    try:
+        return sorted(items)
+    except TypeError:
+        return sorted(items, key=_json_key)
+
+
+def _json_key(item):
+    return json.dumps(item, sort_keys=True)
+
+
+def _hashable(item):
+    """Convert the JSON lists in an item to tuples"""
+    if isinstance(item, list):
+        return tuple(_hashable(i) for i in item)
+    return item
+
+
+@Mutable.register_tracked_type(set)
+class MutableSet(Mutable, set):
+    """Subclasses `set`, and implements all `set` methods.
+
+    Parameters
+    ----------
+    source : iterable, default=()
+        Source items which will be added to the mutable set.
+
+    root : sqlalchemy.Mutable or None, default=None
+        Root mutable object. If `None`, `self` is assumed to be the root.
+    """
+    @classmethod
+    def coerce(cls, key, obj):
+        """Object must be an iterable of items or None"""
+        if isinstance(obj, cls):
+            return obj
+        if isinstance(obj, (set, frozenset, list, tuple)):
+            return cls(obj)
+        if not obj:
+            return cls()
+        return cls([obj])
+
+    def __init__(self, source=(), root=None):
+        super().__init__(self._member(item) for item in source)
+
+    def _member(self, item):
+        """Item as it is stored in the set"""
+        return ModelShell(item) if self._object_is_model(item) else item
+
+    def _lookup(self, item):
+        """
+        Item as it would be stored in the set, or `_missing` for models
+        without an identity, which are not shelled because shelling adds and
+        flushes them
+        """
+        if self._object_is_model(item):
+            if inspect(item).identity is None:
+                return _missing
+            return ModelShell(item)
+        return item
+
+    def _keyed_items(self):
+        # items are their own keys
+        return [(item, item) for item in set.__iter__(self)]
+
+    def __reduce_ex__(self, protocol):
+        """Items are pickled directly from the set, without unshelling"""
+        return (
+            self.__class__, (list(set.__iter__(self)),),
+            self.__getstate__()
+        )
+
+    def _cow_copy_items(self, new):
+        set.update(new, set.__iter__(self))
+
+    def __contains__(self, item):
+        item = self._lookup(item)
+        return item is not _missing and super().__contains__(item)
+
+    @synchronized
+    def __ior__(self, items):
+        self._changed()
+        return super().__ior__({self._member(item) for item in items})
+
+    @synchronized
+    def __iand__(self, items):
+        self._changed()
+        return super().__iand__({self._member(item) for item in items})
+
+    @synchronized
+    def __isub__(self, items):
+        self._changed()
+        return super().__isub__({self._member(item) for item in items})
+
+    @synchronized
+    def __ixor__(self, items):
+        self._changed()
+        return super().__ixor__({self._member(item) for item in items})
+
+    @synchronized
+    def add(self, item):
+        item = self._member(item)
+        # adding an item which is already in the set is not a change
+        if not set.__contains__(self, item):
+            self._changed()
+            super().add(item)
+
+    @synchronized
+    def clear(self):
+        self._changed()
+        return super().clear()
+
+    @synchronized
+    def discard(self, item):
+        item = self._lookup(item)
+        if item is not _missing and set.__contains__(self, item):
+            self._changed()
+            super().discard(item)
+
+    @synchronized
+    def pop(self):
+        if not self:
+            raise KeyError('pop from an empty set')
+        self._changed()
+        return super().pop()
+
+    @synchronized
+    def remove(self, item):
+        key = self._lookup(item)
+        if key is _missing or not set.__contains__(self, key):
+            raise KeyError(item)
+        self._changed()
+        super().remove(key)
+
+    @synchronized
+    def update(self, *iterables):
+        self._changed()
+        return super().update(*(
+            (self._member(item) for item in items) for items in iterables
+        ))
+
+    @synchronized
+    def difference_update(self, *iterables):
+        self._changed()
+        return super().difference_update(*(
+            (self._member(item) for item in items) for items in iterables
+        ))
+
+    @synchronized
+    def intersection_update(self, *iterables):
+        self._changed()
+        return super().intersection_update(*(
+            {self._member(item) for item in items} for items in iterables
+        ))
+
+    @synchronized
+    def symmetric_difference_update(self, items):
+        self._changed()
+        return super().symmetric_difference_update(
+            {self._member(item) for item in items}
+        )
+
+    def unshell(self):
+        """
+        Unshell the models in the set.
+
+        Returns
+        -------
+        copy : set
+            Shallow copy of `self` where all `ModelShell` items are unshelled.
+        """
+        return {
+            i.unshell() if isinstance(i, ModelShell) else i
+            for i in set.__iter__(self)
+        }
+
+
+MutableSet.associate_with(MutableSetType)
+MutableSet.associate_with(MutableSetJSONType)
@@ -0,0 +1,233 @@
+"""# Mutable sorted list
+
+Sorted lists keep their items in ascending order. Items are added with `add`
+and `update`, which insert them in place with a binary search, so keeping a
+list sorted does not require sorting it after each change. Membership
+checks, `index`, and `count` are binary searches as well.
+
+Notes
+-----
+1. Items must be comparable with each other. For a descending order (e.g. a
+leaderboard), store negated scores or `(-score, name)` tuples.
+2. Methods which add items at a position (`append`, `extend`, `insert`,
+item assignment, etc.) raise `TypeError`.
+3. To force a column to be a sorted list, use `MutableSortedListType` or
+`MutableSortedListJSONType`.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from sqlalchemy_mutable import SortedList
+
+model = MyModel()
+model.mutable = SortedList([(-10, 'bob'), (-30, 'alice')])
+session.add(model)
+session.commit()
+model.mutable.add((-20, 'carol'))
+session.commit()
+model.mutable
+```
+
+Out:
+
+```
+[(-30, 'alice'), (-20, 'carol'), (-10, 'bob')]
+```
+"""
+
+from .json_patch import PatchableJSON
+from .mutable import Mutable, synchronized
+from .mutable_list import MutableList
+from .mutable_set import _hashable
+
+from sqlalchemy.types import PickleType, TypeDecorator
+
+
+class MutableSortedListType(PickleType):
+    """
+    Mutable sorted list database type with pickle serialization.
+    """
+    cache_ok = True
+
+
+class MutableSortedListJSONType(TypeDecorator):
+    """
+    Mutable sorted list database type with JSON serialization. JSON stores
+    tuples as lists, so the lists in loaded items are converted back to
+    tuples, which compare with the tuples added later. Parameters are those
+    of `PatchableJSON`.
+    """
+    impl = PatchableJSON
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return [_hashable(item) for item in value]
+
+
+def _bisect(items, item, right):
+    """
+    Index at which to insert `item` in the sorted list `items`. Items are
+    read with `list.__getitem__`, so the search does not go through the
+    change tracking of mutable lists.
+    """
+    getitem = list.__getitem__
+    lo, hi = 0, list.__len__(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if right:
+            if item < getitem(items, mid):
+                hi = mid
+            else:
+                lo = mid + 1
+        elif getitem(items, mid) < item:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class SortedList(list):
+    """List which keeps its items in ascending order.
+
+    Parameters
+    ----------
+    iterable : iterable, default=()
+        Items of the sorted list.
+    """
+    def __init__(self, iterable=()):
+        super().__init__(sorted(iterable))
+
+    def __reduce__(self):
+        # lists are unpickled by extending them, which sorted lists forbid
+        return self.__class__, (list(list.__iter__(self)),)
+
+    def __contains__(self, item):
+        index = _bisect(self, item, False)
+        return index < len(self) and list.__getitem__(self, index) == item
+
+    def bisect_left(self, item):
+        """
+        Returns
+        -------
+        index : int
+            Index at which to insert `item` before any equal items.
+        """
+        return _bisect(self, item, False)
+
+    def bisect_right(self, item):
+        """
+        Returns
+        -------
+        index : int
+            Index at which to insert `item` after any equal items.
+        """
+        return _bisect(self, item, True)
+
+    def count(self, item):
+        return _bisect(self, item, True) - _bisect(self, item, False)
+
+    def index(self, item):
+        index = _bisect(self, item, False)
+        if index < len(self) and list.__getitem__(self, index) == item:
+            return index
+        raise ValueError('{!r} is not in list'.format(item))
+
+    def add(self, item):
+        """Insert an item after any equal items"""
+        list.insert(self, _bisect(self, item, True), item)
+
+    def update(self, iterable):
+        """Add the items of `iterable`"""
+        list.extend(self, iterable)
+        list.sort(self)
+
+    def discard(self, item):
+        """Remove an item if it is in the list"""
+        if item in self:
+            self.remove(item)
+
+    def remove(self, item):
+        list.__delitem__(self, self.index(item))
+
+    def _unordered(self, *args, **kwargs):
+        raise TypeError(
+            'Sorted lists keep their order. Use add or update to add items.'
+        )
+
+    append = extend = insert = reverse = sort = _unordered
+    __setitem__ = __iadd__ = __imul__ = _unordered
+
+
+@Mutable.register_tracked_type(SortedList)
+class MutableSortedList(MutableList, SortedList):
+    """Subclasses `SortedList`, and tracks changes like `MutableList`.
+
+    Parameters
+    ----------
+    source : iterable, default=()
+        Source objects which will be converted into a mutable sorted list.
+
+    root : sqlalchemy.Mutable or None, default=None
+        Root mutable object. If `None`, `self` is assumed to be the root.
+    """
+    @classmethod
+    def coerce(cls, key, obj):
+        """Object must be an iterable of items or None"""
+        if isinstance(obj, cls):
+            return obj
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            return cls(obj)
+        if not obj:
+            return cls()
+        return cls([obj])
+
+    def __init__(self, source=(), root=None):
+        super().__init__(list(source), root)
+
+    def __reduce_ex__(self, protocol):
+        """Items are passed to the constructor, which does not extend"""
+        return (
+            self.__class__, (list(list.__iter__(self)),),
+            self.__getstate__()
+        )
+
+    append = extend = insert = reverse = sort = SortedList._unordered
+    __setitem__ = __iadd__ = __imul__ = SortedList._unordered
+
+    @synchronized
+    def add(self, item):
+        item = self._convert_item(item)
+        index = _bisect(self, item, True)
+        # items added after the largest item only change the tail
+        if index == len(self):
+            self._changed(index)
+        else:
+            self._changed()
+        list.insert(self, index, item)
+
+    @synchronized
+    def update(self, iterable):
+        items = sorted(self._convert_item(item) for item in iterable)
+        if not items:
+            return
+        if not len(self) or not items[0] < list.__getitem__(self, -1):
+            self._changed_tail(len(items))
+            list.extend(self, items)
+        else:
+            self._changed()
+            list.extend(self, items)
+            list.sort(self)
+
+    @synchronized
+    def remove(self, item):
+        index = self.index(item)
+        self._changed_removal(index)
+        list.__delitem__(self, index)
+
+
+MutableSortedList.associate_with(MutableSortedListType)
+MutableSortedList.associate_with(MutableSortedListJSONType)
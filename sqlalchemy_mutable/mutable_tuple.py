@@ -39,7 +39,7 @@ class MutableTupleType(PickleType):
     """
     Mutable tuple database type with pickle serialization.
     """
-    pass
+    cache_ok = True
 
 
 class MutableTupleJSONType(JSON):
@@ -74,9 +74,39 @@ class MutableTuple(Mutable, tuple):
     def _tracked_items(self):
         return [i for i in self]
 
+    def _keyed_items(self):
+        return list(enumerate(tuple.__iter__(self)))
+
     def __new__(cls, source=(), root=None):
         converted = tuple((cls._convert(obj, root) for obj in source))
-        return super().__new__(cls, converted)
+        return super().__new__(cls, converted, root)
+
+    def _cow_copy(self, root):
+        """
+        Tuple items cannot be replaced once they are exposed, so a tuple's 
+        mutable items are cloned along with the tuple. The items are created 
+        before the tuple, so the items of a clone which is a root are given 
+        their root afterwards.
+        """
+        new = tuple.__new__(self.__class__, (
+            i._cow_copy(root) if isinstance(i, Mutable) else i for i in self
+        ))
+        new.__dict__.update(self.__dict__)
+        new.__dict__.pop('_parents', None)
+        new.__dict__.pop('_lock', None)
+        new.__dict__.pop('_dirty', None)
+        new.__dict__['_parent'] = None
+        # tuples cannot be weakly referenced, so copies do not record their 
+        # source, and `diff` compares their items
+        new.__dict__.pop('_cow_source', None)
+        new._tracked_attr_names = set(self._tracked_attr_names)
+        new._root = root
+        for item in tuple.__iter__(new):
+            if isinstance(item, Mutable):
+                if root is None:
+                    item._set_root(new)
+                item.__dict__['_parent'] = new
+        return new
 
     def __getitem__(self, key):
         if isinstance(key, slice):
@@ -0,0 +1,119 @@
+"""# Parallel decoding
+
+Unpickling mutable objects is CPU bound, and holds the GIL, so threads do not
+speed it up. `decode_parallel` decodes the raw values of a `MutableType` or
+`MutableCodecType` column (selected with `raw`) in a pool of worker
+processes. Values are decoded in chunks, and returned in their original
+order.
+
+Values are decoded as plain python objects (see `plain`). Mutable objects
+track their parents and share references between their children, which
+would be lost when sending them from the workers, so load the column as usual
+to get mutable objects.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from sqlalchemy_mutable import decode_parallel, raw
+
+for i in range(3):
+\    model = MyModel()
+\    model.mutable = {'index': i}
+\    session.add(model)
+session.commit()
+values = [
+\    row.mutable for row in session.query(raw(MyModel.mutable))
+]
+# on platforms which spawn worker processes (Windows and macOS), call this
+# under `if __name__ == '__main__':`
+decode_parallel(values, MyModel.mutable)
+```
+
+Out:
+
+```
+[{'index': 0}, {'index': 1}, {'index': 2}]
+```
+"""
+
+from .codec import MutableCodecType
+from .interning import InterningPickler
+from .loading import _decode_plain, _plain_pickler
+
+from sqlalchemy.types import PickleType
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+
+def decode_parallel(
+    values, column, chunk_size=1000, max_workers=None, executor=None
+):
+    """
+    Decode the raw values of a mutable column in worker processes.
+
+    Parameters
+    ----------
+    values : iterable of bytes or None
+        Raw values of the column, selected with `raw(column)`.
+
+    column : sqlalchemy.orm.attributes.InstrumentedAttribute or sqlalchemy.Column
+        `MutableType` or `MutableCodecType` column the values were selected
+        from.
+
+    chunk_size : int, default=1000
+        Number of values each task decodes.
+
+    max_workers : int or None, default=None
+        Number of worker processes. Ignored if `executor` is given.
+
+    executor : concurrent.futures.Executor or None, default=None
+        Executor which runs the tasks. If `None`, a `ProcessPoolExecutor` is
+        created for the call.
+
+    Returns
+    -------
+    objs : list
+        Plain python objects, in the order of `values`.
+    """
+    type_ = column.type
+    codec = isinstance(type_, MutableCodecType)
+    if codec:
+        pickler = None
+    elif isinstance(type_, PickleType):
+        pickler = type_.pickler
+        if pickler is pickle or isinstance(pickler, InterningPickler):
+            pickler = None
+    else:
+        raise TypeError(
+            'Cannot decode {} columns in parallel'.format(type(type_).__name__)
+        )
+    values = list(values)
+    chunks = [
+        values[i:i+chunk_size] for i in range(0, len(values), chunk_size)
+    ]
+    task_args = ([codec] * len(chunks), [pickler] * len(chunks), chunks)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(_decode_chunk, *task_args))
+    else:
+        results = list(executor.map(_decode_chunk, *task_args))
+    objs = []
+    for result in results:
+        objs += result
+    return objs
+
+
+def _decode_chunk(codec, pickler, values):
+    """Decode a chunk of values as plain python objects in a worker process"""
+    if codec:
+        return _map(_decode_plain, values)
+    loads = _plain_pickler.loads if pickler is None else pickler.loads
+    return _map(loads, values)
+
+
+def _map(func, values):
+    """Apply `func` to the values which are not `None`"""
+    return [None if value is None else func(value) for value in values]
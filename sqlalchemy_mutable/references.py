@@ -0,0 +1,444 @@
+"""# Reference index
+
+Models stored in mutable columns are opaque to the database, so finding the
+rows which store a given model means loading every row. A `ReferenceIndex`
+keeps a table of the references from rows to the models stored in their
+`MutableType` and `MutableCodecType` columns. The table is updated at flush
+time, and answers which rows reference a model with one indexed query.
+
+The index can also act on the references to a deleted model, like a foreign
+key's `ON DELETE` clause:
+
+1. `on_delete='cascade'` deletes the rows which reference the model.
+2. `on_delete='nullify'` replaces the model with `None` wherever the rows
+store it.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md), but create the index
+before creating the database.
+
+```python
+from sqlalchemy_mutable import ReferenceIndex
+
+index = ReferenceIndex(Base.metadata, on_delete='nullify')
+Base.metadata.create_all(engine)
+
+owner, model = MyModel(), MyModel()
+session.add(owner)
+session.commit()
+model.mutable = {'owner': owner}
+session.add(model)
+session.commit()
+print(index.referrers(session, owner))
+session.delete(owner)
+session.commit()
+session.refresh(model)
+model.mutable
+```
+
+Out:
+
+```
+[(<__main__.MyModel object at 0x7f6bd9936c50>, 'mutable')]
+{'owner': None}
+```
+
+Notes
+-----
+1. Rows are indexed when they are inserted or their mutable columns change,
+including with `bulk_update`.
+Call `rebuild` to index rows stored before the index was created.
+2. Primary keys are stored as JSON, so they must be JSON serializable.
+3. Cascading deletes and nullification write to the database directly.
+Models loaded in the session are not changed until they are refreshed.
+"""
+
+from .codec import MutableCodecType
+from .model_shell import ModelShell, _mappers
+from .mutable import Mutable
+
+from sqlalchemy import (
+    Column, Index, Integer, String, Table, and_, event, inspect, or_, select
+)
+from sqlalchemy.orm import mapper
+from sqlalchemy.types import PickleType
+
+import json
+from collections import deque
+
+# reference indexes, which `bulk_update` keeps up to date
+_indexes = []
+
+
+class ReferenceIndex():
+    """
+    Index of the models stored in mutable columns.
+
+    Parameters
+    ----------
+    metadata : sqlalchemy.MetaData
+        Metadata of the models whose mutable columns to index. The index
+        table is added to the metadata.
+
+    tablename : str, default='mutable_references'
+        Name of the index table.
+
+    on_delete : str or None, default=None
+        What to do with the rows which reference a deleted model.
+        `'cascade'` deletes them, and `'nullify'` replaces the model with
+        `None`. If `None`, the rows keep their references.
+
+    Attributes
+    ----------
+    metadata : sqlalchemy.MetaData
+        Set from the `metadata` parameter.
+
+    on_delete : str or None
+        Set from the `on_delete` parameter.
+
+    table : sqlalchemy.Table
+        Index table. Each row is a reference from the mutable column
+        `column` of the row `(referrer_key, referrer_identity)` to the model
+        `(target_key, target_identity)`. Keys are model registry keys (see
+        `ModelShell`), and identities are JSON lists.
+    """
+    def __init__(
+        self, metadata, tablename='mutable_references', on_delete=None
+    ):
+        if on_delete not in (None, 'cascade', 'nullify'):
+            raise ValueError(
+                'on_delete must be None, cascade, or nullify, not {}'.format(
+                    on_delete
+                )
+            )
+        self.metadata = metadata
+        self.on_delete = on_delete
+        self.table = Table(
+            tablename, metadata,
+            Column('id', Integer, primary_key=True),
+            Column('referrer_key', String(255), nullable=False),
+            Column('referrer_identity', String(255), nullable=False),
+            Column('column', String(255), nullable=False),
+            Column('target_key', String(255), nullable=False),
+            Column('target_identity', String(255), nullable=False),
+            Index(
+                'ix_{}_referrer'.format(tablename),
+                'referrer_key', 'referrer_identity'
+            ),
+            Index(
+                'ix_{}_target'.format(tablename),
+                'target_key', 'target_identity'
+            ),
+        )
+        # maps mappers to the keys of their indexed columns
+        self._indexed_keys = {}
+        _indexes.append(self)
+        event.listen(mapper, 'after_insert', self._after_insert)
+        event.listen(mapper, 'after_update', self._after_update)
+        event.listen(mapper, 'after_delete', self._after_delete)
+
+    def referrers(self, session, model):
+        """
+        Find the rows which reference a model.
+
+        Parameters
+        ----------
+        session : sqlalchemy.orm.Session
+            Session with which to load the referring models.
+
+        model : sqlalchemy.ext.declarative.api.Base
+            Referenced model.
+
+        Returns
+        -------
+        referrers : list of (model, str) tuples
+            Referring models and the keys of the columns which store the
+            model.
+        """
+        table = self.table
+        rows = session.execute(
+            select([
+                table.c.referrer_key, table.c.referrer_identity,
+                table.c.column
+            ]).where(self._target_condition(*_model_ref(model)))
+            .order_by(table.c.id)
+        )
+        return [
+            (
+                session.query(ModelShell._get_model_class(key))
+                .get(json.loads(identity)),
+                column
+            )
+            for key, identity, column in rows
+        ]
+
+    def rebuild(self, session):
+        """
+        Index the mutable columns of all rows of the models in the metadata.
+
+        Parameters
+        ----------
+        session : sqlalchemy.orm.Session
+            Session in whose transaction to rebuild the index.
+        """
+        session.execute(self.table.delete())
+        for mapper_ in list(_mappers_of(self.metadata)):
+            keys = self._keys(mapper_)
+            if not keys:
+                continue
+            query = session.query(
+                *mapper_.primary_key,
+                *[getattr(mapper_.class_, key) for key in keys]
+            )
+            referrer_key = ModelShell._get_model_key(mapper_.class_)
+            for row in query.yield_per(1000):
+                identity = _identity_str(row[:len(mapper_.primary_key)])
+                values = row[len(mapper_.primary_key):]
+                self._insert(
+                    session, referrer_key, identity, zip(keys, values)
+                )
+
+    def _keys(self, mapper_):
+        """Keys of the mapper's indexed columns"""
+        keys = self._indexed_keys.get(mapper_)
+        if keys is None:
+            keys = self._indexed_keys[mapper_] = [
+                prop.key for prop in mapper_.column_attrs
+                if isinstance(
+                    prop.columns[0].type, (MutableCodecType, PickleType)
+                )
+            ] if mapper_.local_table.metadata is self.metadata else []
+        return keys
+
+    def _target_condition(self, key, identity):
+        table = self.table
+        return and_(
+            table.c.target_key == key, table.c.target_identity == identity
+        )
+
+    def _referrer_condition(self, key, identity):
+        table = self.table
+        return and_(
+            table.c.referrer_key == key,
+            table.c.referrer_identity == identity
+        )
+
+    def _insert(self, connection, referrer_key, referrer_identity, values):
+        """Index the references of a row's (column key, value) pairs"""
+        rows = [
+            {
+                'referrer_key': referrer_key,
+                'referrer_identity': referrer_identity,
+                'column': column,
+                'target_key': target_key,
+                'target_identity': target_identity,
+            }
+            for column, value in values
+            for target_key, target_identity in _refs(value)
+        ]
+        if rows:
+            connection.execute(self.table.insert(), rows)
+
+    def _replace(self, connection, referrer_key, column, rows):
+        """
+        Replace the references of a mutable column of rows written without
+        flushing models. `rows` are (referrer identity, references) pairs,
+        where references are computed by `_refs`.
+        """
+        table = self.table
+        connection.execute(table.delete().where(and_(
+            table.c.referrer_key == referrer_key,
+            table.c.referrer_identity.in_(
+                [identity for identity, refs in rows]
+            ),
+            table.c.column == column
+        )))
+        entries = [
+            {
+                'referrer_key': referrer_key,
+                'referrer_identity': identity,
+                'column': column,
+                'target_key': target_key,
+                'target_identity': target_identity,
+            }
+            for identity, refs in rows
+            for target_key, target_identity in refs
+        ]
+        if entries:
+            connection.execute(table.insert(), entries)
+
+    # Flush events
+    def _after_insert(self, mapper_, connection, target):
+        keys = self._keys(mapper_)
+        if keys:
+            state = inspect(target)
+            self._insert(
+                connection, *_model_ref(target),
+                [(key, state.dict.get(key)) for key in keys]
+            )
+
+    def _after_update(self, mapper_, connection, target):
+        state = inspect(target)
+        keys = [
+            key for key in self._keys(mapper_)
+            if state.attrs[key].history.has_changes()
+        ]
+        if not keys:
+            return
+        referrer = _model_ref(target)
+        connection.execute(self.table.delete().where(and_(
+            self._referrer_condition(*referrer),
+            self.table.c.column.in_(keys)
+        )))
+        self._insert(
+            connection, *referrer,
+            [(key, state.dict.get(key)) for key in keys]
+        )
+
+    def _after_delete(self, mapper_, connection, target):
+        self._delete(connection, _model_ref(target), set())
+
+    def _delete(self, connection, ref, deleted):
+        """
+        Remove a deleted model's references, and act on the rows which
+        reference it.
+        """
+        deleted.add(ref)
+        table = self.table
+        condition = self._referrer_condition(*ref)
+        referrers = []
+        if self.on_delete is not None:
+            referrers = connection.execute(
+                select([
+                    table.c.referrer_key, table.c.referrer_identity,
+                    table.c.column
+                ]).where(self._target_condition(*ref))
+            ).fetchall()
+            condition = or_(condition, self._target_condition(*ref))
+        connection.execute(table.delete().where(condition))
+        for key, identity, column in referrers:
+            referrer = key, identity
+            if referrer in deleted:
+                continue
+            if self.on_delete == 'cascade':
+                _delete_row(connection, *referrer)
+                self._delete(connection, referrer, deleted)
+            else:
+                _nullify(connection, *referrer, column, ref)
+
+
+def _mappers_of(metadata):
+    """Iterate over the mappers of the tables in `metadata`"""
+    for mapper_ in _mappers():
+        if mapper_.local_table.metadata is metadata:
+            yield mapper_
+
+
+def _identity_str(identity):
+    return json.dumps(list(identity))
+
+
+def _model_ref(model):
+    """(registry key, identity string) of a model"""
+    return (
+        ModelShell._get_model_key(type(model)),
+        # the identity is not yet set in `after_insert`
+        _identity_str(inspect(model).mapper.primary_key_from_instance(model))
+    )
+
+
+def _shells(value):
+    """`ModelShell` objects in the value of a mutable column"""
+    if isinstance(value, ModelShell):
+        return [value]
+    if isinstance(value, Mutable):
+        return value._shells()
+    return []
+
+
+def _refs(value):
+    """(registry key, identity string) of the models in a mutable value"""
+    return {
+        (shell.model_key, _identity_str(shell.identity))
+        for shell in _shells(value)
+    }
+
+
+def _row_condition(table, identity):
+    """Condition which selects the row of `table` with a model's identity"""
+    return and_(*[
+        column == value
+        for column, value in zip(table.primary_key.columns, identity)
+    ])
+
+
+def _delete_row(connection, key, identity):
+    """Delete the row of a model from each of its tables"""
+    mapper_ = inspect(ModelShell._get_model_class(key))
+    identity = json.loads(identity)
+    for table in reversed(mapper_.tables):
+        connection.execute(
+            table.delete().where(_row_condition(table, identity))
+        )
+
+
+def _nullify(connection, key, identity, column, target):
+    """Replace a model with `None` in a mutable column of a row"""
+    mapper_ = inspect(ModelShell._get_model_class(key))
+    table_column = mapper_.get_property(column).columns[0]
+    condition = _row_condition(table_column.table, json.loads(identity))
+    value = connection.execute(
+        select([table_column]).where(condition)
+    ).scalar()
+    value = _replace_shells(value, target)
+    connection.execute(
+        table_column.table.update().where(condition)
+        .values({table_column: value})
+    )
+
+
+def _replace_shells(obj, target):
+    """
+    Replace the shells of the target model in `obj` with `None`. Changes are
+    written without change tracking.
+    """
+    if isinstance(obj, ModelShell):
+        is_target = (
+            obj.model_key, _identity_str(obj.identity)
+        ) == target
+        return None if is_target else obj
+    if not isinstance(obj, Mutable):
+        return obj
+    state = obj.__dict__
+    for name in state.get('_tracked_attr_names', ()):
+        state[name] = _replace_shells(state[name], target)
+    if isinstance(obj, dict):
+        for key, item in dict.items(obj):
+            dict.__setitem__(obj, key, _replace_shells(item, target))
+    elif isinstance(obj, list):
+        for i, item in enumerate(list.__iter__(obj)):
+            list.__setitem__(obj, i, _replace_shells(item, target))
+    elif isinstance(obj, set):
+        shells = [
+            item for item in set.__iter__(obj)
+            if isinstance(item, ModelShell)
+            and _replace_shells(item, target) is None
+        ]
+        if shells:
+            set.difference_update(obj, shells)
+            set.add(obj, None)
+    elif isinstance(obj, deque):
+        for i, item in enumerate(list(deque.__iter__(obj))):
+            deque.__setitem__(obj, i, _replace_shells(item, target))
+    elif isinstance(obj, tuple):
+        items = [
+            _replace_shells(item, target) for item in tuple.__iter__(obj)
+        ]
+        if any(
+            new is not old for new, old in zip(items, tuple.__iter__(obj))
+        ):
+            new = type(obj)(items, obj._root)
+            new.__dict__.update(state)
+            return new
+    return obj
@@ -0,0 +1,150 @@
+"""# Streaming
+
+`query.all()` loads every row of a query, and unpickles every mutable column
+of every row, before returning. `iter_mutable` streams the rows of a query
+instead. Rows are fetched and deserialized one chunk at a time (using
+`Query.yield_per`), and each chunk is released as it is consumed, so memory
+use depends on the chunk size rather than the size of the table.
+
+Models stored in the mutable columns of a chunk (as `ModelShell` objects) are
+loaded with one query per model class when the chunk is fetched, so
+unshelling them while iterating over the chunk does not query the database.
+
+Examples
+--------
+Make sure you have run the [setup code](setup.md).
+
+```python
+from sqlalchemy_mutable import iter_mutable
+
+owner = MyModel()
+session.add(owner)
+session.commit()
+for i in range(3):
+\    model = MyModel()
+\    model.mutable = {'owner': owner, 'index': i}
+\    session.add(model)
+session.commit()
+query = MyModel.query.filter(MyModel.id != owner.id)
+[model.mutable['index'] for model in iter_mutable(query, chunk_size=2)]
+```
+
+Out:
+
+```
+[0, 1, 2]
+```
+"""
+
+from .model_shell import ModelShell
+from .mutable import Mutable
+
+from sqlalchemy import tuple_
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm.util import identity_key
+
+
+def iter_mutable(query, chunk_size=1000, resolve_shells=True):
+    """
+    Iterate over the rows of a query in chunks.
+
+    Parameters
+    ----------
+    query : sqlalchemy.orm.Query
+        Query whose rows to iterate over. Rows may be models or tuples of
+        models and column values.
+
+    chunk_size : int, default=1000
+        Number of rows to fetch and deserialize at a time.
+
+    resolve_shells : bool, default=True
+        Load the models stored in each chunk's mutable columns with one query
+        per model class.
+
+    Returns
+    -------
+    rows : generator
+        Rows of the query.
+
+    Notes
+    -----
+    Models loaded to resolve the shells of a chunk are held until the chunk
+    is consumed. Models which are not referenced elsewhere are then released
+    from the session's identity map.
+    """
+    chunk = []
+    for row in query.yield_per(chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from _iter_chunk(chunk, resolve_shells)
+            chunk = []
+    yield from _iter_chunk(chunk, resolve_shells)
+
+
+def _iter_chunk(chunk, resolve_shells):
+    """Yield the rows of a chunk, releasing each row as it is yielded"""
+    # the models are held by this generator until the chunk is consumed
+    models = _resolve_shells(chunk) if resolve_shells else None
+    chunk.reverse()
+    while chunk:
+        yield chunk.pop()
+
+
+def _resolve_shells(chunk):
+    """
+    Load the models stored in a chunk of rows.
+
+    Returns
+    -------
+    models : list
+        Loaded models.
+    """
+    ids = {}
+    for row in chunk:
+        # rows are models, or result rows of models and column values
+        for value in (row,) if hasattr(row, '__table__') else row:
+            _collect_shells(value, ids)
+    models = []
+    for model_class, identities in ids.items():
+        query = model_class.query
+        session = query.session
+        identities = [
+            identity for identity in identities
+            if identity_key(model_class, identity) not in session.identity_map
+        ]
+        if not identities:
+            continue
+        pk_columns = inspect(model_class).primary_key
+        if len(pk_columns) == 1:
+            condition = pk_columns[0].in_(
+                [identity[0] for identity in identities]
+            )
+        else:
+            condition = tuple_(*pk_columns).in_(identities)
+        models += query.filter(condition).all()
+    return models
+
+
+def _collect_shells(obj, ids):
+    """
+    Add the model class and identity of every `ModelShell` in `obj` to
+    `ids`.
+
+    Shells whose model class does not have a `query` attribute are not
+    unshelled to models, and are skipped.
+    """
+    if hasattr(obj, '__table__'):
+        # read the model's loaded values without unshelling them
+        for value in inspect(obj).dict.values():
+            if isinstance(value, Mutable):
+                _collect_shells(value, ids)
+        return
+    if isinstance(obj, ModelShell):
+        shells = [obj]
+    elif isinstance(obj, Mutable):
+        shells = obj._shells()
+    else:
+        return
+    for shell in shells:
+        if hasattr(shell.model_class, 'query'):
+            ids.setdefault(shell.model_class, set()).add(shell.identity)
@@ -1,14 +1,39 @@
 from sqlalchemy_mutable import (
-    HTMLAttrsType, Mutable, MutableType, MutableManager, MutableModelBase, 
-    Query, partial
+    HTMLAttrsType, InterningPickler, Mutable, MutableCodecType, MutableDict, 
+    MutableDeque, MutableDictJSONType, MutableRingBuffer, MutableSet,
+    MutableSetJSONType, MutableSortedList, MutableSortedListJSONType,
+    MutableSortedListType,
+    MutableType, MutableManager,
+    MutableModelBase, Query, ReferenceIndex, RingBuffer, SortedList,
+    apply_patch, bulk_update, decode_parallel, diff, iter_mutable, json_index,
+    mirror_column, partial, plain, raw
 )
+from sqlalchemy_mutable.coerced_types import (
+    CoercedBool, CoercedInt, CoercedModelShell
+)
+from sqlalchemy_mutable.model_shell import ModelShell
 
-from sqlalchemy import Column, Integer, String, create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import (
+    Column, Integer, String, create_engine, event, type_coerce
+)
+from sqlalchemy.orm import configure_mappers, sessionmaker, scoped_session
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.exc import SAWarning
 from sqlalchemy.ext.declarative import declarative_base
 
+import copyreg
 import datetime
+import gc
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+import sys
+import threading
 import unittest
+import weakref
+from unittest import mock
+import warnings
 
 MSG = 'test message'
 
@@ -25,9 +50,47 @@ class Model(MutableModelBase, Base):
     msg = Column(String)
     attrs = Column(HTMLAttrsType)
     mutable = Column(MutableType)
+    interned = Column(MutableType(pickler=InterningPickler()))
+    codec = Column(MutableCodecType)
+    status = mirror_column('mutable', 'status', type_=String)
+    document = Column(MutableDictJSONType)
+    patched = Column(MutableDictJSONType(partial_updates=True))
+    tags = Column(MutableSetJSONType)
+    ranking = Column(MutableSortedListType)
+    leaderboard = Column(MutableSortedListJSONType)
+    __table_args__ = (
+        json_index('ix_model_document_status', document, 'status'),
+    )
+    query = Query(Session)
+
+
+class CompositeModel(MutableModelBase, Base):
+    __tablename__ = 'composite_model'
+    group = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True)
+    query = Query(Session)
+
+
+# models whose mutable columns are indexed by a reference index
+IndexedBase = declarative_base()
+reference_index = ReferenceIndex(IndexedBase.metadata, on_delete='nullify')
+
+
+class Owner(MutableModelBase, IndexedBase):
+    __tablename__ = 'owner'
+    id = Column(Integer, primary_key=True)
+    query = Query(Session)
+
+
+class Holder(MutableModelBase, IndexedBase):
+    __tablename__ = 'holder'
+    id = Column(Integer, primary_key=True)
+    mutable = Column(MutableType)
+    codec = Column(MutableCodecType)
     query = Query(Session)
 
 Base.metadata.create_all(engine)
+IndexedBase.metadata.create_all(engine)
 
 def foo(obj):
     return obj
@@ -44,6 +107,19 @@ class MutableClass0(MyClass, Mutable):
         super().__init__(msg=source.msg)
 
 
+class MyAttrsClass():
+    label = 'default'
+
+    def __init__(self, msg):
+        self.msg = msg
+
+
+@Mutable.register_tracked_type(MyAttrsClass, attrs=['msg', 'label'])
+class MutableAttrsClass(MyAttrsClass, Mutable):
+    def __init__(self, source=None, root=None):
+        super().__init__(msg=source.msg)
+
+
 class TestMutable(unittest.TestCase):
     def test_model(self):
         model1, model2 = Model(), Model()
@@ -105,6 +181,24 @@ class TestMutable(unittest.TestCase):
         model.mutable = 'hello world'
         model.mutable = datetime.datetime.now()
         model.mutable = foo
+        # boxed values can be reassigned
+        session.add(model)
+        session.commit()
+        model.mutable.func = len
+        session.commit()
+        self.assertIs(model.mutable.func, len)
+        value = Mutable.coerce(None, True)
+        value.value = False
+        self.assertIs(value.value, False)
+        self.assertEqual(value.get_version(), 1)
+        # boxed values hold only their value
+        with self.assertRaisesRegex(AttributeError, 'only set'):
+            value.label = 'x'
+        with self.assertRaises(AttributeError):
+            del value.value
+        self.assertFalse(hasattr(value, 'label'))
+        self.assertIs(value.value, False)
+        self.assertEqual(value.get_version(), 1)
 
     def test_custom_tracked_type(self):
         model = Model()
@@ -130,4 +224,891 @@ class TestMutable(unittest.TestCase):
         self.assertEqual(
             model.attrs.to_html(), 
             'class="class0 class1" style="width:25px;" disabled'
-        )
\ No newline at end of file
+        )
+
+    def test_thread_safe(self):
+        MutableManager.thread_safe = True
+        try:
+            mutable = Mutable.coerce(None, {'list': [], 'dict': {}})
+
+            def write(i):
+                for j in range(100):
+                    mutable['list'].append([i, j])
+                    mutable['dict'][(i, j)] = {'value': j}
+
+            threads = [
+                threading.Thread(target=write, args=(i,)) for i in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            MutableManager.thread_safe = False
+        self.assertEqual(len(mutable['list']), 800)
+        self.assertEqual(len(mutable['dict']), 800)
+        self.assertTrue(all(i.root is mutable for i in mutable['list']))
+
+    def test_clone(self):
+        template = MutableDict({'settings': {'theme': 'dark'}, 'items': [[]]})
+        model0, model1 = Model(), Model()
+        model0.mutable = template.clone()
+        model1.mutable = template.clone()
+        self.assertIs(
+            dict.__getitem__(model0.mutable, 'items'), 
+            dict.__getitem__(template, 'items')
+        )
+        session.add_all([model0, model1])
+        session.flush()
+        model0.mutable['settings']['theme'] = 'light'
+        model0.mutable['items'][0].append(MSG)
+        session.commit()
+        self.assertEqual(model0.mutable['settings']['theme'], 'light')
+        self.assertEqual(model0.mutable['items'], [[MSG]])
+        self.assertEqual(model1.mutable['settings']['theme'], 'dark')
+        self.assertEqual(
+            template, {'settings': {'theme': 'dark'}, 'items': [[]]}
+        )
+        # changes through the items of a cloned root tuple are saved
+        model0.mutable = ([1],)
+        session.commit()
+        model0.mutable = model0.mutable.clone()
+        session.flush()
+        model0.mutable[0].append(2)
+        session.commit()
+        session.expire(model0)
+        self.assertEqual(model0.mutable, ([1, 2],))
+
+    def test_thread_safe_clone(self):
+        template = MutableDict({str(i): [] for i in range(100)})
+        MutableManager.thread_safe = True
+        # switch threads often, so readers race to copy the clone's children
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for trial in range(5):
+                clone = template.clone()
+                barrier = threading.Barrier(4)
+
+                def write(i):
+                    barrier.wait()
+                    for key in clone:
+                        clone[key].append(i)
+
+                threads = [
+                    threading.Thread(target=write, args=(i,))
+                    for i in range(4)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                self.assertTrue(
+                    all(sorted(items) == [0, 1, 2, 3] for items in
+                    clone.values())
+                )
+        finally:
+            MutableManager.thread_safe = False
+            sys.setswitchinterval(interval)
+        self.assertTrue(all(items == [] for items in template.values()))
+
+    def test_interning(self):
+        model0, model1 = Model(), Model()
+        for model in (model0, model1):
+            model.interned = {'status': 'done', 'tags': ('a', 1)}
+        session.add_all([model0, model1])
+        session.commit()
+        self.assertIsNot(model0.interned, model1.interned)
+        self.assertEqual(model0.interned, {'status': 'done', 'tags': ('a', 1)})
+        self.assertIs(model0.interned['status'], model1.interned['status'])
+        self.assertIs(model0.interned['tags'], model1.interned['tags'])
+        self.assertIs(
+            list(model0.interned.keys())[0], list(model1.interned.keys())[0]
+        )
+        # equal datetimes in different time zones are not shared, and roots
+        # are never shared between rows
+        utc = datetime.datetime(2020, 1, 1, 12, tzinfo=datetime.timezone.utc)
+        est = utc.astimezone(datetime.timezone(datetime.timedelta(hours=-5)))
+        pickler = InterningPickler()
+        loaded = [
+            pickler.loads(pickle.dumps(Mutable.coerce(None, value)))
+            for value in (utc, est, [(1, -0.0)], [(1, 0.0)], 'root', 'root')
+        ]
+        self.assertEqual(loaded[0].utcoffset(), datetime.timedelta(0))
+        self.assertEqual(loaded[1].utcoffset(), datetime.timedelta(hours=-5))
+        self.assertEqual(str(loaded[2][0][1]), '-0.0')
+        self.assertEqual(str(loaded[3][0][1]), '0.0')
+        self.assertIsNot(loaded[4], loaded[5])
+
+    def test_codec(self):
+        model0, model1 = Model(), Model()
+        session.add_all([model0, model1])
+        session.flush()
+        model0.codec = Mutable()
+        model0.codec.items = [{'key': (1, 2.5, None)}, model1]
+        model0.codec.created = datetime.datetime(2020, 1, 1)
+        session.commit()
+        model0.codec.items[0]['key'] = MSG
+        session.commit()
+        self.assertEqual(model0.codec.items[0], {'key': MSG})
+        self.assertEqual(model0.codec.items[1], model1)
+        self.assertEqual(model0.codec.created, datetime.datetime(2020, 1, 1))
+        self.assertIs(model0.codec.items[0].root, model0.codec)
+
+    def test_pickle(self):
+        mutable = Mutable.coerce(None, {'key': [{'nested': (1, [2])}]})
+        copy = pickle.loads(pickle.dumps(mutable))
+        self.assertNotIn('_mapping', mutable.__dict__)
+        self.assertEqual(copy, mutable)
+        self.assertIs(copy['key'][0]['nested'][1].root, copy)
+        # dictionaries pickled by earlier versions
+        legacy = MutableDict.__new__(MutableDict)
+        legacy.__setstate__({
+            '_mapping': {'key': MSG}, '_python_type': dict, 
+            '_tracked_attr_names': set(), 'isroot': True
+        })
+        self.assertEqual(legacy, {'key': MSG})
+        # values pickled by the version before lists and dicts were pickled
+        # without copies
+        path = os.path.join(os.path.dirname(__file__), 'baseline.pickle')
+        with open(path, 'rb') as f:
+            legacy = pickle.load(f)
+        self.assertEqual(
+            legacy, {'a': [1, [2, 3], {'b': 4}], 'c': (5, [6])}
+        )
+        self.assertEqual(legacy.dirty_paths(), set())
+        self.assertEqual(legacy.get_version(), 0)
+        legacy['a'][1].append(7)
+        self.assertEqual(legacy.dirty_paths(), {('a', 1, 2)})
+        self.assertIs(legacy['c'][1].root, legacy)
+
+    def test_mirror(self):
+        model = Model()
+        model.mutable = {'status': 'pending'}
+        session.add(model)
+        session.commit()
+        self.assertEqual(model.status, 'pending')
+        model.mutable['status'] = 'done'
+        session.commit()
+        self.assertEqual(Model.query.filter_by(status='done').all(), [model])
+        model.mutable = Mutable()
+        session.commit()
+        self.assertIsNone(model.status)
+
+    def test_json_query(self):
+        model = Model()
+        model.document = {
+            'status': 'done', 'settings': {'theme': 'dark', 'size': 2}
+        }
+        session.add(model)
+        session.commit()
+        query = Model.query.filter(Model.document.path('status') == 'done')
+        self.assertIn(model, query.all())
+        self.assertIn('ix_model_document_status', str(session.execute(
+            'EXPLAIN QUERY PLAN ' + str(query.statement.compile(
+                engine, compile_kwargs={'literal_binds': True}
+            ))
+        ).fetchall()))
+        contains = Model.document.contains({'settings': {'size': 2}})
+        self.assertEqual(Model.query.filter(contains).all(), [model])
+        contains = Model.document.contains({'settings': {'theme': 'light'}})
+        self.assertEqual(Model.query.filter(contains).all(), [])
+        # nested and non-ASCII values
+        model.document['tags'] = ['caf\u00e9', {'name': 'Zo\u00eb', 'n': 1}]
+        session.commit()
+        contains = Model.document.contains({
+            'tags': ['caf\u00e9', {'n': 1, 'name': 'Zo\u00eb'}]
+        })
+        self.assertEqual(Model.query.filter(contains).all(), [model])
+        for tags in (['caf\u00e9'], ['cafe', {'n': 1}]):
+            contains = Model.document.contains({'tags': tags})
+            self.assertEqual(Model.query.filter(contains).all(), [])
+        # numbers are compared by type
+        path = Model.document.path('settings', 'size', type_=Integer)
+        self.assertEqual(Model.query.filter(path == 2).all(), [model])
+        # statements with mutable columns are cached without warnings
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            session.query(Model.mutable, Model.interned).filter(
+                Model.document.path('status') == 'done'
+            ).all()
+        self.assertEqual(
+            [w for w in caught if issubclass(w.category, SAWarning)], []
+        )
+
+    def test_partial_update(self):
+        model = Model()
+        model.patched = {
+            'settings': {'theme': 'dark'}, 'history': [], 'old': 0
+        }
+        session.add(model)
+        session.commit()
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        model.patched['settings']['theme'] = 'light'
+        model.patched['history'].append({'theme': 'light'})
+        del model.patched['old']
+        session.commit()
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        updates = [s for s in statements if s.startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('json_set', updates[0])
+        expected = {
+            'settings': {'theme': 'light'}, 'history': [{'theme': 'light'}]
+        }
+        self.assertEqual(model.patched, expected)
+        # setting a new value rewrites the whole document
+        model.patched['new'] = True
+        model.patched = {'settings': {}}
+        session.commit()
+        self.assertEqual(model.patched, {'settings': {}})
+
+    def test_dirty_paths(self):
+        model = Model()
+        model.mutable = {'settings': {'theme': 'dark'}, 'items': [0, 1]}
+        session.add(model)
+        session.commit()
+        model.mutable['settings']['theme'] = 'light'
+        model.mutable['items'].append(2)
+        model.mutable['items'].append(3)
+        self.assertEqual(model.mutable.dirty_paths(), {
+            ('settings', 'theme'), ('items', 2), ('items', 3)
+        })
+        model.mutable['items'].sort()
+        model.mutable['new'] = Mutable()
+        model.mutable['new'].msg = MSG
+        self.assertEqual(model.mutable.dirty_paths(), {
+            ('settings', 'theme'), ('items',), ('new',)
+        })
+        self.assertEqual(model.mutable['settings'].dirty_paths(), {('theme',)})
+        session.flush()
+        self.assertEqual(model.mutable.dirty_paths(), set())
+        session.commit()
+        # roots which are never flushed do not record changes without bound
+        standalone = Mutable.coerce(None, {'items': []})
+        for i in range(1001):
+            standalone['items'].append(i)
+        self.assertEqual(len(standalone.__dict__['_dirty']), 1)
+        self.assertEqual(standalone.dirty_paths(), {()})
+        self.assertEqual(standalone['items'].dirty_paths(), {()})
+
+    def test_diff(self):
+        old = Mutable.coerce(None, {
+            'settings': {'theme': 'dark'}, 'history': ['created'], 
+            'items': [0, 1, 2], 'old': MSG
+        })
+        new = old.clone()
+        new['settings']['theme'] = 'light'
+        new['history'].append({'event': 'theme'})
+        new['items'].pop()
+        del new['old']
+        new['tuple'] = (0, 1)
+        patch = diff(old, new)
+        self.assertIn(('extend', ('history',), [{'event': 'theme'}]), patch)
+        self.assertIn(('truncate', ('items',), 2), patch)
+        patched = apply_patch(pickle.loads(pickle.dumps(old)), patch)
+        self.assertEqual(patched, new)
+        self.assertIs(patched['history'][1].root, patched)
+        self.assertIs(new['history'][1].root, new)
+        self.assertEqual(diff(new, new.clone()), [])
+        # only the changed parts of a clone are visited
+        old = Mutable.coerce(None, {
+            'rows': [{'i': i} for i in range(1000)], 'log': list(range(1000))
+        })
+        new = old.clone()
+        for row in new['rows']:
+            row['i']
+        new['rows'][5]['i'] = -1
+        new['log'].append(1000)
+        # the package exports the `diff` function under the module's name
+        diff_module = sys.modules['sqlalchemy_mutable.diff']
+        with mock.patch.object(
+            diff_module, '_diff', wraps=diff_module._diff
+        ) as visit:
+            patch = diff(old, new)
+        self.assertEqual(patch, [
+            ('set', ('rows', 5, 'i'), -1), ('extend', ('log',), [1000])
+        ])
+        self.assertLess(visit.call_count, 1010)
+        # clones do not keep their sources alive
+        value = MutableDict({'count': 0, 'items': ([0],)})
+        source = weakref.ref(value)
+        for i in range(3):
+            value = value.clone()
+            value['count'] += 1
+            value['items'][0].append(i)
+        gc.collect()
+        self.assertIsNone(source())
+        self.assertEqual(value, {'count': 3, 'items': ([0, 0, 1, 2],)})
+
+    def test_version(self):
+        mutable = Mutable.coerce(None, {
+            'settings': {'theme': 'dark'}, 'items': [], 'tuple': ([],)
+        })
+        version = mutable.get_version()
+        items_version = mutable['items'].get_version()
+        mutable['settings']['theme'] = 'light'
+        self.assertGreater(mutable.get_version(), version)
+        self.assertEqual(mutable['items'].get_version(), items_version)
+        version = mutable.get_version()
+        mutable['tuple'][0].append(0)
+        self.assertIs(mutable['tuple'][0].root, mutable)
+        self.assertGreater(mutable.get_version(), version)
+        version = mutable.get_version()
+        copy = pickle.loads(pickle.dumps(mutable))
+        copy['items'].append(0)
+        self.assertEqual(copy.get_version(), 1)
+        self.assertEqual(mutable.get_version(), version)
+        # caches validated by version
+        model = Model()
+        model.attrs = {'class': ['btn'], 'style': {'color': 'red'}}
+        html = 'class="btn" style="color:{};"'
+        self.assertEqual(model.attrs.to_html(), html.format('red'))
+        model.attrs['style']['color'] = 'blue'
+        self.assertEqual(model.attrs.to_html(), html.format('blue'))
+        # version is an ordinary attribute name
+        model.mutable = MyClass('hello world')
+        session.add(model)
+        session.commit()
+        model.mutable.version = 3
+        session.commit()
+        session.expire(model)
+        self.assertEqual(model.mutable.version, 3)
+        self.assertEqual(model.mutable.get_version(), 0)
+
+    def test_plain(self):
+        model = Model()
+        value = {'items': [1, (2, 'a')], 'settings': {'theme': 'dark'}}
+        model.mutable = model.codec = model.document = value
+        model.interned = 5
+        session.add(model)
+        session.commit()
+        row = session.query(
+            plain(Model.mutable), plain(Model.codec), plain(Model.document),
+            plain(Model.interned)
+        ).filter(Model.id == model.id).one()
+        self.assertEqual(row.mutable, value)
+        self.assertEqual(row.codec, value)
+        self.assertEqual(row.document, {
+            'items': [1, [2, 'a']], 'settings': {'theme': 'dark'}
+        })
+        for item in (row.mutable, row.mutable['items'], row.codec):
+            self.assertNotIsInstance(item, Mutable)
+        self.assertIs(type(row.interned), int)
+
+    def test_iter_mutable(self):
+        owners = [Model() for i in range(3)]
+        session.add_all(owners)
+        session.commit()
+        models = []
+        for i in range(5):
+            model = Model()
+            model.mutable = {'owner': owners[i % 3], 'index': i}
+            models.append(model)
+        session.add_all(models)
+        session.commit()
+        ids = [model.id for model in models]
+        owner_ids = [owner.id for owner in owners]
+        del model, models, owners
+        session.expunge_all()
+        statements = []
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        try:
+            query = Model.query.filter(Model.id.in_(ids)).order_by(Model.id)
+            rows = []
+            for model in iter_mutable(query, chunk_size=2):
+                n_statements = len(statements)
+                owner = model.mutable['owner']
+                self.assertEqual(len(statements), n_statements)
+                rows.append((model.mutable['index'], owner.id))
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        self.assertEqual(
+            rows, [(i, owner_ids[i % 3]) for i in range(5)]
+        )
+        rows = list(iter_mutable(
+            session.query(Model.id, Model.mutable).filter(Model.id.in_(ids)),
+            chunk_size=2
+        ))
+        self.assertEqual(len(rows), 5)
+
+    def test_decode_parallel(self):
+        models = [Model() for i in range(5)]
+        for i, model in enumerate(models):
+            model.mutable = model.codec = {'index': i, 'items': [(i,)]}
+        models[2].mutable = models[2].codec = None
+        session.add_all(models)
+        session.commit()
+        expected = [model.mutable for model in models]
+        ids = [model.id for model in models]
+        for column in (Model.mutable, Model.codec):
+            values = [
+                row[0] for row in session.query(raw(column))
+                .filter(Model.id.in_(ids)).order_by(Model.id)
+            ]
+            objs = decode_parallel(values, column, chunk_size=2, max_workers=2)
+            self.assertEqual(objs, expected)
+            self.assertNotIsInstance(objs[0], Mutable)
+            self.assertNotIsInstance(objs[0]['items'][0], Mutable)
+
+    def test_bulk_update(self):
+        models = [Model() for i in range(5)]
+        for i, model in enumerate(models):
+            model.mutable = model.codec = {'status': 'pending', 'count': i}
+        session.add_all(models)
+        session.commit()
+        ids = [model.id for model in models]
+
+        def archive(value):
+            value['status'] = 'archived'
+
+        for column in (Model.mutable, Model.codec):
+            count = bulk_update(
+                session, column, archive, where=Model.id.in_(ids[:4]),
+                chunk_size=3
+            )
+            self.assertEqual(count, 4)
+        count = bulk_update(session, Model.mutable, {
+            ids[0]: lambda value: {'status': 'replaced'},
+            ids[4]: lambda value: value.update({'count': 10}),
+        })
+        self.assertEqual(count, 2)
+        session.commit()
+        self.assertEqual(models[0].mutable, {'status': 'replaced'})
+        self.assertEqual(models[0].status, 'replaced')
+        self.assertEqual(
+            models[1].mutable, {'status': 'archived', 'count': 1}
+        )
+        self.assertEqual(models[1].status, 'archived')
+        self.assertEqual(models[1].codec, models[1].mutable)
+        self.assertEqual(models[4].mutable['count'], 10)
+        self.assertEqual(models[4].codec['status'], 'pending')
+        # values are stored in the same format as values set by the ORM
+        model = Model()
+        model.mutable = {'status': 'archived', 'count': 1}
+        session.add(model)
+        session.commit()
+        stored = [
+            row[0] for row in session.query(raw(Model.mutable))
+            .filter(Model.id.in_([models[1].id, model.id]))
+        ]
+        self.assertEqual(stored[0], stored[1])
+        # new values are coerced by the column's mutable class
+        bulk_update(session, Model.ranking, {ids[0]: lambda value: [3, 1, 2]})
+        session.commit()
+        stored = session.query(raw(Model.ranking)).filter(
+            Model.id == ids[0]
+        ).scalar()
+        self.assertIsInstance(pickle.loads(stored), MutableSortedList)
+        self.assertEqual(models[0].ranking, [1, 2, 3])
+        # pending changes are flushed, not discarded
+        models[2].mutable['count'] = 20
+        bulk_update(session, Model.mutable, archive, where=Model.id == ids[2])
+        session.commit()
+        self.assertEqual(
+            models[2].mutable, {'status': 'archived', 'count': 20}
+        )
+        # reference indexes are updated
+        owners = [Owner(), Owner()]
+        holder = Holder()
+        session.add_all(owners + [holder])
+        session.commit()
+        holder.mutable = {'owner': owners[0]}
+        session.commit()
+        bulk_update(session, Holder.mutable, {
+            holder.id: lambda value: {'owner': owners[1]}
+        })
+        session.commit()
+        self.assertEqual(reference_index.referrers(session, owners[0]), [])
+        self.assertEqual(
+            reference_index.referrers(session, owners[1]),
+            [(holder, 'mutable')]
+        )
+        # executors receive chunks as they are selected, so rows are
+        # updated before the last chunk is selected
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement.split()[0])
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        with ThreadPoolExecutor(1) as executor:
+            count = bulk_update(
+                session, Model.mutable, archive, where=Model.id.in_(ids),
+                chunk_size=1, executor=executor
+            )
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(count, 5)
+        last_select = len(statements) - 1 - statements[::-1].index('SELECT')
+        self.assertLess(statements.index('UPDATE'), last_select)
+
+    def test_composite_model_shell(self):
+        composite = CompositeModel(group=1, id=2)
+        session.add(composite)
+        session.commit()
+        shell = ModelShell(composite)
+        self.assertEqual(shell.identity, (1, 2))
+        self.assertEqual(shell.model_key, 'composite_model')
+        model = Model()
+        model.mutable = {'composite': composite}
+        model.codec = composite
+        session.add(model)
+        session.commit()
+        id = model.id
+        session.expunge_all()
+        model = Model.query.get(id)
+        self.assertEqual(model.mutable['composite'].id, 2)
+        self.assertIs(model.codec, model.mutable['composite'])
+        self.assertEqual(next(iter_mutable(
+            Model.query.filter_by(id=model.id)
+        )).mutable['composite'].group, 1)
+        # shells pickled by earlier versions store the model class and id
+        legacy = _Legacy({'id': model.id, 'model_class': Model})
+        shell = pickle.loads(pickle.dumps(legacy))
+        self.assertEqual(shell.identity, (model.id,))
+        self.assertIs(shell.unshell(), model)
+
+    def test_reference_index(self):
+        owners = [Owner() for i in range(3)]
+        session.add_all(owners)
+        session.commit()
+        holders = [Holder() for i in range(3)]
+        holders[0].mutable = {'owner': owners[0], 'items': [owners[1]]}
+        holders[1].codec = (owners[0],)
+        holders[2].mutable = owners[1]
+        session.add_all(holders)
+        session.commit()
+        self.assertEqual(
+            reference_index.referrers(session, owners[0]),
+            [(holders[0], 'mutable'), (holders[1], 'codec')]
+        )
+        holders[0].mutable['items'].pop()
+        session.commit()
+        self.assertEqual(
+            reference_index.referrers(session, owners[1]),
+            [(holders[2], 'mutable')]
+        )
+        reference_index.rebuild(session)
+        self.assertEqual(
+            reference_index.referrers(session, owners[1]),
+            [(holders[2], 'mutable')]
+        )
+        # references to a deleted model are nullified
+        session.delete(owners[0])
+        session.delete(owners[1])
+        session.commit()
+        for holder in holders:
+            session.refresh(holder)
+        self.assertEqual(holders[0].mutable, {'owner': None, 'items': []})
+        self.assertEqual(holders[1].codec, (None,))
+        self.assertIsNone(holders[2].mutable)
+        self.assertEqual(reference_index.referrers(session, owners[2]), [])
+
+    def test_unshell_cache(self):
+        model = Model()
+        session.add(model)
+        session.commit()
+        holder = Model()
+        holder.mutable = {'items': [model], 'partial': partial(foo, model)}
+        session.add(holder)
+        session.commit()
+        statements = []
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        try:
+            items = holder.mutable['items']
+            self.assertIs(items[0], model)
+            n_statements = len(statements)
+            self.assertIs(holder.mutable['partial'].args[0], model)
+            shells = [
+                list.__getitem__(items, 0),
+                tuple.__getitem__(holder.mutable['partial'].args, 0)
+            ]
+            self.assertEqual(shells[0], shells[1])
+            self.assertEqual(shells[0], model)
+            self.assertEqual(len(set(shells)), 1)
+            self.assertEqual(len(statements), n_statements)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        cache = session.info['sqlalchemy_mutable.unshelled']
+        self.assertIs(cache[shells[0].model_key, shells[0].identity], model)
+
+    def test_coerce_scalars(self):
+        tz = datetime.timezone(datetime.timedelta(hours=-5))
+        values = [
+            3, 2.5, 'hello', True, 1+2j,
+            datetime.datetime(2020, 1, 1, 12, 30, tzinfo=tz),
+            datetime.datetime(2020, 11, 1, 1, 30, fold=1),
+        ]
+        for value in values:
+            coerced = Mutable.coerce(None, value)
+            self.assertIsInstance(coerced, Mutable)
+            self.assertIs(coerced.root, coerced)
+            loaded = pickle.loads(pickle.dumps(coerced))
+            for obj in (coerced, loaded):
+                self.assertEqual(getattr(obj, 'value', obj), value)
+                if isinstance(value, datetime.datetime):
+                    self.assertEqual(obj.tzinfo, value.tzinfo)
+                    self.assertEqual(obj.fold, value.fold)
+        model = Model()
+        model.mutable = False
+        session.add(model)
+        session.commit()
+        session.expire(model)
+        self.assertIs(model.mutable, False)
+
+    def test_compact_coerced_values(self):
+        for value in (3, 'hello', 2.5, True):
+            coerced = Mutable.coerce(None, value)
+            if isinstance(value, bool):
+                self.assertEqual(coerced.__dict__, {'value': value})
+            else:
+                self.assertEqual(coerced.__dict__, {})
+            self.assertIs(coerced.root, coerced)
+        # values pickled with their bookkeeping attributes
+        legacy = [
+            (copyreg._reconstructor, (CoercedInt, int, 3), {
+                '_python_type': int, 'isroot': True
+            }),
+            (copyreg._reconstructor, (CoercedBool, object, None), {
+                '_python_type': None, '_tracked_attr_names': {'value'},
+                'value': True, 'isroot': True
+            }),
+        ]
+        for reduce, value in zip(legacy, (3, True)):
+            loaded = pickle.loads(pickle.dumps(_Reduced(reduce)))
+            self.assertEqual(getattr(loaded, 'value', loaded), value)
+            self.assertNotIn('_python_type', loaded.__dict__)
+            self.assertIs(loaded.root, loaded)
+        model = Model()
+        model.mutable = True
+        self.assertIs(model.mutable, True)
+
+    def test_unwrapping_attributes(self):
+        configure_mappers()
+        self.assertNotIn('__getattribute__', MutableModelBase.__dict__)
+        self.assertIs(type(Model.__dict__['id']), InstrumentedAttribute)
+        for key in ('mutable', 'codec'):
+            self.assertIsNot(
+                type(Model.__dict__[key]), InstrumentedAttribute
+            )
+        owner = Model()
+        session.add(owner)
+        session.commit()
+        model = Model()
+        model.mutable, model.codec = owner, True
+        self.assertIs(model.mutable, owner)
+        self.assertIs(model.codec, True)
+        self.assertEqual(Model.mutable.property.key, 'mutable')
+
+    def test_tracked_attrs(self):
+        owner = Model()
+        session.add(owner)
+        session.commit()
+        model = Model()
+        model.mutable = Mutable()
+        model.mutable.object = MyAttrsClass('hello')
+        session.add(model)
+        session.commit()
+        obj = model.mutable.object
+        self.assertIsInstance(obj, MutableAttrsClass)
+        self.assertEqual(obj.label, 'default')
+        obj.msg = owner
+        self.assertEqual(model.mutable.dirty_paths(), {('object', 'msg')})
+        obj.label = ['nested']
+        session.commit()
+        session.expire(model)
+        obj = model.mutable.object
+        self.assertIs(obj.msg, owner)
+        self.assertEqual(obj.label, ['nested'])
+        obj.label.append('item')
+        session.commit()
+        session.expire(model)
+        self.assertEqual(model.mutable.object.label, ['nested', 'item'])
+        del model.mutable.object.label
+        session.commit()
+        session.expire(model)
+        self.assertEqual(model.mutable.object.label, 'default')
+
+    def test_tracking_metadata(self):
+        class Untracked(Mutable):
+            _untracked_attr_names = list(Mutable._untracked_attr_names) + [
+                '_cache'
+            ]
+
+        self.assertIsInstance(Untracked._untracked_attr_names, frozenset)
+        self.assertIsInstance(MutableDict._untracked_attr_names, frozenset)
+        obj = Untracked()
+        obj._cache = {}
+        obj.tracked = {}
+        self.assertEqual(obj._tracked_attr_names, {'tracked'})
+        self.assertIsInstance(obj.tracked, MutableDict)
+        self.assertIsInstance(obj._cache, dict)
+        self.assertNotIsInstance(obj._cache, Mutable)
+        self.assertTrue(CoercedModelShell._is_model_shell)
+        self.assertFalse(MutableDict._is_model_shell)
+        # instances of python types without a `__dict__` cannot set
+        # attributes
+        with self.assertRaises(AttributeError):
+            Mutable.coerce(None, 3).attr = 'value'
+
+    def test_set_and_deque(self):
+        owner = Model()
+        model = Model()
+        session.add_all([owner, model])
+        session.commit()
+        model.mutable = {'set': {'red', owner}, 'queue': deque(maxlen=2)}
+        model.tags = {('b', 1), 'a', 2}
+        session.commit()
+        self.assertIsInstance(model.mutable['set'], MutableSet)
+        self.assertIsInstance(model.mutable['queue'], MutableDeque)
+        # membership checks do not unshell the set's models
+        self.assertIn(owner, model.mutable['set'])
+        # or add models without an identity to the session
+        transient = Model()
+        self.assertNotIn(transient, model.mutable['set'])
+        model.mutable['set'].discard(transient)
+        with self.assertRaises(KeyError):
+            model.mutable['set'].remove(transient)
+        self.assertNotIn(transient, session)
+        model.mutable['set'] |= {'blue'}
+        model.mutable['set'].discard('red')
+        model.mutable['queue'].extend(['first', 'second', 'third'])
+        model.tags.add('c')
+        session.commit()
+        session.expire(model)
+        self.assertEqual(model.mutable['set'].unshell(), {'blue', owner})
+        self.assertEqual(list(model.mutable['queue']), ['second', 'third'])
+        self.assertEqual(model.mutable['queue'].maxlen, 2)
+        self.assertEqual(model.tags, {('b', 1), 'a', 'c', 2})
+        # JSON sets are stored as sorted lists
+        self.assertEqual(
+            session.query(type_coerce(Model.tags, String))
+            .filter_by(id=model.id).scalar(),
+            '["a", "c", 2, ["b", 1]]'
+        )
+        model.mutable['queue'].popleft()
+        self.assertEqual(model.mutable.dirty_paths(), {('queue',)})
+        session.commit()
+        session.expire(model)
+        self.assertEqual(list(model.mutable['queue']), ['third'])
+        model.codec = model.mutable
+        session.commit()
+        session.expire(model)
+        self.assertEqual(model.codec['set'].unshell(), {'blue', owner})
+        self.assertEqual(model.codec['queue'].maxlen, 2)
+        self.assertIs(model.codec['queue'].root, model.codec)
+        self.assertEqual(
+            session.query(plain(Model.codec)).filter_by(id=model.id).scalar(),
+            {'set': {'blue', ModelShell(owner)}, 'queue': deque(['third'])}
+        )
+        # changed sets and deques are set as a whole by patches
+        a = Mutable.coerce(None, {'s': {1, 2}, 'd': deque([1, 2], 3)})
+        b = Mutable.coerce(None, {'s': {1, 2, 3}, 'd': deque([1, 2, 3])})
+        patch = diff(a, b)
+        self.assertEqual(patch, [
+            ('set', ('s',), {1, 2, 3}), ('set', ('d',), deque([1, 2, 3]))
+        ])
+        a = apply_patch(a, patch)
+        self.assertEqual(a, b)
+        # failed removals record no change
+        for obj, pop, error in [
+            (Mutable.coerce(None, set()), 'pop', KeyError),
+            (Mutable.coerce(None, deque()), 'pop', IndexError),
+            (Mutable.coerce(None, deque()), 'popleft', IndexError),
+        ]:
+            with self.assertRaises(error):
+                getattr(obj, pop)()
+            self.assertEqual(obj.get_version(), 0)
+            self.assertEqual(obj.dirty_paths(), set())
+        queue = Mutable.coerce(None, deque([1]))
+        with self.assertRaises(ValueError):
+            queue.remove(2)
+        self.assertEqual(queue.get_version(), 0)
+        self.assertIsNone(a['d'].maxlen)
+        self.assertIsNot(a['s'], b['s'])
+
+    def test_sorted_list_and_ring_buffer(self):
+        model = Model()
+        model.mutable = {
+            'scores': SortedList([(-10, 'b'), (-30, 'a')]),
+            'events': RingBuffer(['login'], capacity=2)
+        }
+        session.add(model)
+        session.commit()
+        scores, events = model.mutable['scores'], model.mutable['events']
+        self.assertIsInstance(scores, MutableSortedList)
+        self.assertIsInstance(events, MutableRingBuffer)
+        scores.add((-40, 'd'))
+        self.assertEqual(model.mutable.dirty_paths(), {('scores',)})
+        model.mutable.reset_dirty_paths()
+        # adding the largest item only changes the tail
+        scores.add((0, 'e'))
+        self.assertEqual(model.mutable.dirty_paths(), {('scores', 3)})
+        scores.update([(-20, 'c')])
+        scores.remove((-40, 'd'))
+        self.assertIn((-20, 'c'), scores)
+        self.assertEqual(scores.index((-10, 'b')), 2)
+        with self.assertRaises(TypeError):
+            scores.append((-50, 'f'))
+        events.append('view')
+        events.append('logout')
+        session.commit()
+        session.expire(model)
+        self.assertEqual(
+            list(model.mutable['scores']),
+            [(-30, 'a'), (-20, 'c'), (-10, 'b'), (0, 'e')]
+        )
+        self.assertEqual(list(model.mutable['events']), ['view', 'logout'])
+        self.assertEqual(model.mutable['events'].capacity, 2)
+        with self.assertRaises(TypeError):
+            MutableRingBuffer.coerce(None, ['login'])
+        # patches add items to sorted lists, or set them as a whole
+        a = Mutable.coerce(None, {'scores': SortedList([1, 3])})
+        b = a.clone()
+        b['scores'].add(5)
+        self.assertEqual(diff(a, b), [('update', ('scores',), [5])])
+        c = a.clone()
+        c['scores'].add(2)
+        self.assertEqual(diff(a, c), [('set', ('scores',), [1, 2, 3])])
+        apply_patch(a, diff(a, b) + diff(b, c))
+        self.assertEqual(a['scores'], [1, 2, 3])
+        self.assertIsInstance(a['scores'], MutableSortedList)
+        # JSON sorted lists load their items' lists as tuples
+        model.leaderboard = SortedList([(-10, 'bob'), (-30, 'alice')])
+        session.commit()
+        session.expire(model)
+        model.leaderboard.add((-20, 'carol'))
+        session.commit()
+        session.expire(model)
+        self.assertEqual(
+            list(model.leaderboard),
+            [(-30, 'alice'), (-20, 'carol'), (-10, 'bob')]
+        )
+
+
+class _Reduced():
+    """Pickles with the given reduce value"""
+    def __init__(self, reduce):
+        self.reduce = reduce
+
+    def __reduce__(self):
+        return self.reduce
+
+
+class _Legacy():
+    """Pickles as a `ModelShell` with the given state"""
+    def __init__(self, state):
+        self.state = state
+
+    def __reduce__(self):
+        return copyreg._reconstructor, (ModelShell, object, None), self.state